@@ -1,12 +1,13 @@
 import logging
 from typing import TypedDict, Optional, Any, Dict
 
-from asgiref.sync import sync_to_async
 from langchain.schema.runnable import RunnableConfig
 
 from ix.agents.models import Agent
 from ix.chains.callbacks import IxHandler
+from ix.chains.loaders.cache import aload_cached_chain_flow
 from ix.chains.loaders.context import IxContext
+from ix.chains.loaders.profile import LoadProfiler
 from ix.chains.models import Chain as ChainModel
 from ix.runnable_log.subscription import RunEventSubscription
 from ix.task_log.models import Task
@@ -56,8 +57,9 @@ class AgentProcess:
         RunEventSubscription.on_run(chain_id=self.chain.id, task_id=handler.root_id)
 
         try:
-            # TODO: chain loading needs to be made async
-            chain = await sync_to_async(self.chain.load_chain)(context=context)
+            with LoadProfiler() as profiler:
+                chain = await aload_cached_chain_flow(self.chain, context=context)
+            await profiler.asave(task=self.task, chain=self.chain)
 
             logger.info(
                 f"Sending request to chain={self.chain.name} prompt={user_input}"
@@ -71,7 +73,10 @@ class AgentProcess:
             if "question" not in inputs:
                 inputs["question"] = user_input["user_input"]
 
-            return await chain.ainvoke(inputs, RunnableConfig(callbacks=[handler]))
+            # flow may be shared with other tasks, pass this run's context in config
+            config = RunnableConfig(callbacks=[handler])
+            config["ix_context"] = context
+            return await chain.ainvoke(inputs, config)
         except Exception as e:
             # validation errors aren't caught by callbacks.
             await handler.send_error_msg(e)
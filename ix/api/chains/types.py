@@ -22,6 +22,9 @@ class Chain(BaseModel):
     # agent pass through properties
     alias: Optional[str] = None
 
+    # graph errors found when the flow plan was compiled
+    flow_plan_error: Optional[str] = None
+
     class Config:
         from_attributes = True
 
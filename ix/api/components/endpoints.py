@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 
 from ix.api.auth import get_request_user
 from ix.api.chains.endpoints import DeletedItem
+from ix.chains.loaders.registry import node_type_registry
 from ix.chains.models import NodeType
 from ix.api.components.types import NodeType as NodeTypePydantic, NodeTypePage
 
@@ -110,6 +111,7 @@ async def update_node_type(
         setattr(existing_node_type, field, value)
 
     await existing_node_type.asave()
+    node_type_registry.refresh(node_type_id)
     return NodeTypePydantic.from_orm(existing_node_type)
 
 
@@ -129,4 +131,5 @@ async def delete_node_type(
         raise HTTPException(status_code=404, detail="Node type not found")
 
     await instance.adelete()
+    node_type_registry.refresh(node_type_id)
     return DeletedItem(id=node_type_id)
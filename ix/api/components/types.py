@@ -517,6 +517,9 @@ class NodeType(BaseModel):
     """JSON schema for the config"""
     display_groups: Optional[List[DisplayGroup]] = None
     """Groups of fields that are displayed together in the order the groups should be displayed"""
+    lazy: Optional[bool] = None
+    """Defer loading the node until it is first run. Defaults to settings.LAZY_NODE_TYPES
+    when unset"""
 
     class Config:
         from_attributes = True
@@ -16,6 +16,7 @@ from ix.api.chains.endpoints import (
     create_chain_chat,
 )
 from ix.api.chats.types import Chat as ChatPydantic
+from ix.chains.loaders.cache import ainvalidate_chain_flow
 from ix.api.editor.types import (
     UpdateEdge,
     GraphModel,
@@ -60,6 +61,7 @@ async def set_chain_root(chain_id: UUID, update_root: UpdateRoot):
         id__in=update_root.node_ids, root=False
     ).aupdate(root=True)
     await asyncio.gather(remove_roots, add_roots)
+    await ainvalidate_chain_flow(chain_id)
     return UpdatedRoot(old_roots=old_root_ids, roots=update_root.node_ids)
 
 
@@ -103,6 +105,7 @@ async def add_chain_node(node: AddNode):
         if node_edges:
             await ChainEdge.objects.abulk_create(node_edges)
 
+    await ainvalidate_chain_flow(node.chain_id)
     return NodePydantic.from_orm(new_node)
 
 
@@ -121,6 +124,7 @@ async def update_chain_node(node_id: UUID, data: UpdateNode):
     for field, value in as_dict.items():
         setattr(existing_node, field, value)
     await existing_node.asave(update_fields=as_dict.keys())
+    await ainvalidate_chain_flow(existing_node.chain_id)
     return NodePydantic.from_orm(existing_node)
 
 
@@ -149,6 +153,7 @@ async def delete_chain_node(node_id: UUID):
         edges = ChainEdge.objects.filter(Q(source_id=node_id) | Q(target_id=node_id))
         await edges.adelete()
         await node.adelete()
+        await ainvalidate_chain_flow(node.chain_id)
     return DeletedItem(id=node_id)
 
 
@@ -161,6 +166,7 @@ async def delete_chain_node(node_id: UUID):
 async def add_chain_edge(data: EdgePydantic):
     new_edge = ChainEdge(**data.dict())
     await new_edge.asave()
+    await ainvalidate_chain_flow(new_edge.chain_id)
     return EdgePydantic.from_orm(new_edge)
 
 
@@ -179,6 +185,7 @@ async def update_chain_edge(edge_id, data: UpdateEdge):
     for field, value in as_dict.items():
         setattr(existing_edge, field, value)
     await existing_edge.asave(update_fields=as_dict.keys())
+    await ainvalidate_chain_flow(existing_edge.chain_id)
     return EdgePydantic.from_orm(existing_edge)
 
 
@@ -192,6 +199,7 @@ async def delete_chain_edge(edge_id: UUID):
     edge = await ChainEdge.objects.aget(id=edge_id)
     if edge:
         await edge.adelete()
+        await ainvalidate_chain_flow(edge.chain_id)
     return DeletedItem(id=edge_id)
 
 
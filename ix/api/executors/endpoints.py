@@ -0,0 +1,25 @@
+from django.contrib.auth.models import AbstractUser
+from fastapi import APIRouter, Depends
+
+from ix.api.auth import get_request_user
+from ix.api.executors.types import ExecutorStats, ExecutorStatsList
+from ix.utils.executors import executor_stats
+
+__all__ = ["router", "get_executor_stats"]
+
+router = APIRouter()
+
+
+@router.get(
+    "/executors/stats",
+    operation_id="get_executor_stats",
+    response_model=ExecutorStatsList,
+    tags=["executors"],
+)
+async def get_executor_stats(
+    user: AbstractUser = Depends(get_request_user),
+) -> ExecutorStatsList:
+    """Saturation metrics for the named executors that were started"""
+    return ExecutorStatsList(
+        executors=[ExecutorStats(**stats) for stats in executor_stats().values()]
+    )
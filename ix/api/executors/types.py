@@ -0,0 +1,18 @@
+from typing import List
+
+from pydantic import BaseModel
+
+
+class ExecutorStats(BaseModel):
+    name: str
+    max_workers: int
+    queued: int
+    running: int
+    completed: int
+    peak_queued: int
+    utilization: float
+    mean_wait_ms: float
+
+
+class ExecutorStatsList(BaseModel):
+    executors: List[ExecutorStats]
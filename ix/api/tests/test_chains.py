@@ -633,6 +633,10 @@ class TestNode:
             "y": 20,
         }
 
+        # graph changed, compiled flows must be rebuilt
+        chain = await Chain.objects.aget(id=node.chain_id)
+        assert chain.revision == 1
+
     async def test_update_non_existent_chain_node(self):
         non_existent_node_id = uuid4()
         update_data = {
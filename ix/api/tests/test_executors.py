@@ -0,0 +1,20 @@
+import pytest
+from httpx import AsyncClient
+
+from ix.server.fast_api import app
+from ix.utils.executors import run_in_executor
+
+
+@pytest.mark.django_db
+class TestExecutorStats:
+    async def test_get_executor_stats(self, auser, settings):
+        settings.EXECUTOR_IO_WORKERS = 2
+        assert await run_in_executor("io", sum, [1, 2]) == 3
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get("/executors/stats")
+
+        assert response.status_code == 200, response.content
+        executors = {stats["name"]: stats for stats in response.json()["executors"]}
+        assert executors["io"]["max_workers"] == 2
+        assert executors["io"]["completed"] >= 1
@@ -1,3 +1,4 @@
+import asyncio
 import functools
 import json
 import logging
@@ -6,10 +7,11 @@ import traceback
 from collections import defaultdict
 import dataclasses
 from functools import cached_property
-from typing import Dict, Union, Any, List, Optional
+from typing import Dict, Union, Any, List, Optional, Set
 from uuid import UUID
 
 from channels.layers import get_channel_layer
+from django.conf import settings
 from langchain.schema.runnable import RunnableConfig
 
 from ix.schema.subscriptions import ChatMessageTokenSubscription
@@ -17,7 +19,7 @@ from langchain.callbacks.manager import AsyncCallbackManagerForChainRun
 
 from ix.chat.models import Chat
 from langchain.callbacks.base import AsyncCallbackHandler
-from langchain.schema import AgentAction, BaseMessage
+from langchain.schema import AgentAction, BaseMessage, LLMResult
 
 from ix.agents.models import Agent
 from ix.chains.models import Chain
@@ -41,6 +43,71 @@ def log_error(func):
     return wrapper
 
 
+class TokenStream:
+    """Coalesces the tokens streamed for a message into frames.
+
+    Tokens are sent to clients in frames of up to TOKEN_STREAM_MAX_TOKENS tokens,
+    sent at most TOKEN_STREAM_INTERVAL_MS after the first token in the frame. Each
+    frame includes the index of its first and last token so clients can order them.
+    """
+
+    def __init__(
+        self,
+        task: Task,
+        message_id: UUID,
+        max_tokens: Optional[int] = None,
+        interval_ms: Optional[float] = None,
+    ):
+        self.task = task
+        self.message_id = message_id
+        self.max_tokens = max_tokens or settings.TOKEN_STREAM_MAX_TOKENS
+        if interval_ms is None:
+            interval_ms = settings.TOKEN_STREAM_INTERVAL_MS
+        self.interval = interval_ms / 1000
+        self.frames = 0
+        self._tokens: List[str] = []
+        self._start: int = 0
+        self._end: int = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def add(self, index: int, token: str) -> None:
+        if not self._tokens:
+            self._start = index
+        self._tokens.append(token)
+        self._end = index
+
+        if len(self._tokens) >= self.max_tokens or self.interval <= 0:
+            await self.flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.interval, self._flush_later)
+
+    def _flush_later(self) -> None:
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self) -> None:
+        """Send the pending tokens as a frame"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._tokens:
+            return
+
+        text, self._tokens = "".join(self._tokens), []
+        self.frames += 1
+        await ChatMessageTokenSubscription.on_new_token(
+            task=self.task,
+            message_id=self.message_id,
+            index=self._start,
+            end_index=self._end,
+            text=text,
+        )
+
+
 @dataclasses.dataclass
 class RunContext:
     """Context info for a single run of an llm/chain."""
@@ -56,6 +123,19 @@ class RunContext:
     # cache of tokens
     tokens: list = dataclasses.field(default_factory=list)
 
+    # frames of tokens sent to clients
+    stream: Optional[TokenStream] = None
+
+    def get_stream(self, task: Task) -> TokenStream:
+        if self.stream is None:
+            self.stream = TokenStream(task=task, message_id=self.message.id)
+        return self.stream
+
+    async def flush_stream(self):
+        """Send tokens that are waiting to be sent to clients"""
+        if self.stream is not None:
+            await self.stream.flush()
+
     async def finalize_stream(self):
         """
         Write the completed stream to the message.
@@ -63,6 +143,7 @@ class RunContext:
         """
         if self.message is None:
             return
+        await self.flush_stream()
         self.message.content["stream"] = False
         self.message.content["text"] = "".join(self.tokens)
         await self.message.asave(update_fields=["content"])
@@ -174,19 +255,31 @@ class IxHandler(AsyncCallbackHandler):
         """Stream tokens over django-channels to clients subscribed via graphql"""
         context = self.contexts[parent_run_id]
         # sometimes the first token is None
-        if isinstance(token, str):
-            context.tokens.append(token)
-        await ChatMessageTokenSubscription.on_new_token(
-            task=self.task,
-            message_id=context.message.id,
-            index=len(context.tokens),
-            text=token,
-        )
+        if not isinstance(token, str):
+            return
+        context.tokens.append(token)
+        stream = context.get_stream(self.task)
+        await stream.add(index=len(context.tokens), token=token)
 
+    @log_error
+    async def on_llm_end(
+        self,
+        response: LLMResult,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Send the rest of the stream when the LLM finishes"""
+        await self.contexts[parent_run_id].flush_stream()
+
+    @log_error
     async def on_llm_error(
         self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any
     ) -> Any:
         """Run when LLM errors."""
+        parent_run_id = kwargs.get("parent_run_id", None)
+        await self.contexts[parent_run_id].flush_stream()
 
     @log_error
     async def on_chain_start(
@@ -0,0 +1,257 @@
+"""
+Embedding cache shared by all embedding components.
+
+CachedEmbeddings wraps an embeddings component and caches vectors by
+(class_path, model, sha256(text)). The model includes options that change the
+vectors, e.g. `dimensions`. `embed_documents` looks up all texts at once, embeds
+only the misses and writes them back in one batch. Embeddings nodes select a cache
+with the `embedding_cache` field.
+"""
+import hashlib
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import caches
+from langchain_core.embeddings import Embeddings
+
+from ix.utils.executors import run_in_executor
+
+logger = logging.getLogger(__name__)
+
+
+Vector = List[float]
+
+# queries may be embedded differently than documents (e.g. instructor models)
+QUERY_SUFFIX = ":query"
+
+# config options that change the vectors a model returns
+EMBEDDING_MODEL_PARAMS = [
+    "dimensions",
+    "encode_kwargs",
+    "embed_instruction",
+    "query_instruction",
+    "task_type",
+]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EmbeddingCacheBackend(ABC):
+    """Storage for cached embeddings"""
+
+    @abstractmethod
+    def mget(
+        self, class_path: str, model: str, hashes: Iterable[str]
+    ) -> Dict[str, Vector]:
+        """Return cached vectors by text hash. Misses are omitted."""
+
+    @abstractmethod
+    def mset(self, class_path: str, model: str, vectors: Dict[str, Vector]) -> None:
+        """Store vectors by text hash"""
+
+    async def amget(
+        self, class_path: str, model: str, hashes: Iterable[str]
+    ) -> Dict[str, Vector]:
+        return await run_in_executor("db", self.mget, class_path, model, hashes)
+
+    async def amset(
+        self, class_path: str, model: str, vectors: Dict[str, Vector]
+    ) -> None:
+        await run_in_executor("db", self.mset, class_path, model, vectors)
+
+
+class DatabaseEmbeddingCache(EmbeddingCacheBackend):
+    """Embeddings stored in postgres with pg_vector"""
+
+    def mget(
+        self, class_path: str, model: str, hashes: Iterable[str]
+    ) -> Dict[str, Vector]:
+        from ix.chains.models import EmbeddingCache
+
+        query = EmbeddingCache.objects.filter(
+            class_path=class_path, model=model, text_hash__in=list(hashes)
+        )
+        return dict(query.values_list("text_hash", "embedding"))
+
+    def mset(self, class_path: str, model: str, vectors: Dict[str, Vector]) -> None:
+        from ix.chains.models import EmbeddingCache
+
+        EmbeddingCache.objects.bulk_create(
+            [
+                EmbeddingCache(
+                    class_path=class_path,
+                    model=model,
+                    text_hash=hash_,
+                    embedding=vector,
+                )
+                for hash_, vector in vectors.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class RedisEmbeddingCache(EmbeddingCacheBackend):
+    """Embeddings stored in the redis backed django cache"""
+
+    @property
+    def cache(self):
+        return caches[settings.EMBEDDING_CACHE_ALIAS]
+
+    def get_key(self, class_path: str, model: str, hash_: str) -> str:
+        return f"embedding:{text_hash(f'{class_path}:{model}')}:{hash_}"
+
+    def mget(
+        self, class_path: str, model: str, hashes: Iterable[str]
+    ) -> Dict[str, Vector]:
+        keys = {self.get_key(class_path, model, hash_): hash_ for hash_ in hashes}
+        found = self.cache.get_many(list(keys))
+        return {keys[key]: vector for key, vector in found.items()}
+
+    def mset(self, class_path: str, model: str, vectors: Dict[str, Vector]) -> None:
+        self.cache.set_many(
+            {
+                self.get_key(class_path, model, hash_): vector
+                for hash_, vector in vectors.items()
+            },
+            timeout=settings.EMBEDDING_CACHE_TTL,
+        )
+
+    async def amget(
+        self, class_path: str, model: str, hashes: Iterable[str]
+    ) -> Dict[str, Vector]:
+        return await run_in_executor("io", self.mget, class_path, model, hashes)
+
+    async def amset(
+        self, class_path: str, model: str, vectors: Dict[str, Vector]
+    ) -> None:
+        await run_in_executor("io", self.mset, class_path, model, vectors)
+
+
+EMBEDDING_CACHE_BACKENDS = {
+    "database": DatabaseEmbeddingCache,
+    "redis": RedisEmbeddingCache,
+}
+
+
+def get_embedding_model(config: dict) -> str:
+    """Name of the model an embeddings config uses.
+
+    Options that change the vectors are appended as a hash so vectors with
+    different options are cached separately.
+    """
+    model = ""
+    for key in ("model", "model_name", "model_path", "model_id"):
+        if config.get(key, None):
+            model = str(config[key])
+            break
+
+    params = {
+        key: config[key]
+        for key in EMBEDDING_MODEL_PARAMS
+        if config.get(key, None) not in (None, "", {})
+    }
+    if params:
+        params_hash = text_hash(json.dumps(params, sort_keys=True, default=str))
+        model = f"{model}:{params_hash[:16]}"
+    return model
+
+
+def get_embedding_cache(name: str) -> EmbeddingCacheBackend:
+    try:
+        return EMBEDDING_CACHE_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown embedding cache: {name}")
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that are cached by the hash of the text"""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        class_path: str,
+        model: str,
+        cache: EmbeddingCacheBackend,
+    ):
+        self.embeddings = embeddings
+        self.class_path = class_path
+        self.model = model
+        self.cache = cache
+
+    def __getattr__(self, name: str):
+        # expose attributes of the wrapped component (e.g. client, model_name)
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    @staticmethod
+    def get_misses(
+        hashes: List[str], texts: List[str], vectors: Dict[str, Vector]
+    ) -> Dict[str, str]:
+        """Texts without a cached vector by hash. Repeated texts are embedded once."""
+        misses = {}
+        for hash_, text in zip(hashes, texts):
+            if hash_ not in vectors:
+                misses.setdefault(hash_, text)
+        return misses
+
+    def embed_documents(self, texts: List[str]) -> List[Vector]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.mget(self.class_path, self.model, set(hashes))
+        misses = self.get_misses(hashes, texts, vectors)
+
+        if misses:
+            embedded = self.embeddings.embed_documents(list(misses.values()))
+            new_vectors = dict(zip(misses, embedded))
+            self.cache.mset(self.class_path, self.model, new_vectors)
+            vectors.update(new_vectors)
+
+        logger.debug(
+            f"Embedded documents class_path={self.class_path} texts={len(texts)} "
+            f"misses={len(misses)}"
+        )
+        return [vectors[hash_] for hash_ in hashes]
+
+    def embed_query(self, text: str) -> Vector:
+        class_path = self.class_path + QUERY_SUFFIX
+        hash_ = text_hash(text)
+        vectors = self.cache.mget(class_path, self.model, [hash_])
+        if hash_ in vectors:
+            return vectors[hash_]
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.mset(class_path, self.model, {hash_: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[Vector]:
+        hashes = [text_hash(text) for text in texts]
+        vectors = await self.cache.amget(self.class_path, self.model, set(hashes))
+        misses = self.get_misses(hashes, texts, vectors)
+
+        if misses:
+            embedded = await self.embeddings.aembed_documents(list(misses.values()))
+            new_vectors = dict(zip(misses, embedded))
+            await self.cache.amset(self.class_path, self.model, new_vectors)
+            vectors.update(new_vectors)
+
+        logger.debug(
+            f"Embedded documents class_path={self.class_path} texts={len(texts)} "
+            f"misses={len(misses)}"
+        )
+        return [vectors[hash_] for hash_ in hashes]
+
+    async def aembed_query(self, text: str) -> Vector:
+        class_path = self.class_path + QUERY_SUFFIX
+        hash_ = text_hash(text)
+        vectors = await self.cache.amget(class_path, self.model, [hash_])
+        if hash_ in vectors:
+            return vectors[hash_]
+
+        vector = await self.embeddings.aembed_query(text)
+        await self.cache.amset(class_path, self.model, {hash_: vector})
+        return vector
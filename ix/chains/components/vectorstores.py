@@ -1,6 +1,5 @@
 from typing import Any, List, Iterable, Optional
 
-from asgiref.sync import sync_to_async
 from langchain.callbacks.manager import AsyncCallbackManagerForRetrieverRun
 from langchain.schema import Document
 from langchain.schema.vectorstore import VectorStore
@@ -8,6 +7,8 @@ from langchain_community.vectorstores.redis.base import RedisVectorStoreRetrieve
 from langchain_community.vectorstores.chroma import Chroma
 from langchain_community.vectorstores.redis import Redis
 
+from ix.utils.executors import run_in_executor
+
 
 class AsyncAddTextsMixin:
     async def aadd_texts(
@@ -17,8 +18,8 @@ class AsyncAddTextsMixin:
         ids: Optional[List[str]] = None,
         **kwargs: Any,
     ) -> List[str]:
-        return await sync_to_async(self.add_texts)(
-            texts=texts, metadatas=metadatas, ids=ids, **kwargs
+        return await run_in_executor(
+            "io", self.add_texts, texts=texts, metadatas=metadatas, ids=ids, **kwargs
         )
 
 
@@ -29,8 +30,8 @@ class AsyncGetRelevantDocumentsMixin:
         *,
         run_manager: AsyncCallbackManagerForRetrieverRun,
     ) -> List[Document]:
-        return await sync_to_async(self._get_relevant_documents)(
-            query, run_manager=run_manager
+        return await run_in_executor(
+            "io", self._get_relevant_documents, query, run_manager=run_manager
         )
 
 
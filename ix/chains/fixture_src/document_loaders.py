@@ -28,6 +28,19 @@ DOCUMENTS_OUTPUT = Connector(
 
 LOADER_CONNECTORS = [DOCUMENTS_OUTPUT]
 
+# Shards CPU bound loading and transforms across worker processes. Applied by
+# RunLoader and RunTransformer, not the component.
+PROCESSES = NodeTypeField(
+    name="processes",
+    label="Processes",
+    type="int",
+    default=0,
+    description=(
+        "Number of worker processes to shard documents across. "
+        "0 runs in the flow's worker."
+    ),
+)
+
 
 FILE_SUFFIXES_FIELD = {
     "default": None,
@@ -211,4 +224,5 @@ __all__ = [
     "BEAUTIFUL_SOUP_LOADER_CLASS_PATH",
     "GENERIC_LOADER_CLASS_PATH",
     "LOADER_CONNECTORS",
+    "PROCESSES",
 ]
@@ -9,6 +9,21 @@ from langchain_community.embeddings import (
 from ix.api.components.types import NodeTypeField
 from ix.chains.fixture_src.llm import GOOGLE_API_KEY
 
+# Cache used by the embeddings node. Applied by the loader, not the component.
+EMBEDDING_CACHE = {
+    "name": "embedding_cache",
+    "label": "Cache",
+    "type": "string",
+    "default": "none",
+    "input_type": "select",
+    "choices": [
+        {"value": "none", "label": "None"},
+        {"value": "database", "label": "Database"},
+        {"value": "redis", "label": "Redis"},
+    ],
+    "description": "Cache embeddings by the hash of the text",
+}
+
 OPENAI_EMBEDDINGS_CLASS_PATH = "langchain_community.embeddings.openai.OpenAIEmbeddings"
 OPENAI_EMBEDDINGS = {
     "name": "OpenAI Embeddings",
@@ -345,3 +360,6 @@ EMBEDDINGS = [
     HUGGINGFACE_HUB_EMBEDDINGS,
     MOSAICML_INSTRUCTOR_EMBEDDINGS,
 ]
+
+for embeddings in EMBEDDINGS:
+    embeddings["fields"] = list(embeddings["fields"]) + [EMBEDDING_CACHE]
@@ -5,7 +5,11 @@ from langchain.text_splitter import (
 )
 
 from ix.api.components.types import NodeTypeField
-from ix.chains.fixture_src.document_loaders import DOCUMENTS_OUTPUT, DOCUMENTS_INPUT
+from ix.chains.fixture_src.document_loaders import (
+    DOCUMENTS_OUTPUT,
+    DOCUMENTS_INPUT,
+    PROCESSES,
+)
 from ix.chains.fixture_src.parsers import LANGUAGE
 
 DOCUMENT_TRANSFORMER_CONNECTORS = [
@@ -30,7 +34,8 @@ CHARACTER_SPLITTER = {
             "keep_separator",
             "add_start_index",
         ],
-    ),
+    )
+    + [PROCESSES],
 }
 
 
@@ -53,7 +58,8 @@ RECURSIVE_CHARACTER_SPLITTER = {
             "keep_separator",
             "add_start_index",
         ],
-    ),
+    )
+    + [PROCESSES],
 }
 
 TEXT_SPLITTERS = [RECURSIVE_CHARACTER_SPLITTER, CHARACTER_SPLITTER]
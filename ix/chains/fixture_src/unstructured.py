@@ -5,7 +5,7 @@ from langchain_community.document_loaders import (
 )
 
 from ix.api.components.types import NodeTypeField, NodeType
-from ix.chains.fixture_src.document_loaders import LOADER_CONNECTORS
+from ix.chains.fixture_src.document_loaders import LOADER_CONNECTORS, PROCESSES
 
 FILE_PATH_LIST = NodeTypeField(
     name="file_path",
@@ -25,7 +25,7 @@ UNSTRUCTURED_IO_MODE = NodeTypeField(
         {"label": "page", "value": "page"},
     ],
 )
-UNSTRUCTURED_IO_FIELDS = [FILE_PATH_LIST, UNSTRUCTURED_IO_MODE]
+UNSTRUCTURED_IO_FIELDS = [FILE_PATH_LIST, UNSTRUCTURED_IO_MODE, PROCESSES]
 
 UNSTRUCTURED_FILE_IO_LOADER_CLASS_PATH = (
     "langchain_community.document_loaders.unstructured.UnstructuredFileIOLoader"
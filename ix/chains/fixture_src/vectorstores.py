@@ -27,6 +27,18 @@ VECTORSTORE_RETRIEVER_FIELDS = [
 )
 
 
+# DataSource tracking ingested documents. Applied by the loader, not the component.
+DATASOURCE_FIELD = {
+    "name": "datasource",
+    "label": "DataSource",
+    "type": "string",
+    "description": (
+        "ID of a DataSource. Documents ingested for the DataSource are tracked so "
+        "unchanged documents are skipped and removed documents are deleted."
+    ),
+}
+
+
 REDIS_VECTORSTORE_CLASS_PATH = "ix.chains.components.vectorstores.AsyncRedisVectorstore"
 
 REDIS_VECTORSTORE_RETRIEVER_FIELDS = (
@@ -77,6 +89,7 @@ REDIS_VECTORSTORE = {
             "default": "content_vector",
             "description": "Key for storing vectors",
         },
+        DATASOURCE_FIELD,
     ]
     + REDIS_VECTORSTORE_RETRIEVER_FIELDS,
 }
@@ -128,6 +141,7 @@ CHROMA = {
             },
         },
     )
+    + [DATASOURCE_FIELD]
     + VECTORSTORE_RETRIEVER_FIELDS,
     "field_groups": {
         "client_settings": {
@@ -0,0 +1,143 @@
+"""
+Micro-batching for local embedding models.
+
+Flows running in a worker call a shared local embedding model concurrently, each
+with a handful of texts. EncodeBatcher collects concurrent `encode` calls into one
+batch so the model runs a single vectorized forward pass, then returns each
+caller's rows.
+
+A batch runs when it holds EMBEDDING_BATCH_MAX_SIZE inputs or the oldest call
+has waited EMBEDDING_BATCH_MAX_WAIT_MS. Calls are only batched with calls that
+pass the same keyword args.
+"""
+import dataclasses
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class EncodeRequest:
+    inputs: List[Any]
+    kwargs: Dict[str, Any]
+    # a single input (e.g. a query) returns a row instead of a list of rows
+    single: bool = False
+    done: threading.Event = dataclasses.field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def kwargs_key(self) -> str:
+        return json.dumps(self.kwargs, sort_keys=True, default=str)
+
+
+class EncodeBatcher:
+    """Batch concurrent calls to an encode function.
+
+    `encode` must accept a list of inputs and return a sliceable sequence of rows
+    (e.g. SentenceTransformer.encode). Batches run on a daemon thread started
+    when the first call is made.
+    """
+
+    def __init__(
+        self,
+        encode: Callable,
+        max_batch_size: int = None,
+        max_wait_ms: float = None,
+    ):
+        self._encode = encode
+        self.max_batch_size = max_batch_size or settings.EMBEDDING_BATCH_MAX_SIZE
+        self.max_wait_ms = (
+            settings.EMBEDDING_BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        )
+        self._queue: queue.Queue[Optional[EncodeRequest]] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+
+    def encode(self, inputs, **kwargs) -> Any:
+        """Encode inputs as part of the next batch. Blocks until it completes."""
+        single = isinstance(inputs, str)
+        request = EncodeRequest(
+            inputs=[inputs] if single else list(inputs), kwargs=kwargs, single=single
+        )
+        self._start()
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="ix-encode-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self, first: EncodeRequest) -> List[EncodeRequest]:
+        """Collect requests until the batch is full or the wait expires"""
+        requests = [first]
+        size = len(first.inputs)
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                # closing, run what was collected first
+                self._queue.put(None)
+                break
+            requests.append(request)
+            size += len(request.inputs)
+        return requests
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            groups: Dict[str, List[EncodeRequest]] = {}
+            for request in self._collect(first):
+                groups.setdefault(request.kwargs_key, []).append(request)
+            for group in groups.values():
+                self._run_batch(group)
+
+    def _run_batch(self, requests: List[EncodeRequest]) -> None:
+        inputs = [value for request in requests for value in request.inputs]
+        try:
+            rows = self._encode(inputs, **requests[0].kwargs)
+        except BaseException as e:
+            for request in requests:
+                request.error = e
+                request.done.set()
+            return
+
+        self.batches += 1
+        logger.debug(f"Encoded batch requests={len(requests)} inputs={len(inputs)}")
+        start = 0
+        for request in requests:
+            end = start + len(request.inputs)
+            request.result = rows[start] if request.single else rows[start:end]
+            start = end
+            request.done.set()
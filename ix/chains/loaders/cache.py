@@ -0,0 +1,156 @@
+import logging
+from typing import Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+from langchain.schema.runnable import Runnable
+
+from ix.chains.loaders.context import IxContext
+from ix.chains.loaders.core import init_chain_flow, ainit_chain_flow, is_lazy_type
+from ix.chains.loaders.graph import ChainGraph
+from ix.chains.loaders.plan import compile_flow_plan
+from ix.chains.models import Chain, NodeType
+from ix.utils.cache import LRUCache
+from ix.utils.executors import run_in_executor
+
+logger = logging.getLogger(__name__)
+
+
+# Node types that build their config from the IxContext when loaded (e.g. memory
+# session scopes). Flows containing them are bound to a single task and can't be
+# shared between tasks.
+CONTEXT_BOUND_TYPES = {"memory", "memory_backend"}
+
+# Connectors that load their nodes as tools. Tools run their flows with the
+# context they were loaded with instead of the context of the run.
+TOOL_CONNECTOR_TYPE = "tool"
+
+# marker for chains that were checked and can't be cached.
+UNCACHEABLE = object()
+
+FlowCacheKey = Tuple[str, int, Optional[str]]
+
+flow_cache: LRUCache[FlowCacheKey, Runnable] = LRUCache(
+    max_size=settings.FLOW_CACHE_SIZE, ttl=settings.FLOW_CACHE_TTL
+)
+
+
+def get_flow_key(chain: Chain, context: IxContext) -> FlowCacheKey:
+    """Flows are cached per user since nodes are loaded with the user's secrets"""
+    user_id = str(context.user_id) if context.user_id else None
+    return str(chain.id), chain.revision, user_id
+
+
+def is_context_bound(node_type: NodeType) -> bool:
+    """Does this node type depend on the IxContext it is loaded with?
+
+    Lazy nodes and tools keep the context they were loaded with, they would run
+    with the task that compiled the flow.
+    """
+    return (
+        node_type.type in CONTEXT_BOUND_TYPES
+        or bool(node_type.context)
+        or is_lazy_type(node_type)
+        or any(
+            connector.get("template", False)
+            or connector.get("as_type", None) == TOOL_CONNECTOR_TYPE
+            for connector in node_type.connectors or []
+        )
+    )
+
+
+def is_flow_cacheable(chain: Chain) -> bool:
+    """A flow may be shared between tasks if none of its nodes are context bound."""
+    node_types = NodeType.objects.filter(chainnode__chain_id=chain.id).distinct()
+    return not any(is_context_bound(node_type) for node_type in node_types)
+
+
+def load_cached_chain_flow(chain: Chain, context: IxContext) -> Runnable:
+    """Load the compiled flow for a chain.
+
+    The flow is compiled once per (chain_id, revision, user_id) and reused by later
+    tasks of the user in this process. The context passed here is only used to
+    compile the flow. Callers must pass the context for the run as `ix_context` in
+    the RunnableConfig.
+    """
+    if not settings.FLOW_CACHE_ENABLED:
+        return init_chain_flow(chain, context=context)
+
+    key = get_flow_key(chain, context)
+    flow = flow_cache.get(key)
+    if flow is UNCACHEABLE:
+        return init_chain_flow(chain, context=context)
+    elif flow is not None:
+        logger.debug(f"Using cached flow chain_id={chain.id} revision={key[1]}")
+        return flow
+
+    if not is_flow_cacheable(chain):
+        flow_cache.set(key, UNCACHEABLE)
+        return init_chain_flow(chain, context=context)
+
+    flow = init_chain_flow(chain, context=context)
+    flow_cache.set(key, flow)
+    return flow
+
+
+async def ais_flow_cacheable(chain: Chain) -> bool:
+    """A flow may be shared between tasks if none of its nodes are context bound."""
+    node_types = NodeType.objects.filter(chainnode__chain_id=chain.id).distinct()
+    return not any([is_context_bound(node_type) async for node_type in node_types])
+
+
+async def aload_cached_chain_flow(chain: Chain, context: IxContext) -> Runnable:
+    """Load the compiled flow for a chain. See load_cached_chain_flow."""
+    if not settings.FLOW_CACHE_ENABLED:
+        return await ainit_chain_flow(chain, context=context)
+
+    key = get_flow_key(chain, context)
+    flow = flow_cache.get(key)
+    if flow is UNCACHEABLE:
+        return await ainit_chain_flow(chain, context=context)
+    elif flow is not None:
+        logger.debug(f"Using cached flow chain_id={chain.id} revision={key[1]}")
+        return flow
+
+    if not await ais_flow_cacheable(chain):
+        flow_cache.set(key, UNCACHEABLE)
+        return await ainit_chain_flow(chain, context=context)
+
+    flow = await ainit_chain_flow(chain, context=context)
+    flow_cache.set(key, flow)
+    return flow
+
+
+def evict_chain_flow(chain_id: UUID | str) -> int:
+    """Remove all cached revisions of a chain from this process's cache"""
+    chain_id = str(chain_id)
+    return flow_cache.evict(lambda key: key[0] == chain_id)
+
+
+def invalidate_chain_flow(chain_id: UUID | str) -> None:
+    """Increment the chain revision so all processes rebuild the flow.
+
+    The flow plan is recompiled for the new revision. The chain is locked while the
+    plan is compiled so concurrent edits can't save a plan compiled from a stale
+    graph under a newer revision.
+    """
+    with transaction.atomic():
+        chain = Chain.objects.select_for_update().only("revision").get(id=chain_id)
+        revision = chain.revision + 1
+        plan, error = compile_flow_plan(ChainGraph.load(chain_id))
+        if plan is not None:
+            plan["revision"] = revision
+        Chain.objects.filter(id=chain_id).update(
+            revision=revision, flow_plan=plan, flow_plan_error=error
+        )
+    evict_chain_flow(chain_id)
+
+
+async def ainvalidate_chain_flow(chain_id: UUID | str) -> None:
+    """Increment the chain revision so all processes rebuild the flow.
+
+    See invalidate_chain_flow. Runs on the db executor since the lock is held in a
+    transaction.
+    """
+    await run_in_executor("db", invalidate_chain_flow, chain_id)
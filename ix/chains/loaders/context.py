@@ -1,20 +1,18 @@
-import asyncio
 import logging
 from datetime import datetime
-from typing import Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from uuid import UUID, uuid4
 from zoneinfo import ZoneInfo
 
-from django.conf import settings
 from django.db.models import Q
 from langchain.schema.runnable.utils import Input
 from pydantic import BaseModel
 
 from ix.chat.models import Chat
-from ix.runnable_log.models import RunnableExecution
+from ix.runnable_log.buffer import RunLogBuffer
+from ix.runnable_log.policy import RunLogPolicy, get_run_log_policy
 from ix.runnable_log.subscription import RunEventSubscription
 from ix.task_log.models import Task
-from ix.utils.json import to_json_serializable
 
 logger = logging.getLogger(__name__)
 
@@ -26,18 +24,39 @@ def now() -> datetime:
 
 
 class Listener:
+    """Logs the execution of a runnable and its children.
+
+    Executions are written by a RunLogBuffer shared by the listener's children. The
+    root listener flushes the buffer when its run ends.
+
+    Logging follows the RunLogPolicy for the node. The root listener decides if the
+    run is sampled and its children follow that decision.
+    """
+
     run: dict = {}
     parent: Optional["Listener"] = None
+    policy: RunLogPolicy = RunLogPolicy()
+    sampled: bool = True
 
     def __init__(self, context: "IxContext", parent: Optional["Listener"] = None):
         self.context = context
         self.parent = parent
+        self.log_buffer = parent.log_buffer if parent else RunLogBuffer()
 
-    def on_start(self, node_id: UUID, input: Input) -> None:
+    def on_start(
+        self, node_id: UUID, input: Input, class_path: Optional[str] = None
+    ) -> None:
+        self.policy = get_run_log_policy(self.context.chain_id, class_path)
         if self.parent:
             parent_id = str(self.parent.run["id"])
+            self.sampled = self.parent.sampled
         else:
             parent_id = None
+            self.sampled = self.policy.sample()
+
+        # inputs are serialized when logged in case an unsampled run errors
+        self.input = input
+        self.encoded = {}
 
         self.run = {
             "id": str(uuid4()),
@@ -46,10 +65,13 @@ class Listener:
             "parent_id": parent_id,
             "node_id": str(node_id),
             "started_at": datetime.now(tz=ZoneInfo("America/Los_Angeles")),
-            "inputs": to_json_serializable(input, truncate=False),
+            "inputs": None,
             "completed": False,
         }
 
+        if not self.policy.should_log(self.sampled):
+            return
+        self.serialize("inputs", input)
         RunEventSubscription.on_execution(
             chain_id=self.context.chain_id,
             event=self.run,
@@ -61,29 +83,42 @@ class Listener:
 
     async def aon_end(self, output):
         await self.alog_run(output, completed=True)
-        pass
+        await self.aflush()
 
     async def on_error(self, exception: Exception):
         await self.alog_run(output={}, message=str(exception), completed=False)
+        await self.aflush()
+
+    async def aflush(self):
+        """Write buffered executions when the root run ends"""
+        if self.parent is None:
+            await self.log_buffer.aflush()
+
+    def serialize(self, field: str, value: Any) -> None:
+        """Serialize an input or output to send and log"""
+        encoded = self.policy.serialize(value)
+        self.encoded[field] = encoded
+        self.run[field] = encoded.data
 
     async def alog_run(self, output, message: str = None, completed: bool = True):
-        if not settings.RUNNABLE_LOG_ENABLED:
+        if not self.policy.should_log(self.sampled, error=not completed):
             return
+        if not self.sampled:
+            self.serialize("inputs", self.input)
 
         self.run.update(
             dict(
                 completed=completed,
                 message=message,
-                outputs=to_json_serializable(output, truncate=False),
                 finished_at=datetime.now(tz=ZoneInfo("America/Los_Angeles")),
             )
         )
-        await asyncio.gather(
-            RunEventSubscription.aon_execution(
-                chain_id=self.context.chain_id,
-                event=self.run,
-            ),
-            RunnableExecution.objects.acreate(**self.run),
+        self.serialize("outputs", output)
+        # the database reuses the encoded inputs and outputs
+        self.log_buffer.add({**self.run, **self.encoded})
+        await RunEventSubscription.aon_execution(
+            chain_id=self.context.chain_id,
+            event=self.run,
         )
 
     @property
@@ -1,12 +1,24 @@
 import dataclasses
-import itertools
+import functools
 import logging
 import time
-from collections import defaultdict
-from typing import Callable, Any, List, Tuple, Dict, Set, Union, Type
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Callable,
+    Any,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Dict,
+    Set,
+    Union,
+    Type,
+)
 from uuid import UUID
 
-from asgiref.sync import sync_to_async
+from django.conf import settings
 from langchain.schema.runnable import (
     RunnableSerializable,
     RunnableParallel,
@@ -18,18 +30,34 @@ from pydantic import BaseModel
 
 from ix.api.components.types import NodeType as NodeTypePydantic
 from ix.api.chains.types import Node as NodePydantic, InputConfig
+from ix.chains.components.embeddings import (
+    CachedEmbeddings,
+    get_embedding_cache,
+    get_embedding_model,
+)
 from ix.chains.components.lcel import init_sequence, init_branch
 from ix.chains.loaders.context import IxContext
+from ix.chains.loaders.executor import run_loaders
+from ix.chains.loaders.graph import ChainGraph
+from ix.chains.loaders.local_models import is_local_model, local_model_registry
+from ix.chains.loaders.pool import init_pooled
+from ix.chains.loaders.profile import (
+    profile_node,
+    profile_step,
+    record_secret_reads,
+)
 
 from ix.chains.loaders.prompts import load_prompt
+from ix.chains.loaders.registry import node_type_registry
 from ix.chains.loaders.templates import NodeTemplate
 from ix.chains.models import NodeType, ChainNode, ChainEdge, Chain
 from ix.runnable.flow import MergeList
-from ix.runnable.ix import IxNode
-from ix.secrets.models import Secret
+from ix.runnable.ix import IxNode, LazyIxNode
+from ix.secrets.resolver import read_secrets
 from ix.utils.config import format_config
+from ix.utils.executors import run_in_executor
 from ix.utils.importlib import import_class
-from jsonschema_pydantic import jsonschema_to_pydantic
+from ix.utils.pydantic import jsonschema_to_model
 
 import_node_class = import_class
 
@@ -69,11 +97,12 @@ def get_property_loader(name: str) -> Callable:
     }.get(name, None)
 
 
-def get_node_initializer(node_type: str) -> Callable:
+def get_node_initializer(node_type: str, context: IxContext = None) -> Callable:
     """Get a node initializer
 
     Fetches a custom initializer to be used instead of the class initializer.
-    Used to add shims around specific types of nodes.
+    Used to add shims around specific types of nodes. Initializers that act on
+    behalf of the user (e.g. ingesting into a DataSource) are bound to the context.
     """
     from ix.chains.loaders.vectorstore import initialize_vectorstore
     from ix.runnable.documents import RunLoader, RunTransformer
@@ -82,40 +111,124 @@ def get_node_initializer(node_type: str) -> Callable:
         "document_loader": RunLoader.from_config,
         "text_splitter": RunTransformer.from_config,
         "transformer": RunTransformer.from_config,
-        "vectorstore": initialize_vectorstore,
+        "vectorstore": functools.partial(initialize_vectorstore, context=context),
     }.get(node_type, None)
 
 
-def load_secrets(config: dict, node_type: NodeType):
-    """Load secrets from vault into the config dict"""
+# secrets resolved for the graphs of the flow being initialized. Values are kept
+# for one initialization instead of on the graph since compiled flows may be
+# cached and shared. See graph_secrets_scope.
+_graph_secrets: ContextVar[
+    Optional[Dict[Tuple[int, str], Dict[str, dict]]]
+] = ContextVar("ix_graph_secrets", default=None)
+
+
+@contextmanager
+def graph_secrets_scope() -> Iterator[None]:
+    """Share secrets resolved for a graph while a flow is initialized.
 
-    if not node_type.fields:
+    Nodes loaded outside a scope, e.g. lazy nodes, read their own secrets. Those
+    reads are served by the secret cache.
+    """
+    if _graph_secrets.get() is not None:
+        yield
         return
 
-    # build map of secrets to load
-    to_load = set()
-    for field in node_type.fields:
-        if field["input_type"] == "secret":
-            if field["name"] not in config:
-                continue
-            secret_id = config[field["name"]]
-            if secret_id:
-                to_load.add(secret_id)
-
-    # load secrets and update config
-    # TODO: need user here to limit access to secrets
-    secrets = Secret.objects.filter(id__in=set(to_load))
-    for secret in secrets:
-        try:
-            value = secret.read()
-        except Exception as e:
-            logger.error(f"Failed to load secret {secret.id}: {e}")
-            raise Exception(f"Failed to load secret: {secret.id}")
-        to_load.remove(str(secret.id))
-        config.update(value)
-
-    if to_load:
-        raise ValueError(f"Secrets not found: {to_load}")
+    token = _graph_secrets.set({})
+    try:
+        yield
+    finally:
+        _graph_secrets.reset(token)
+
+
+def get_secret_ids(config: dict, node_type: NodeType) -> Set[str]:
+    """Return ids of the secrets referenced by a config"""
+    secret_fields = node_type_registry.get(node_type).secret_fields
+    return {
+        str(config[field_name])
+        for field_name in secret_fields or []
+        if config.get(field_name, None)
+    }
+
+
+def load_graph_secrets(
+    graph: ChainGraph, user_id: str = None
+) -> Tuple[Dict[str, dict], Dict[str, Exception]]:
+    """Resolve the secrets of every node in the graph at once.
+
+    Returns values and read errors by secret id. A secret that fails to read only
+    fails the nodes that use it.
+
+    Values are kept for the graph_secrets_scope so each node loaded from the graph
+    can use them without another read. Errors aren't kept, failed secrets are read
+    again by the next node that uses them. Concurrent loaders may both resolve the
+    values, the reads are cached.
+    """
+    scope = _graph_secrets.get()
+    key = (id(graph), user_id)
+    if scope is not None and key in scope:
+        return scope[key], {}
+
+    secret_ids = set()
+    for graph_node in graph.nodes.values():
+        secret_ids.update(get_secret_ids(graph_node.config or {}, graph_node.node_type))
+    errors = {}
+    secrets = (
+        read_secrets(
+            secret_ids, user_id=user_id, errors=errors, on_read=record_secret_reads
+        )
+        if secret_ids
+        else {}
+    )
+    if scope is not None:
+        scope[key] = secrets
+    return secrets, errors
+
+
+def load_secrets(
+    config: dict,
+    node_type: NodeType,
+    context: IxContext = None,
+    graph: ChainGraph = None,
+):
+    """Load secrets from vault into the config dict
+
+    When a graph is given within a graph_secrets_scope, the secrets for every node
+    in the graph are resolved together the first time any of them are needed.
+    """
+    to_load = get_secret_ids(config, node_type)
+    if not to_load:
+        return
+
+    user_id = context.user_id if context else None
+    try:
+        use_graph = graph is not None and _graph_secrets.get() is not None
+        secrets, errors = load_graph_secrets(graph, user_id) if use_graph else ({}, {})
+        missing = to_load - set(secrets) - set(errors)
+        if missing:
+            # read outside a scope, failed for an earlier node, or config was
+            # formatted with values that weren't in the graph
+            errors = dict(errors)
+            read = read_secrets(
+                missing, user_id=user_id, errors=errors, on_read=record_secret_reads
+            )
+            secrets = {**secrets, **read}
+    except Exception as e:
+        logger.error(f"Failed to load secrets {to_load}: {e}")
+        raise Exception(f"Failed to load secrets: {to_load}")
+
+    failed = to_load & set(errors)
+    if failed:
+        for secret_id in sorted(failed):
+            logger.error(f"Failed to load secret {secret_id}: {errors[secret_id]}")
+        raise Exception(f"Failed to load secrets: {failed}")
+
+    not_found = to_load - set(secrets)
+    if not_found:
+        raise ValueError(f"Secrets not found: {not_found}")
+
+    for secret_id in sorted(to_load):
+        config.update(secrets[secret_id])
 
 
 def load_flow_props(
@@ -130,14 +243,13 @@ def load_flow_props(
     Returns a dict of props that can be merged into the nodes config dict.
     """
     config = {}
-    properties = node.outgoing_edges.filter(relation="PROP").order_by("source_key")
-
-    for group in itertools.groupby(properties, lambda x: x.source_key):
-        key, edges = group
-        edge_group: List[ChainEdge] = [edge for edge in edges]
+    graph = ChainGraph.for_node(node)
+    properties = graph.outgoing(node, relation="PROP")
+    connectors = node_type_registry.get(node_type).connectors
 
+    for key, edge_group in ChainGraph.group_by(properties, "source_key"):
         # ignore non-flow collections
-        connector = node_type.connectors_as_dict.get(key, None)
+        connector = connectors.get(key, None)
         if connector is None or not connector.get("collection", None) == "flow":
             continue
 
@@ -164,18 +276,29 @@ def load_node(
     load any properties that are attached to the node. The loader also handles
     recursively loading any child nodes that are attached to the node.
     """
+    with profile_node(node):
+        return _load_node(node, context, variables=variables, as_template=as_template)
 
+
+def _load_node(
+    node: ChainNode,
+    context: IxContext,
+    variables: Dict[str, Any] = None,
+    as_template: bool = False,
+) -> Any:
     logger.debug(f"Loading chain for name={node.name} class_path={node.class_path}")
     start_time = time.time()
+    graph = ChainGraph.for_node(node)
+    node = graph.get_node(node)
     node_type: NodeType = node.node_type
-    node_type_pydantic = NodeTypePydantic.model_validate(node_type)
+    node_type_entry = node_type_registry.get(node_type)
 
     # HAX: validate configs for component types that aren't implemented as pydantic
     # models. This is a temporary solution until configs are validated at the API
     # endpoints.
     config = node.config or {}
     if node_type.type in {"transform", "document_loader", "text_splitter"}:
-        node_type_model = jsonschema_to_pydantic(node_type.config_schema)
+        node_type_model = jsonschema_to_model(node_type.config_schema)
         config = node_type_model(**config).model_dump()
 
     # TODO: implement resolve secrets from vault and settings from vocabulary
@@ -189,7 +312,7 @@ def load_node(
         config = format_config(config, variables)
     elif as_template:
         return NodeTemplate(node, context)
-    load_secrets(config, node_type)
+    load_secrets(config, node_type, context=context, graph=graph)
 
     # load type specific config options. This is generally for loading
     # ix specific features into the config dict
@@ -200,28 +323,29 @@ def load_node(
         config = node_loader(node, context)
 
     # prepare properties for loading. Properties should be grouped by key.
-    properties = (
-        node.incoming_edges.filter(relation="PROP")
-        .exclude(target_key="in")
-        .order_by("target_key")
-    )
-    for group in itertools.groupby(properties, lambda x: x.target_key):
-        key, edges = group
-        edge_group: List[ChainEdge] = [edge for edge in edges]
+    properties = [
+        edge
+        for edge in graph.incoming(node, relation="PROP")
+        if edge.target_key != "in"
+    ]
+    # Property subtrees are independent of each other. Loaders are gathered here
+    # and run concurrently by run_loaders.
+    property_loaders = []
+    for key, edge_group in ChainGraph.group_by(properties, "target_key"):
         logger.debug(f"Loading property target_key={key} edge_group={edge_group}")
 
         # choose the type the incoming connection is processed as. If the source node
         # will be converted to another type, use the as_type defined on the connection
         # this allows a single property loader to encapsulate any necessary conversions.
         # e.g. retriever converting Vectorstore.
-        connector = node_type.connectors_as_dict[key]
+        connector = node_type_entry.connectors[key]
         as_type = connector.get("as_type", None) or edge_group[0].source.node_type.type
         connector_is_template = connector.get("template", False)
 
         if connector.get("collection", None):
             # load connector as a collection
-
-            config[key] = load_collection(
+            loader = functools.partial(
+                load_collection,
                 connector,
                 edge_group,
                 context,
@@ -233,28 +357,30 @@ def load_node(
             # load type specific config options. This is generally for loading
             # ix specific features into the config dict
             logger.debug(f"Loading with property loader for type={node_type.type}")
-            config[key] = property_loader(edge_group, context)
+            loader = functools.partial(property_loader, edge_group, context)
         else:
             # default recursive property loading
             if connector.get("multiple", False):
-                config[key] = [
-                    load_node(
-                        edge.source,
-                        context,
-                        variables=variables,
-                        as_template=connector_is_template,
-                    )
-                    for edge in edge_group
-                ]
+                loader = functools.partial(
+                    load_nodes,
+                    [edge.source for edge in edge_group],
+                    context,
+                    variables=variables,
+                    as_template=connector_is_template,
+                )
             else:
                 if len(edge_group) > 1:
                     raise ValueError(f"Multiple values for {key} not allowed")
-                config[key] = load_node(
+                loader = functools.partial(
+                    load_node,
                     edge_group[0].source,
                     context,
                     variables=variables,
                     as_template=connector_is_template,
                 )
+        property_loaders.append((key, loader))
+
+    config.update(run_loaders(property_loaders))
 
     config.update(
         load_flow_props(
@@ -268,19 +394,15 @@ def load_node(
     # converted flattened property groups back into nested properties. Fields with
     # the same parent are grouped together into a single object. By default, groups
     # are dicts but this can be overridden by setting the field_group's class_path
-    property_groups = defaultdict(list)
-    for field in node_type.fields or []:
-        if field.get("parent"):
-            property_groups[field["parent"]].append(field)
-    for key, property_group_fields in property_groups.items():
+    for key, property_group_fields in node_type_entry.property_groups.items():
         logger.debug(f"key={key} property_group_fields={property_group_fields}")
         config[key] = {
-            field["name"]: config.pop(field["name"])
-            for field in property_group_fields
-            if field["name"] in config
+            field_name: config.pop(field_name)
+            for field_name in property_group_fields
+            if field_name in config
         }
-    if node_type.field_groups:
-        for key, field_group in node_type.field_groups.items():
+    if node_type_entry.field_groups:
+        for key, field_group in node_type_entry.field_groups.items():
             if field_group_class_path := field_group.get("class_path"):
                 config[key] = import_node_class(field_group_class_path)(**config[key])
 
@@ -292,36 +414,68 @@ def load_node(
 
     # load component class and initialize. A type specific initializer may be used here
     # for initialization common to all components of that type.
-    node_class = import_node_class(node.class_path)
-    node_initializer = get_node_initializer(node_type.type)
+    with profile_step("import_time"):
+        node_class = import_node_class(node.class_path)
+    node_initializer = get_node_initializer(node_type.type, context)
 
     # use name and description from ChainNode.
-    if "name" not in config and "name" in node_type_pydantic.field_map:
+    if "name" not in config and "name" in node_type_entry.field_map:
         config["name"] = node.name
-    if "description" not in config and "description" in node_type_pydantic.field_map:
+    if "description" not in config and "description" in node_type_entry.field_map:
         config["description"] = node.description
 
+    # the embedding cache is applied by the loader, not passed to the component.
+    embedding_cache = None
+    if node_type.type == "embeddings":
+        embedding_cache = config.pop("embedding_cache", None)
+
     # filter out config values that are not passed to the initializer
-    if node_type_pydantic.init_exclude:
+    if node_type_entry.init_exclude:
         config = {
             key: value
             for key, value in config.items()
-            if key not in node_type_pydantic.init_exclude
+            if key not in node_type_entry.init_exclude
         }
 
     try:
-        if node_initializer:
-            instance = node_initializer(node.class_path, config)
-        else:
-            instance = node_class(**config)
+        with profile_step("init_time"):
+            if node_initializer:
+                instance = node_initializer(node.class_path, config)
+            elif is_local_model(node.class_path):
+                instance = local_model_registry.load(
+                    node.class_path, node_class, config
+                )
+            else:
+                instance = init_pooled(node_type, node.class_path, node_class, config)
     except Exception:
         logger.error(f"Exception loading node class={node.class_path}")
         raise
+
+    if embedding_cache and embedding_cache != "none":
+        instance = CachedEmbeddings(
+            instance,
+            class_path=node.class_path,
+            model=get_embedding_model(config),
+            cache=get_embedding_cache(embedding_cache),
+        )
     logger.debug(f"Loaded node class={node.class_path} in {time.time() - start_time}s")
 
     return instance
 
 
+def load_nodes(
+    nodes: List[ChainNode],
+    context: IxContext,
+    variables: Dict[str, Any] = None,
+    as_template: bool = False,
+) -> List[Any]:
+    """Load a list of nodes connected to a property that accepts multiple values"""
+    return [
+        load_node(node, context, variables=variables, as_template=as_template)
+        for node in nodes
+    ]
+
+
 def load_collection(
     connector: dict,
     edge_group: List[ChainEdge],
@@ -516,8 +670,34 @@ def init_chain_flow(
     Initialize a flow from a chain.
     """
     input_type, flow_root = load_chain_flow(chain=chain)
-    logger.debug(f"init_chain_flow chain={chain.id} flow_root={flow_root}")
-    flow = init_flow_node(flow_root, context=context, variables=variables)
+    return init_chain_flow_root(input_type, flow_root, context, variables)
+
+
+async def ainit_chain_flow(
+    chain: Chain, context: IxContext, variables: Dict[str, Any] = None
+) -> Runnable:
+    """
+    Initialize a flow from a chain.
+
+    The graph is loaded with the async ORM. Components are initialized with their
+    synchronous initializers on the db executor, so concurrent chats in a worker
+    initialize their flows in parallel.
+    """
+    input_type, flow_root = await aload_chain_flow(chain=chain)
+    return await run_in_executor(
+        "db", init_chain_flow_root, input_type, flow_root, context, variables
+    )
+
+
+def init_chain_flow_root(
+    input_type: Type[BaseModel],
+    flow_root: FlowPlaceholder,
+    context: IxContext,
+    variables: Dict[str, Any] = None,
+) -> Runnable:
+    logger.debug(f"init_chain_flow flow_root={flow_root}")
+    with graph_secrets_scope():
+        flow = init_flow_node(flow_root, context=context, variables=variables)
 
     # Add the root's schema as the outward facing input_type using a passthrough.
     if isinstance(flow, Runnable):
@@ -527,12 +707,6 @@ def init_chain_flow(
     return flow
 
 
-async def ainit_chain_flow(
-    chain: Chain, context: IxContext, variables: Dict[str, Any] = None
-):
-    return await sync_to_async(init_chain_flow)(chain, context, variables)
-
-
 def init_flow(
     nodes: List[ChainNode],
     context: IxContext,
@@ -540,41 +714,85 @@ def init_flow(
     seen: Dict[UUID, "FlowPlaceholder"] = None,
 ) -> Runnable[Input, Output] | List[Runnable[Input, Output]]:
     flow_roots = load_flow_node(nodes, seen=seen)
+    return init_flow_roots(flow_roots, context, variables)
+
+
+async def ainit_flow(
+    nodes: List[ChainNode],
+    context: IxContext,
+    variables: Dict[str, Any] = None,
+    seen: Dict[UUID, "FlowPlaceholder"] = None,
+) -> Runnable[Input, Output] | List[Runnable[Input, Output]]:
+    flow_roots = await aload_flow_node(nodes, seen=seen)
+    return await run_in_executor("db", init_flow_roots, flow_roots, context, variables)
+
+
+def init_flow_roots(
+    flow_roots: FlowPlaceholder | List[FlowPlaceholder],
+    context: IxContext,
+    variables: Dict[str, Any] = None,
+) -> Runnable[Input, Output] | List[Runnable[Input, Output]]:
     if not isinstance(flow_roots, list):
         flow_roots = [flow_roots]
 
     flows = []
-    for flow_root in flow_roots:
-        flows.append(init_flow_node(flow_root, context=context, variables=variables))
+    with graph_secrets_scope():
+        for flow_root in flow_roots:
+            flows.append(
+                init_flow_node(flow_root, context=context, variables=variables)
+            )
 
     if len(flows) == 1:
         return flows[0]
     return flows
 
 
-async def ainit_flow(
-    nodes: List[ChainNode],
-    context: IxContext,
-    variables: Dict[str, Any] = None,
-    seen: Dict[UUID, "FlowPlaceholder"] = None,
-) -> Runnable:
-    return await sync_to_async(init_flow)(nodes, context, variables, seen)
+def load_chain_flow(chain: Chain) -> Tuple[Type[BaseModel], FlowPlaceholder]:
+    from ix.chains.loaders.plan import load_flow_plan, save_flow_plan
 
+    graph = ChainGraph.load(chain.id)
 
-def load_chain_flow(chain: Chain) -> Tuple[Type[BaseModel], FlowPlaceholder]:
-    try:
-        nodes = chain.nodes.filter(incoming_edges__source=chain.chat_root)
-    except ChainNode.DoesNotExist:
-        # fallback to old style roots:
-        # TODO: remove this fallback after all chains have been migrated
-        nodes = chain.nodes.filter(root=True)
-        logger.debug(f"Loading chain flow with roots: {nodes}")
+    # use the plan compiled when the chain was saved when available.
+    flow = load_flow_plan(chain, graph)
+    if flow is None:
+        flow = load_flow_node(get_flow_roots(graph))
+        save_flow_plan(chain, flow)
 
-    return chain.types.INPUT, load_flow_node(nodes)
+    return get_input_type(chain, graph), flow
 
 
 async def aload_chain_flow(chain: Chain) -> Tuple[Type[BaseModel], FlowPlaceholder]:
-    return await sync_to_async(load_chain_flow)(chain)
+    from ix.chains.loaders.plan import load_flow_plan, asave_flow_plan
+
+    graph = await ChainGraph.aload(chain.id)
+
+    # use the plan compiled when the chain was saved when available.
+    flow = load_flow_plan(chain, graph)
+    if flow is None:
+        flow = load_flow_node(get_flow_roots(graph))
+        await asave_flow_plan(chain, flow)
+
+    return get_input_type(chain, graph), flow
+
+
+def get_input_type(chain: Chain, graph: ChainGraph) -> Type[BaseModel]:
+    """Input type for the chain, built from the chat root in the graph."""
+    if "types" not in chain.__dict__:
+        chain.types = Chain.build_types(graph.chat_root)
+    return chain.types.INPUT
+
+
+def get_flow_roots(graph: ChainGraph) -> List[ChainNode]:
+    """Return the nodes a chain's flow starts from."""
+    if chat_root := graph.chat_root:
+        target_ids = {edge.target_id for edge in graph.outgoing(chat_root)}
+        return [node for node in graph.nodes.values() if node.id in target_ids]
+
+    # fallback to old style roots:
+    # TODO: remove this fallback after all chains have been migrated
+    nodes = graph.roots
+    logger.debug(f"Loading chain flow with roots: {nodes}")
+    return nodes
 
 
 def load_flow_node(
@@ -587,6 +805,10 @@ def load_flow_node(
     if len(nodes) == 0:
         raise ValueError("No root nodes found")
 
+    # traverse the indexed instances of the nodes
+    graph = ChainGraph.for_node(nodes[0])
+    nodes = [graph.add_node(node) for node in nodes]
+
     branch_depth = tuple()
     seen = seen or {}
     if len(nodes) == 1:
@@ -597,7 +819,12 @@ def load_flow_node(
 async def aload_flow_node(
     nodes: List[ChainNode], seen: Dict[UUID, "FlowPlaceholder"] = None
 ) -> FlowPlaceholder | List[FlowPlaceholder]:
-    return await sync_to_async(load_flow_node)(nodes, seen)
+    if len(nodes) == 0:
+        raise ValueError("No root nodes found")
+
+    # fetch the graph with the async ORM. Traversal is in memory.
+    graph = await ChainGraph.afor_node(nodes[0])
+    return load_flow_node([graph.add_node(node) for node in nodes], seen=seen)
 
 
 def load_flow_map(
@@ -651,9 +878,8 @@ def build_flow_branch(
     branch_depth: Tuple[str] = None,
 ):
     branches = {}
-    for key, group in itertools.groupby(outgoing_links, lambda edge: edge.source_key):
+    for key, group_as_list in ChainGraph.group_by(outgoing_links, "source_key"):
         _branch_depth = branch_depth + (key,) if branch_depth else (key,)
-        group_as_list = list(group)
         if len(group_as_list) > 1:
             targets = [edge.target for edge in group_as_list]
             nodes = load_flow_map(targets, seen=seen, branch_depth=_branch_depth)
@@ -681,11 +907,7 @@ def load_flow_branch(
     branch_depth: Tuple[str] = None,
 ) -> BranchPlaceholder:
     # gather branches
-    outgoing_links = (
-        node.outgoing_edges.select_related("target")
-        .filter(relation="LINK")
-        .order_by("source_key")
-    )
+    outgoing_links = ChainGraph.for_node(node).outgoing(node, relation="LINK")
 
     branches, branch_tuples = build_flow_branch(
         node, outgoing_links, seen, branch_depth
@@ -709,6 +931,7 @@ def load_flow_sequence(
     branch_depth: Tuple[str] = None,
 ) -> Runnable | SequencePlaceholder:
     sequential_nodes = []
+    graph = ChainGraph.for_node(start)
 
     # traverse the sequence
     current = start
@@ -716,10 +939,8 @@ def load_flow_sequence(
     while infinite_loop_safety_count < 1000:
         infinite_loop_safety_count += 1
 
-        outgoing_links = list(
-            current.outgoing_edges.select_related("target").filter(relation="LINK")
-        )
-        incoming_links = list(current.incoming_edges.filter(relation="LINK"))
+        outgoing_links = graph.outgoing(current, relation="LINK")
+        incoming_links = graph.incoming(current, relation="LINK")
 
         # single outgoing link
         # TODO: non map nodes with multiple incoming links require a map node.
@@ -756,8 +977,8 @@ def load_flow_sequence(
                 # has incoming links
                 # resolve the map edge hash into the key
                 try:
-                    incoming_link = current.incoming_edges.get(
-                        relation="LINK", source_id=sequential_nodes[-1].id
+                    incoming_link = graph.get_edge(
+                        source=sequential_nodes[-1].id, target=current, relation="LINK"
                     )
                 except ChainEdge.DoesNotExist:
                     raise Exception(
@@ -776,7 +997,9 @@ def load_flow_sequence(
                 else:
                     # implicit map & aggregator
                     map_key = incoming_link.target_key
-                    connector = current.node_type.connectors_as_dict.get(map_key, None)
+                    connector = node_type_registry.get(
+                        current.node_type
+                    ).connectors.get(map_key, None)
 
                     # current sequence + join target stored.
                     next_node = ImplicitJoin(source=sequential_nodes, target=node_map)
@@ -892,6 +1115,50 @@ def get_input_config(node: ChainNode, node_type: NodeTypePydantic) -> InputConfi
     )
 
 
+# types with initializers that wrap the component in a Runnable
+RUNNABLE_INITIALIZER_TYPES = {"document_loader", "text_splitter", "transformer"}
+
+
+def is_lazy_type(node_type: NodeType) -> bool:
+    """Should nodes of this type be loaded when they are first run?"""
+    if node_type.lazy is None:
+        return node_type.type in settings.LAZY_NODE_TYPES
+    return node_type.lazy
+
+
+def loads_runnable(node: ChainNode) -> bool:
+    """Does the node load as a Runnable? Only Runnables may be loaded lazily."""
+    node_type = node.node_type
+    if node_type.type in RUNNABLE_INITIALIZER_TYPES:
+        return True
+    elif get_node_initializer(node_type.type):
+        return False
+
+    try:
+        node_class = import_node_class(node.class_path)
+    except Exception:
+        return False
+    return isinstance(node_class, type) and issubclass(node_class, Runnable)
+
+
+def is_lazy_node(node: ChainNode) -> bool:
+    """A flow node is loaded lazily if it or any node in its property subtree is a
+    lazy type.
+    """
+    graph = ChainGraph.for_node(node)
+    subtree = [node]
+    visited = set()
+    while subtree:
+        current = subtree.pop()
+        if current.id in visited:
+            continue
+        visited.add(current.id)
+        if is_lazy_type(current.node_type):
+            return loads_runnable(node)
+        subtree.extend(edge.source for edge in graph.incoming(current, relation="PROP"))
+    return False
+
+
 def init_flow_node(
     root: FlowPlaceholder,
     context: IxContext,
@@ -903,7 +1170,21 @@ def init_flow_node(
     Assumes a collection of ChainNodes and placeholders constructed by load_flow.
     """
     if isinstance(root, ChainNode):
-        node_type = NodeTypePydantic.model_validate(root.node_type)
+        node_type = node_type_registry.get(root.node_type)
+        if is_lazy_node(root):
+            return LazyIxNode(
+                name=root.name,
+                description=root.description,
+                node_id=root.id,
+                class_path=root.class_path,
+                loader=functools.partial(
+                    load_node, root, context=context, variables=variables
+                ),
+                context=context,
+                config=root.config,
+                bind_points=node_type.bind_points,
+            )
+
         instance = load_node(root, context=context, variables=variables)
 
         if isinstance(instance, Runnable):
@@ -911,6 +1192,7 @@ def init_flow_node(
                 name=root.name,
                 description=root.description,
                 node_id=root.id,
+                class_path=root.class_path,
                 child=instance,
                 context=context,
                 config=root.config,
@@ -0,0 +1,80 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_loader_executor() -> ThreadPoolExecutor:
+    """Shared executor for loading node properties"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.FLOW_LOADER_WORKERS,
+                thread_name_prefix="ix-loader",
+            )
+        return _executor
+
+
+def in_loader_thread() -> bool:
+    return getattr(_local, "active", False)
+
+
+def _run_in_loader_thread(loader: Callable[[], Any]) -> Any:
+    _local.active = True
+    try:
+        return loader()
+    finally:
+        _local.active = False
+        close_old_connections()
+
+
+def run_loaders(loaders: List[Tuple[str, Callable[[], Any]]]) -> Dict[str, Any]:
+    """Run independent property loaders and return their values by key.
+
+    Loaders run concurrently on the shared loader executor. Loaders that are
+    already running on the executor run their own loaders sequentially, so a
+    subtree can't wait on executor threads held by its parents.
+
+    Loaders run sequentially when FLOW_LOADER_WORKERS is less than 2. If any loader
+    fails, the first failure in key order is raised after all loaders complete.
+    """
+    if len(loaders) < 2 or settings.FLOW_LOADER_WORKERS < 2 or in_loader_thread():
+        return {key: loader() for key, loader in loaders}
+
+    # loaders run with a copy of the caller's context so contextvars (e.g. the
+    # active load profile) are visible in loader threads.
+    executor = get_loader_executor()
+    futures = [
+        (
+            key,
+            executor.submit(
+                contextvars.copy_context().run, _run_in_loader_thread, loader
+            ),
+        )
+        for key, loader in loaders
+    ]
+
+    results = {}
+    error = None
+    for key, future in futures:
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            logger.error(f"Failed to load property key={key}: {e}")
+            error = error or e
+
+    if error is not None:
+        raise error
+    return results
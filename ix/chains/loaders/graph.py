@@ -0,0 +1,207 @@
+import itertools
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from django.db.models import Q
+
+from ix.chains.fixture_src.flow import ROOT_CLASS_PATH
+from ix.chains.models import ChainNode, ChainEdge
+
+logger = logging.getLogger(__name__)
+
+
+# attribute used to attach the graph to the nodes it indexes
+GRAPH_ATTR = "_chain_graph"
+
+
+class ChainGraph:
+    """In-memory index of a chain's nodes, edges, and their NodeTypes.
+
+    The graph is fetched in a constant number of queries regardless of the size of
+    the chain. Loaders traverse the index instead of querying edges for each node.
+
+    Nodes indexed by the graph keep a reference to it, and edges reference the
+    indexed node instances. Loaders that only receive a node or an edge group can
+    continue traversing with `ChainGraph.for_node(node)` without querying.
+    """
+
+    def __init__(
+        self,
+        chain_id: UUID | str | None,
+        nodes: Iterable[ChainNode],
+        edges: Iterable[ChainEdge],
+    ):
+        self.chain_id = chain_id
+        self.nodes: Dict[UUID, ChainNode] = {}
+        self._incoming: Dict[UUID, List[ChainEdge]] = defaultdict(list)
+        self._outgoing: Dict[UUID, List[ChainEdge]] = defaultdict(list)
+
+        for node in nodes:
+            self.add_node(node)
+
+        for edge in edges:
+            # edges may connect to nodes outside the chain. They are fetched with
+            # the edge and indexed along with the chain's nodes.
+            edge.source = self.add_node(edge.source)
+            edge.target = self.add_node(edge.target)
+            self._outgoing[edge.source_id].append(edge)
+            self._incoming[edge.target_id].append(edge)
+
+    def __repr__(self):
+        return f"ChainGraph(chain_id={self.chain_id}, nodes={len(self.nodes)})"
+
+    @staticmethod
+    def _queries(chain_id: UUID | str | None):
+        nodes = ChainNode.objects.filter(chain_id=chain_id).select_related("node_type")
+        edges = ChainEdge.objects.filter(
+            Q(source__chain_id=chain_id) | Q(target__chain_id=chain_id)
+        ).select_related("source__node_type", "target__node_type")
+        return nodes, edges
+
+    @classmethod
+    def load(cls, chain_id: UUID | str | None) -> "ChainGraph":
+        """Fetch all nodes, edges, and NodeTypes for a chain"""
+        nodes, edges = cls._queries(chain_id)
+        return cls(chain_id, list(nodes), list(edges))
+
+    @classmethod
+    async def aload(cls, chain_id: UUID | str | None) -> "ChainGraph":
+        """Fetch all nodes, edges, and NodeTypes for a chain"""
+        nodes, edges = cls._queries(chain_id)
+        return cls(
+            chain_id,
+            [node async for node in nodes],
+            [edge async for edge in edges],
+        )
+
+    @classmethod
+    def for_node(cls, node: ChainNode) -> "ChainGraph":
+        """Return the graph a node is indexed by, loading it if needed."""
+        graph = getattr(node, GRAPH_ATTR, None)
+        if graph is None:
+            graph = cls.load(node.chain_id)
+            graph.attach(node)
+        return graph
+
+    @classmethod
+    async def afor_node(cls, node: ChainNode) -> "ChainGraph":
+        """Return the graph a node is indexed by, loading it if needed."""
+        graph = getattr(node, GRAPH_ATTR, None)
+        if graph is None:
+            graph = await cls.aload(node.chain_id)
+            graph.attach(node)
+        return graph
+
+    def attach(self, node: ChainNode) -> None:
+        """Attach the graph to a node instance loaded outside the graph.
+
+        The node is indexed if the graph doesn't already contain it.
+        """
+        if node.id not in self.nodes:
+            self.add_node(node)
+        setattr(node, GRAPH_ATTR, self)
+
+    def add_node(self, node: ChainNode) -> ChainNode:
+        """Index a node. Returns the indexed instance if it was already indexed."""
+        if node.id in self.nodes:
+            return self.nodes[node.id]
+        setattr(node, GRAPH_ATTR, self)
+        self.nodes[node.id] = node
+        return node
+
+    def get_node(self, node: ChainNode | UUID) -> ChainNode:
+        """Return the indexed instance for a node or node id"""
+        node_id = node if isinstance(node, UUID) else node.id
+        return self.nodes[node_id]
+
+    def get_nodes(self, nodes: Iterable[ChainNode | UUID]) -> List[ChainNode]:
+        return [self.get_node(node) for node in nodes]
+
+    @property
+    def roots(self) -> List[ChainNode]:
+        """Nodes flagged as root"""
+        return [node for node in self.nodes.values() if node.root]
+
+    @property
+    def chat_root(self) -> Optional[ChainNode]:
+        """The chat input root node, if the chain has one"""
+        for node in self.roots:
+            if node.class_path == ROOT_CLASS_PATH:
+                return node
+        return None
+
+    @staticmethod
+    def _filter(
+        edges: List[ChainEdge],
+        relation: str = None,
+        source_key: str = None,
+        target_key: str = None,
+    ) -> List[ChainEdge]:
+        return [
+            edge
+            for edge in edges
+            if (relation is None or edge.relation == relation)
+            and (source_key is None or edge.source_key == source_key)
+            and (target_key is None or edge.target_key == target_key)
+        ]
+
+    def incoming(
+        self,
+        node: ChainNode,
+        relation: str = None,
+        source_key: str = None,
+        target_key: str = None,
+    ) -> List[ChainEdge]:
+        """Edges targeting the node, optionally filtered by relation & keys"""
+        return self._filter(
+            self._incoming.get(node.id, []), relation, source_key, target_key
+        )
+
+    def outgoing(
+        self,
+        node: ChainNode,
+        relation: str = None,
+        source_key: str = None,
+        target_key: str = None,
+    ) -> List[ChainEdge]:
+        """Edges from the node, optionally filtered by relation & keys"""
+        return self._filter(
+            self._outgoing.get(node.id, []), relation, source_key, target_key
+        )
+
+    def get_edge(
+        self, source: ChainNode | UUID, target: ChainNode, relation: str = None
+    ) -> ChainEdge:
+        """Return the edge connecting source to target.
+
+        Raises ChainEdge.DoesNotExist if there isn't one.
+        """
+        source_id = source if isinstance(source, UUID) else source.id
+        for edge in self.incoming(target, relation=relation):
+            if edge.source_id == source_id:
+                return edge
+        raise ChainEdge.DoesNotExist(
+            f"No edge from source_id={source_id} to target_id={target.id}"
+        )
+
+    @staticmethod
+    def group_by(
+        edges: List[ChainEdge], key: str
+    ) -> List[Tuple[Optional[str], List[ChainEdge]]]:
+        """Group edges by an edge attribute (e.g. source_key, target_key).
+
+        Groups are sorted by the key, matching `order_by(key)` with nulls last.
+        """
+
+        def sort_key(edge):
+            value = getattr(edge, key)
+            return value is None, value or ""
+
+        return [
+            (group_key, list(group))
+            for group_key, group in itertools.groupby(
+                sorted(edges, key=sort_key), lambda edge: getattr(edge, key)
+            )
+        ]
@@ -0,0 +1,299 @@
+"""
+Streaming ingestion of documents into vectorstores.
+
+Documents are read from the loader one at a time (`lazy_load` when the loader
+implements it), split as they are read and grouped into batches of
+INGESTION_BATCH_SIZE chunks. The first batch creates the vectorstore with
+`from_documents`. The remaining batches are embedded and added with
+`add_documents` by INGESTION_CONCURRENCY worker threads.
+
+Batches wait for a worker in a queue that holds at most INGESTION_QUEUE_SIZE
+batches. Reading blocks while the workers are behind, so memory used by an
+ingestion depends on the batch size and not on the size of the corpus.
+
+An IngestionLedger (see ix.datasources.ledger) may track the documents that were
+ingested. Unchanged documents and chunks are skipped and chunks are stored with
+the vector ids the ledger assigns.
+"""
+import contextvars
+import dataclasses
+import itertools
+import logging
+import queue
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Type,
+)
+
+from django.conf import settings
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_core.documents import Document
+from langchain.schema.vectorstore import VectorStore
+
+from ix.chains.loaders.text_splitter import TextSplitterShim
+
+if TYPE_CHECKING:
+    from ix.datasources.ledger import IngestionLedger
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class IngestionProgress:
+    """Counts for an ingestion in progress"""
+
+    # documents read from the loader
+    documents: int = 0
+    # unchanged documents skipped by the ledger
+    skipped: int = 0
+    # chunks produced by the text splitter
+    chunks: int = 0
+    # batches and chunks added to the vectorstore
+    batches: int = 0
+    added: int = 0
+    start: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def __str__(self) -> str:
+        return (
+            f"documents={self.documents} skipped={self.skipped} chunks={self.chunks} "
+            f"batches={self.batches} added={self.added} "
+            f"elapsed={self.elapsed:.1f}s"
+        )
+
+
+ProgressCallback = Callable[[IngestionProgress], None]
+
+
+@dataclasses.dataclass
+class Chunk:
+    """A chunk of a source document to add to the vectorstore"""
+
+    document: Document
+    # vector id and source document id assigned by the ledger
+    id: Optional[str] = None
+    source_id: Optional[str] = None
+
+
+def lazy_load(loader: BaseLoader) -> Iterator[Document]:
+    """Iterate documents from a loader, streaming them if the loader supports it."""
+    if type(loader).lazy_load is not BaseLoader.lazy_load:
+        return loader.lazy_load()
+    return iter(loader.load())
+
+
+def iter_chunks(
+    document_source: BaseLoader | TextSplitterShim,
+    progress: IngestionProgress,
+    ledger: Optional["IngestionLedger"] = None,
+) -> Iterator[Chunk]:
+    """Iterate the chunks to ingest from a document source.
+
+    Documents from a TextSplitterShim are split one at a time as they are read.
+    When a ledger is given, only new and changed chunks are returned.
+    """
+    if isinstance(document_source, TextSplitterShim):
+        loader = document_source.document_loader
+        text_splitter = document_source.text_splitter
+    elif isinstance(document_source, BaseLoader):
+        loader = document_source
+        text_splitter = None
+    else:
+        raise ValueError(f"unsupported document_source type: {type(document_source)}")
+
+    for document in lazy_load(loader):
+        progress.documents += 1
+        source_id = None
+        if ledger is not None:
+            source_id = ledger.check(document)
+            if source_id is None:
+                progress.skipped += 1
+                continue
+
+        documents = [document]
+        if text_splitter is not None:
+            documents = text_splitter.split_documents(documents)
+        progress.chunks += len(documents)
+
+        if ledger is None:
+            yield from (Chunk(document=chunk) for chunk in documents)
+        else:
+            yield from ledger.assign(source_id, documents)
+
+
+def iter_batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def add_chunks(
+    add_documents: Callable[..., Any], chunks: List[Chunk], **kwargs: Any
+) -> Any:
+    """Add chunks with the vector ids assigned to them, if any"""
+    documents = [chunk.document for chunk in chunks]
+    if chunks[0].id is not None:
+        kwargs["ids"] = [chunk.id for chunk in chunks]
+    return add_documents(documents=documents, **kwargs)
+
+
+class IngestionPipeline:
+    """Add batches to a vectorstore with a pool of worker threads.
+
+    Batches are handed to workers through a bounded queue. An error in a worker
+    stops reading and is raised once the workers have stopped. Documents the
+    workers finished are written to the ledger by the reading thread.
+    """
+
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        progress: IngestionProgress,
+        concurrency: int = None,
+        queue_size: int = None,
+        on_progress: Optional[ProgressCallback] = None,
+        ledger: Optional["IngestionLedger"] = None,
+    ):
+        self.vectorstore = vectorstore
+        self.progress = progress
+        self.ledger = ledger
+        self.concurrency = max(
+            1, settings.INGESTION_CONCURRENCY if concurrency is None else concurrency
+        )
+        self.queue_size = max(
+            1, settings.INGESTION_QUEUE_SIZE if queue_size is None else queue_size
+        )
+        self.on_progress = on_progress
+        self._queue: queue.Queue[Optional[List[Chunk]]] = queue.Queue(
+            maxsize=self.queue_size
+        )
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._errors: List[BaseException] = []
+
+    def add(self, batch: List[Chunk]) -> None:
+        add_chunks(self.vectorstore.add_documents, batch)
+        if self.ledger is not None:
+            self.ledger.complete(batch)
+        with self._lock:
+            self.progress.batches += 1
+            self.progress.added += len(batch)
+            logger.info(f"Ingested batch {self.progress}")
+            if self.on_progress:
+                self.on_progress(self.progress)
+
+    def _work(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._failed.is_set():
+                # drain remaining batches so the reader isn't blocked
+                continue
+            try:
+                self.add(batch)
+            except BaseException as e:
+                self._errors.append(e)
+                self._failed.set()
+
+    def flush(self) -> None:
+        if self.ledger is not None:
+            self.ledger.flush(self.vectorstore)
+
+    def run(self, batches: Iterable[List[Chunk]]) -> None:
+        # each worker runs in a copy of the caller's context (e.g. load profiling)
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._work,),
+                name=f"ix-ingestion-{i}",
+                daemon=True,
+            )
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for batch in batches:
+                if self._failed.is_set():
+                    break
+                self._queue.put(batch)
+                self.flush()
+        except BaseException:
+            self._failed.set()
+            raise
+        finally:
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+            # record what was ingested even if the ingestion failed
+            self.flush()
+
+        if self._errors:
+            raise self._errors[0]
+
+
+def ingest_documents(
+    vectorstore_class: Type[VectorStore],
+    document_source: BaseLoader | TextSplitterShim,
+    config: Dict[str, Any],
+    batch_size: int = None,
+    concurrency: int = None,
+    queue_size: int = None,
+    on_progress: Optional[ProgressCallback] = None,
+    ledger: Optional["IngestionLedger"] = None,
+) -> Optional[VectorStore]:
+    """Stream documents from the source into a new vectorstore.
+
+    Returns None if the source has no documents to add and there is no ledger.
+    """
+    batch_size = batch_size or settings.INGESTION_BATCH_SIZE
+    progress = IngestionProgress()
+    batches = iter_batches(iter_chunks(document_source, progress, ledger), batch_size)
+
+    # the first batch creates the vectorstore (and its index or collection)
+    first = next(batches, None)
+    if first is None:
+        if ledger is None:
+            return None
+        # nothing changed, but documents may have been removed from the source
+        vectorstore = vectorstore_class(**config)
+        ledger.finish(vectorstore)
+        logger.info(f"Ingested documents class={vectorstore_class.__name__} {progress}")
+        return vectorstore
+
+    vectorstore = add_chunks(vectorstore_class.from_documents, first, **config)
+    if ledger is not None:
+        ledger.complete(first)
+    progress.batches += 1
+    progress.added += len(first)
+    if on_progress:
+        on_progress(progress)
+
+    pipeline = IngestionPipeline(
+        vectorstore,
+        progress=progress,
+        concurrency=concurrency,
+        queue_size=queue_size,
+        on_progress=on_progress,
+        ledger=ledger,
+    )
+    pipeline.run(batches)
+    if ledger is not None:
+        ledger.finish(vectorstore)
+    logger.info(f"Ingested documents class={vectorstore_class.__name__} {progress}")
+    return vectorstore
@@ -0,0 +1,296 @@
+"""
+Registry for components that load local model weights.
+
+LlamaCpp and local embeddings read their weights from disk when they are created.
+The registry loads each model once per worker process and shares it with every
+flow that loads the same model. Components are keyed by the fields used to load
+the weights (model_path, n_ctx, n_gpu_layers, ...). Other fields (temperature,
+max_tokens, encode_kwargs, ...) are applied to a copy of the loaded component that
+shares its client.
+
+Models are evicted least recently used first when loaded models exceed
+LOCAL_MODEL_MEMORY_MB. Models that are in use by a flow are not evicted.
+Access to a model's client is serialized since llama.cpp contexts are not thread
+safe. Concurrent `encode` calls to HuggingFace embedding models are batched by an
+EncodeBatcher.
+"""
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from ix.chains.fixture_src.embeddings import (
+    HUGGINGFACE_BGE_EMBEDDINGS_CLASS_PATH,
+    HUGGINGFACE_EMBEDDINGS_CLASS_PATH,
+    HUGGINGFACE_INSTRUCT_EMBEDDINGS_CLASS_PATH,
+)
+from ix.chains.fixture_src.llm import LLAMA_CPP_LLM_CLASS_PATH
+from ix.chains.loaders.batching import EncodeBatcher
+
+logger = logging.getLogger(__name__)
+
+
+LLAMA_CPP_LOAD_FIELDS = {
+    "model_path",
+    "lora_base",
+    "lora_path",
+    "n_ctx",
+    "n_parts",
+    "seed",
+    "f16_kv",
+    "logits_all",
+    "vocab_only",
+    "use_mlock",
+    "use_mmap",
+    "n_threads",
+    "n_batch",
+    "n_gpu_layers",
+    "rope_freq_scale",
+    "rope_freq_base",
+    "model_kwargs",
+    "verbose",
+}
+
+HUGGINGFACE_LOAD_FIELDS = {"model_name", "cache_folder", "model_kwargs"}
+
+LLAMA_CPP_EMBEDDINGS_CLASS_PATH = (
+    "langchain_community.embeddings.llama_cpp.LlamaCppEmbeddings"
+)
+LLAMA_CPP_LLM_CLASS_PATHS = {
+    LLAMA_CPP_LLM_CLASS_PATH,
+    "langchain_community.llms.llamacpp.LlamaCpp",
+}
+
+# fields used to load the weights of each local model component
+LOCAL_MODEL_LOAD_FIELDS = {
+    **{class_path: LLAMA_CPP_LOAD_FIELDS for class_path in LLAMA_CPP_LLM_CLASS_PATHS},
+    LLAMA_CPP_EMBEDDINGS_CLASS_PATH: LLAMA_CPP_LOAD_FIELDS,
+    HUGGINGFACE_EMBEDDINGS_CLASS_PATH: HUGGINGFACE_LOAD_FIELDS,
+    HUGGINGFACE_INSTRUCT_EMBEDDINGS_CLASS_PATH: HUGGINGFACE_LOAD_FIELDS,
+    HUGGINGFACE_BGE_EMBEDDINGS_CLASS_PATH: HUGGINGFACE_LOAD_FIELDS,
+}
+
+# models that batch concurrent encode calls. llama.cpp embeds one text at a time
+# so LlamaCppEmbeddings isn't batched.
+BATCHED_CLASS_PATHS = {
+    HUGGINGFACE_EMBEDDINGS_CLASS_PATH,
+    HUGGINGFACE_INSTRUCT_EMBEDDINGS_CLASS_PATH,
+    HUGGINGFACE_BGE_EMBEDDINGS_CLASS_PATH,
+}
+
+# defaults applied to llama.cpp models. Weights are memory mapped so pages are
+# shared and only read from disk when used.
+LLAMA_CPP_DEFAULTS = {"use_mmap": True, "n_gpu_layers": 0}
+
+LocalModelKey = Tuple[str, str]
+
+
+def is_local_model(class_path: str) -> bool:
+    return class_path in LOCAL_MODEL_LOAD_FIELDS
+
+
+def estimate_size(component: Any, config: Dict[str, Any]) -> int:
+    """Estimate the memory used by a model in bytes"""
+    model_path = config.get("model_path", None)
+    if model_path and os.path.exists(model_path):
+        return os.path.getsize(model_path)
+
+    # torch modules (e.g. SentenceTransformer)
+    client = getattr(component, "client", None)
+    if hasattr(client, "parameters"):
+        return sum(p.numel() * p.element_size() for p in client.parameters())
+    return 0
+
+
+@dataclasses.dataclass
+class LocalModel:
+    key: LocalModelKey
+    component: Any
+    size: int = 0
+    refs: int = 0
+    last_used: float = dataclasses.field(default_factory=time.monotonic)
+    lock: threading.RLock = dataclasses.field(default_factory=threading.RLock)
+    # batches concurrent encode calls for embedding models
+    batcher: Optional[EncodeBatcher] = None
+
+    def close(self) -> None:
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+def locked(model: LocalModel, func: Callable) -> Callable:
+    """Wrap a client method so calls hold the model's lock"""
+
+    def call(*args, **kwargs):
+        with model.lock:
+            model.last_used = time.monotonic()
+            result = func(*args, **kwargs)
+            if not hasattr(result, "__next__"):
+                return result
+        return locked_iter(model, result)
+
+    return call
+
+
+def locked_iter(model: LocalModel, result):
+    # the generator was created with the lock held but its body runs lazily.
+    # Reacquire the lock while it is consumed.
+    with model.lock:
+        try:
+            yield from result
+        finally:
+            close = getattr(result, "close", None)
+            if close:
+                close()
+
+
+class LockedClient:
+    """Proxy to a model's client that serializes calls to the model.
+
+    Each component handed out by the registry has its own LockedClient. The
+    reference acquired for the component is released when the proxy is garbage
+    collected. Generators returned by the
+    client (e.g. streaming completions) hold the lock until they are exhausted or
+    closed.
+    """
+
+    def __init__(self, model: LocalModel, registry: "LocalModelRegistry"):
+        self._model = model
+        weakref.finalize(self, registry.release, model)
+
+    def __call__(self, *args, **kwargs):
+        return locked(self._model, self._model.component.client)(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name == "encode" and self._model.batcher is not None:
+            return self._model.batcher.encode
+        value = getattr(self._model.component.client, name)
+        if callable(value):
+            return locked(self._model, value)
+        return value
+
+
+class LocalModelRegistry:
+    """Loads local models once per process and shares them between flows."""
+
+    def __init__(self):
+        self._models: Dict[LocalModelKey, LocalModel] = {}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[LocalModelKey, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, key: LocalModelKey) -> bool:
+        return key in self._models
+
+    @property
+    def size(self) -> int:
+        return sum(model.size for model in self._models.values())
+
+    def get_key(self, class_path: str, config: Dict[str, Any]) -> LocalModelKey:
+        load_fields = LOCAL_MODEL_LOAD_FIELDS[class_path]
+        load_config = {
+            key: value for key, value in config.items() if key in load_fields
+        }
+        return class_path, json.dumps(load_config, sort_keys=True, default=str)
+
+    def acquire(self, model: LocalModel) -> None:
+        with self._lock:
+            model.refs += 1
+            model.last_used = time.monotonic()
+
+    def release(self, model: LocalModel) -> None:
+        with self._lock:
+            model.refs -= 1
+
+    def load(
+        self, class_path: str, node_class: Callable, config: Dict[str, Any]
+    ) -> Any:
+        """Return a component for the config that shares the loaded model."""
+        if class_path in LLAMA_CPP_LLM_CLASS_PATHS:
+            config = {**LLAMA_CPP_DEFAULTS, **config}
+
+        key = self.get_key(class_path, config)
+        model = self._get_or_load(key, node_class, config)
+
+        # apply fields that don't affect the weights to a copy sharing the client.
+        load_fields = LOCAL_MODEL_LOAD_FIELDS[class_path]
+        update = {
+            field: value for field, value in config.items() if field not in load_fields
+        }
+        update["client"] = LockedClient(model, self)
+        return model.component.copy(update=update)
+
+    def _get_or_load(
+        self, key: LocalModelKey, node_class: Callable, config: Dict[str, Any]
+    ) -> LocalModel:
+        with self._lock:
+            model = self._models.get(key, None)
+            if model is not None:
+                self.acquire(model)
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # models may take a long time to load. Only block loads of the same model.
+        with load_lock:
+            with self._lock:
+                model = self._models.get(key, None)
+                if model is not None:
+                    self.acquire(model)
+                    return model
+
+            start = time.perf_counter()
+            component = node_class(**config)
+            model = LocalModel(
+                key=key, component=component, size=estimate_size(component, config)
+            )
+            if key[0] in BATCHED_CLASS_PATHS and settings.EMBEDDING_BATCH_MAX_SIZE > 1:
+                model.batcher = EncodeBatcher(locked(model, component.client.encode))
+            logger.info(
+                f"Loaded local model class_path={key[0]} size={model.size} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+            with self._lock:
+                self._models[key] = model
+                self._load_locks.pop(key, None)
+                self.acquire(model)
+                self.evict(budget=settings.LOCAL_MODEL_MEMORY_MB * 1024 * 1024)
+        return model
+
+    def evict(self, budget: int) -> int:
+        """Evict unused models, least recently used first, until the loaded models
+        fit the budget. Returns the number of models evicted.
+        """
+        evicted = 0
+        with self._lock:
+            unused = sorted(
+                (model for model in self._models.values() if model.refs <= 0),
+                key=lambda model: model.last_used,
+            )
+            total = self.size
+            for model in unused:
+                if total <= budget:
+                    break
+                del self._models[model.key]
+                model.close()
+                total -= model.size
+                evicted += 1
+                logger.info(f"Evicted local model class_path={model.key[0]}")
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+local_model_registry = LocalModelRegistry()
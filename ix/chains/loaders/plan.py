@@ -0,0 +1,172 @@
+"""
+Flow plans are a JSON serializable form of the placeholder tree built by
+`load_flow_node`. Plans are compiled when a chain's graph is saved so that workers
+can rebuild the flow from the plan instead of traversing the graph for every task.
+
+Nodes are referenced by id. Deserializing a plan requires the chain's ChainGraph
+to supply the node instances. Plans record the chain revision they were compiled
+for. Plans for another revision are ignored.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from ix.chains.loaders.core import (
+    AggPlaceholder,
+    BranchPlaceholder,
+    FlowPlaceholder,
+    ImplicitJoin,
+    MapPlaceholder,
+    SequencePlaceholder,
+    get_flow_roots,
+    load_flow_node,
+)
+from ix.chains.loaders.graph import ChainGraph
+from ix.chains.models import Chain, ChainNode
+
+logger = logging.getLogger(__name__)
+
+
+# Increment when the plan format changes. Plans with another version are ignored
+# and the flow is loaded by traversing the graph.
+FLOW_PLAN_VERSION = 2
+
+FlowPlan = Dict[str, Any]
+
+
+def serialize_flow(flow: FlowPlaceholder) -> FlowPlan:
+    """Convert a placeholder tree into a JSON serializable dict"""
+    if isinstance(flow, ChainNode):
+        return {"type": "node", "id": str(flow.id)}
+    elif isinstance(flow, ImplicitJoin):
+        # traversal is complete so the join can be resolved now
+        return serialize_flow(flow.resolve())
+    elif isinstance(flow, SequencePlaceholder):
+        return {"type": "sequence", "steps": [serialize_flow(s) for s in flow.steps]}
+    elif isinstance(flow, list):
+        return {"type": "list", "steps": [serialize_flow(s) for s in flow]}
+    elif isinstance(flow, MapPlaceholder):
+        return {
+            "type": "map",
+            "node": str(flow.node.id),
+            "map": {key: serialize_flow(value) for key, value in flow.map.items()},
+        }
+    elif isinstance(flow, BranchPlaceholder):
+        return {
+            "type": "branch",
+            "node": str(flow.node.id),
+            "default": serialize_flow(flow.default),
+            "branches": [[key, serialize_flow(value)] for key, value in flow.branches],
+        }
+    elif isinstance(flow, AggPlaceholder):
+        return {
+            "type": "agg",
+            "collection": flow.type,
+            "steps": [serialize_flow(s) for s in flow.steps],
+        }
+    raise ValueError(f"Invalid flow type: {type(flow)}")
+
+
+def deserialize_flow(plan: FlowPlan, graph: ChainGraph) -> FlowPlaceholder:
+    """Rebuild a placeholder tree from a plan using nodes from the graph"""
+    plan_type = plan["type"]
+    if plan_type == "node":
+        return graph.get_node(UUID(plan["id"]))
+    elif plan_type == "sequence":
+        return SequencePlaceholder(
+            steps=[deserialize_flow(step, graph) for step in plan["steps"]]
+        )
+    elif plan_type == "list":
+        return [deserialize_flow(step, graph) for step in plan["steps"]]
+    elif plan_type == "map":
+        return MapPlaceholder(
+            node=graph.get_node(UUID(plan["node"])),
+            map={
+                key: deserialize_flow(value, graph)
+                for key, value in plan["map"].items()
+            },
+        )
+    elif plan_type == "branch":
+        return BranchPlaceholder(
+            node=graph.get_node(UUID(plan["node"])),
+            default=deserialize_flow(plan["default"], graph),
+            branches=[
+                (key, deserialize_flow(value, graph)) for key, value in plan["branches"]
+            ],
+        )
+    elif plan_type == "agg":
+        return AggPlaceholder(
+            type=plan["collection"],
+            steps=[deserialize_flow(step, graph) for step in plan["steps"]],
+        )
+    raise ValueError(f"Invalid flow plan type: {plan_type}")
+
+
+def compile_flow_plan(graph: ChainGraph) -> Tuple[Optional[FlowPlan], Optional[str]]:
+    """Compile the plan for a chain graph.
+
+    Returns a tuple of (plan, error). Graph errors (e.g. a branch without a default)
+    are returned as the error so they can be reported while the chain is edited.
+    Chains without any roots yet have neither a plan nor an error.
+    """
+    roots = get_flow_roots(graph)
+    if not roots:
+        return None, None
+
+    try:
+        flow = serialize_flow(load_flow_node(roots))
+    except Exception as e:
+        logger.debug(f"Failed to compile flow plan chain_id={graph.chain_id}: {e}")
+        return None, str(e) or e.__class__.__name__
+
+    return {"version": FLOW_PLAN_VERSION, "flow": flow}, None
+
+
+def load_flow_plan(chain: Chain, graph: ChainGraph) -> Optional[FlowPlaceholder]:
+    """Return the placeholder tree from the chain's plan, if it has a current one"""
+    plan = chain.flow_plan
+    if not plan or plan.get("version") != FLOW_PLAN_VERSION:
+        return None
+    if plan.get("revision") != chain.revision:
+        # compiled from another revision of the graph, e.g. by an edit that raced
+        # with a newer one.
+        logger.warning(
+            f"Ignoring stale flow plan for chain_id={chain.id} "
+            f"plan_revision={plan.get('revision')} revision={chain.revision}"
+        )
+        return None
+
+    try:
+        return deserialize_flow(plan["flow"], graph)
+    except (KeyError, ValueError) as e:
+        # plan references nodes that no longer exist. Fallback to traversal.
+        logger.warning(f"Ignoring invalid flow plan for chain_id={chain.id}: {e}")
+        return None
+
+
+def save_flow_plan(chain: Chain, flow: FlowPlaceholder) -> None:
+    """Save a plan for a flow loaded by traversal.
+
+    Used for chains that were created outside the editor. The update is skipped if
+    the chain was modified since it was loaded.
+    """
+    plan = {
+        "version": FLOW_PLAN_VERSION,
+        "revision": chain.revision,
+        "flow": serialize_flow(flow),
+    }
+    Chain.objects.filter(id=chain.id, revision=chain.revision).update(flow_plan=plan)
+    chain.flow_plan = plan
+
+
+async def asave_flow_plan(chain: Chain, flow: FlowPlaceholder) -> None:
+    """Save a plan for a flow loaded by traversal."""
+    plan = {
+        "version": FLOW_PLAN_VERSION,
+        "revision": chain.revision,
+        "flow": serialize_flow(flow),
+    }
+    await Chain.objects.filter(id=chain.id, revision=chain.revision).aupdate(
+        flow_plan=plan
+    )
+    chain.flow_plan = plan
@@ -0,0 +1,73 @@
+"""
+Shared component instances.
+
+LLMs and embeddings hold an HTTP client with a connection pool. Creating a new
+instance for every flow load throws away the provider's keep-alive connections.
+Instances of pooled node types are shared by every flow in the worker that loads
+the same class with the same config.
+
+Instances are keyed by class_path and a hash of the config after secrets are
+resolved, so rotating a secret loads a new instance. Per-run state (callbacks,
+tags, metadata) is passed in the RunnableConfig when a flow runs. Nodes that set
+those fields in their config aren't pooled.
+"""
+import functools
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+from ix.chains.models import NodeType
+from ix.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+# config fields that hold per-run state
+PER_RUN_FIELDS = {"callbacks", "callback_manager", "tags", "metadata"}
+
+instance_pool: LRUCache[str, Any] = LRUCache(
+    max_size=settings.INSTANCE_POOL_SIZE, ttl=settings.INSTANCE_POOL_TTL
+)
+
+
+def is_pooled_type(node_type: NodeType) -> bool:
+    return node_type.type in settings.INSTANCE_POOL_TYPES
+
+
+def get_instance_key(class_path: str, config: Dict[str, Any]) -> Optional[str]:
+    """Return the pool key for a component config.
+
+    Returns None if the config can't be pooled: it sets per-run fields or holds
+    values that aren't JSON serializable (e.g. loaded properties).
+    """
+    if any(config.get(field, None) for field in PER_RUN_FIELDS):
+        return None
+
+    shared_config = {
+        key: value for key, value in config.items() if key not in PER_RUN_FIELDS
+    }
+    try:
+        serialized = json.dumps(
+            {"class_path": class_path, "config": shared_config}, sort_keys=True
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def init_pooled(
+    node_type: NodeType,
+    class_path: str,
+    node_class: Callable,
+    config: Dict[str, Any],
+) -> Any:
+    """Return a shared instance of the component, creating it if needed."""
+    key = get_instance_key(class_path, config) if is_pooled_type(node_type) else None
+    if key is None:
+        return node_class(**config)
+
+    logger.debug(f"Loading pooled instance class_path={class_path} key={key}")
+    return instance_pool.get_or_set(key, functools.partial(node_class, **config))
@@ -0,0 +1,177 @@
+"""
+Profiling for flow loading.
+
+A LoadProfiler collects a tree of NodeLoadProfile while a flow loads. Each node
+records wall time, DB queries, secret reads, import time and initializer time.
+Wall time and queries include the node's properties. The other counters only
+include work done for the node itself.
+
+The active profile is tracked with a contextvar so loaders only need to wrap
+their work with `profile_node` or `profile_step`. Both are no-ops when no
+profiler is active.
+"""
+import dataclasses
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Any, Dict
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+from ix.chains.models import ChainNode, Chain
+
+
+@dataclasses.dataclass
+class NodeLoadProfile:
+    node_id: Optional[str] = None
+    class_path: Optional[str] = None
+    name: Optional[str] = None
+    wall_time: float = 0
+    queries: int = 0
+    secret_reads: int = 0
+    import_time: float = 0
+    init_time: float = 0
+    children: List["NodeLoadProfile"] = dataclasses.field(default_factory=list)
+    parent: Optional["NodeLoadProfile"] = dataclasses.field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "class_path": self.class_path,
+            "name": self.name,
+            "wall_time": self.wall_time,
+            "queries": self.queries,
+            "secret_reads": self.secret_reads,
+            "import_time": self.import_time,
+            "init_time": self.init_time,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+_current_profile: ContextVar[Optional[NodeLoadProfile]] = ContextVar(
+    "ix_load_profile", default=None
+)
+
+# counters may be updated by property loaders running in other threads
+_lock = threading.Lock()
+
+
+def _count_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is not None:
+        with _lock:
+            while profile is not None:
+                profile.queries += 1
+                profile = profile.parent
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs) -> None:
+    """Count queries for the active profile on this connection"""
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+connection_created.connect(install_query_counter)
+
+
+@contextmanager
+def profile_node(node: ChainNode):
+    """Profile loading a node as a child of the active profile"""
+    parent = _current_profile.get()
+    if parent is None:
+        yield None
+        return
+
+    install_query_counter(connection)
+    profile = NodeLoadProfile(
+        node_id=str(node.id),
+        class_path=node.class_path,
+        name=node.name,
+        parent=parent,
+    )
+    with _lock:
+        parent.children.append(profile)
+
+    token = _current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.wall_time = time.perf_counter() - start
+        _current_profile.reset(token)
+
+
+@contextmanager
+def profile_step(step: str):
+    """Add the time spent in the block to a timer (import_time, init_time)"""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(profile, step, getattr(profile, step) + time.perf_counter() - start)
+
+
+def record_secret_reads(count: int) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.secret_reads += count
+
+
+class LoadProfiler:
+    """Collect a load profile for everything loaded within the block.
+
+    ```
+    with LoadProfiler() as profiler:
+        flow = await aload_cached_chain_flow(chain, context)
+    await profiler.asave(task, chain)
+    ```
+    """
+
+    def __init__(self):
+        self.root = NodeLoadProfile(name="flow")
+        self.enabled = settings.FLOW_LOAD_PROFILE_ENABLED
+        self._token = None
+        self._start = None
+
+    def __enter__(self) -> "LoadProfiler":
+        if self.enabled:
+            install_query_counter(connection)
+            self._token = _current_profile.set(self.root)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._token is not None:
+            self.root.wall_time = time.perf_counter() - self._start
+            _current_profile.reset(self._token)
+            self._token = None
+
+    @property
+    def loaded(self) -> bool:
+        """Were any nodes loaded? Flows from the cache aren't loaded."""
+        return bool(self.root.children)
+
+    async def asave(self, task, chain: Chain) -> None:
+        """Save the profile for the task. Skipped if nothing was loaded."""
+        from ix.runnable_log.models import FlowLoadProfile
+
+        if not self.enabled or not self.loaded:
+            return
+
+        await FlowLoadProfile.objects.acreate(
+            task=task,
+            chain=chain,
+            user_id=task.user_id,
+            wall_time=self.root.wall_time,
+            queries=self.root.queries,
+            profile=self.root.to_dict(),
+        )
@@ -0,0 +1,98 @@
+import dataclasses
+import logging
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+from uuid import UUID
+
+from ix.api.components.types import NodeType as NodeTypePydantic, NodeTypeField
+from ix.chains.models import NodeType
+from ix.utils.cache import LRUCache, CacheStats
+
+logger = logging.getLogger(__name__)
+
+
+NodeTypeKey = Tuple[str, int]
+
+
+@dataclasses.dataclass(frozen=True)
+class NodeTypeEntry:
+    """Validated NodeType and the lookups loaders need when loading nodes of the type.
+
+    Entries are shared between all nodes of the type and must not be modified.
+    """
+
+    revision: int
+    pydantic: NodeTypePydantic
+
+    # raw connector dicts by key, same as NodeType.connectors_as_dict
+    connectors: Dict[str, dict]
+    field_map: Dict[str, NodeTypeField]
+    init_exclude: Set[str]
+    bind_points: Set[str]
+    field_groups: Dict[str, dict]
+
+    # names of flattened fields grouped by their parent property
+    property_groups: Dict[str, List[str]]
+
+    # names of fields that hold secret ids
+    secret_fields: List[str]
+
+    @classmethod
+    def build(cls, node_type: NodeType) -> "NodeTypeEntry":
+        pydantic = NodeTypePydantic.model_validate(node_type)
+        property_groups = defaultdict(list)
+        for field in node_type.fields or []:
+            if field.get("parent"):
+                property_groups[field["parent"]].append(field["name"])
+
+        return cls(
+            revision=node_type.revision,
+            pydantic=pydantic,
+            connectors={c["key"]: c for c in node_type.connectors or []},
+            field_map=pydantic.field_map,
+            init_exclude=pydantic.init_exclude,
+            bind_points=pydantic.bind_points,
+            field_groups=node_type.field_groups or {},
+            property_groups=dict(property_groups),
+            secret_fields=[
+                field["name"]
+                for field in node_type.fields or []
+                if field["input_type"] == "secret"
+            ],
+        )
+
+
+class NodeTypeRegistry:
+    """Process-wide registry of NodeTypeEntry.
+
+    Entries are keyed by (id, revision). NodeType.revision is incremented whenever
+    a NodeType is saved so every process builds a new entry after it changes.
+    Changes made in this process also refresh the registry directly.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._entries: LRUCache[NodeTypeKey, NodeTypeEntry] = LRUCache(
+            max_size=max_size
+        )
+        self.version = 0
+
+    def get(self, node_type: NodeType) -> NodeTypeEntry:
+        key = (str(node_type.id), node_type.revision)
+        return self._entries.get_or_set(key, lambda: NodeTypeEntry.build(node_type))
+
+    def refresh(self, node_type_id: UUID | str = None) -> None:
+        """Drop entries for a NodeType, or all entries if no id is given."""
+        if node_type_id is None:
+            self._entries.clear()
+        else:
+            node_type_id = str(node_type_id)
+            self._entries.evict(lambda key: key[0] == node_type_id)
+        self.version += 1
+        logger.debug(f"NodeTypeRegistry refreshed version={self.version}")
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._entries.stats
+
+
+node_type_registry = NodeTypeRegistry()
@@ -1,7 +1,6 @@
 from copy import deepcopy
 from typing import List
 
-from asgiref.sync import sync_to_async
 from langchain.schema import BaseRetriever
 from langchain.schema.vectorstore import VectorStore
 
@@ -9,12 +8,13 @@ from ix.chains.fixture_src.vectorstores import get_vectorstore_retriever_fieldna
 from ix.chains.loaders.context import IxContext
 from ix.chains.loaders.core import load_node
 from ix.chains.models import ChainEdge
+from ix.utils.executors import run_in_executor
 from ix.utils.importlib import import_class
 
 
 async def async_aget_relevant_documents(self, *args, **kwargs):
     """Async wrapper for BaseRetriever._get_relevant_documents"""
-    return await sync_to_async(self._get_relevant_documents)(*args, **kwargs)
+    return await run_in_executor("io", self._get_relevant_documents, *args, **kwargs)
 
 
 # HAX: monkeypatch asyncio support into BaseRetriever. This is a gigantic hack, but
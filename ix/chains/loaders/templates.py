@@ -1,11 +1,12 @@
 from typing import TypeVar, Generic, Dict, Any, Set, Type
 
-from asgiref.sync import sync_to_async
 from pydantic import BaseModel
 
 from ix.chains.loaders.context import IxContext
+from ix.chains.loaders.graph import ChainGraph
 from ix.chains.models import ChainNode
 from ix.utils.config import get_config_variables
+from ix.utils.executors import run_in_executor
 from ix.utils.pydantic import create_args_model
 
 T = TypeVar("T")
@@ -38,37 +39,37 @@ class NodeTemplate(Generic[T]):
     async def aformat(self, input: Dict[str, Any]) -> T:
         from ix.chains.loaders.core import load_node
 
-        return await sync_to_async(load_node)(self.node, self.context, variables=input)
+        # fetch the graph with the async ORM. Only component initialization
+        # remains synchronous.
+        await ChainGraph.afor_node(self.node)
+        return await run_in_executor(
+            "db", load_node, self.node, self.context, variables=input
+        )
 
     def get_variables(self, node: ChainNode = None) -> Set[str]:
         """
         Helper recursive function to extract config variables.
         """
         node = node if node else self.node
-        variables = get_config_variables(node.config if node.config else {})
-
-        # Recursively traverse for all connected nodes
-        connected_edges = node.incoming_edges.filter(relation="PROP").order_by(
-            "target_key"
-        )
-        for edge in connected_edges.iterator():
-            connected_node = ChainNode.objects.get(pk=edge.source_id)
-            variables.update(self.get_variables(connected_node))
-
-        return variables
+        graph = ChainGraph.for_node(node)
+        return self._get_variables(graph, graph.get_node(node))
 
     async def aget_variables(self, node: ChainNode = None) -> Set[str]:
         """
         Helper recursive function to extract config variables.
         """
         node = node if node else self.node
+        graph = await ChainGraph.afor_node(node)
+        return self._get_variables(graph, graph.get_node(node))
+
+    def _get_variables(self, graph: ChainGraph, node: ChainNode) -> Set[str]:
         variables = get_config_variables(node.config if node.config else {})
 
         # Recursively traverse for all connected nodes
-        connected_edges = node.incoming_edges.filter(relation="PROP").order_by("key")
-        async for edge in connected_edges.aiterator():
-            connected_node = await ChainNode.objects.aget(pk=edge.source_id)
-            variables.update(await self.get_variables(connected_node))
+        connected_edges = graph.incoming(node, relation="PROP")
+        for _, edges in ChainGraph.group_by(connected_edges, "target_key"):
+            for edge in edges:
+                variables.update(self._get_variables(graph, edge.source))
 
         return variables
 
@@ -76,5 +77,6 @@ class NodeTemplate(Generic[T]):
         """
         Dynamically create a Pydantic model class with fields for each variable in the template.
         """
-        variables = self.get_variables()
+        # sorted since variables are a set
+        variables = sorted(self.get_variables())
         return create_args_model(variables, name="NodeTemplateSchema")
@@ -1,23 +1,27 @@
 import logging
 from typing import Dict, Any, Type
 
-from langchain_community.document_loaders.base import BaseLoader
 from langchain.schema.vectorstore import VectorStore
 
 from ix.chains.fixture_src.vectorstores import get_vectorstore_retriever_fieldnames
-from ix.chains.loaders.text_splitter import TextSplitterShim
+from ix.chains.loaders.context import IxContext
+from ix.chains.loaders.ingestion import ingest_documents
+from ix.datasources.ledger import get_ingestion_ledger
 from ix.utils.importlib import import_class
 
 
 logger = logging.getLogger(__name__)
 
 
-def initialize_vectorstore(class_path: str, config: Dict[str, Any]) -> VectorStore:
+def initialize_vectorstore(
+    class_path: str, config: Dict[str, Any], context: IxContext = None
+) -> VectorStore:
     """
     Initialize vectorstore
 
     Documents may come from either a TextSplitter or BaseLoader. Determine the type
-    it is and initialize accordingly.
+    it is and initialize accordingly. Documents may only be ingested into a
+    DataSource owned by the user of the context.
     """
     config = config.copy()
 
@@ -31,26 +35,20 @@ def initialize_vectorstore(class_path: str, config: Dict[str, Any]) -> VectorSto
     vectorstore = None
 
     # Ingest and load from documents if TextSplitters or BaseLoaders
-    # is configured as a document source.
+    # is configured as a document source. Documents are streamed into the
+    # vectorstore in batches. Documents ingested for a DataSource are tracked by
+    # its ledger so unchanged documents aren't ingested again. The DataSource is
+    # checked before ingesting so an invalid one doesn't leave orphaned vectors.
     document_source = config.pop("documents", None)
+    datasource_id = config.pop("datasource", None)
     if document_source:
-        if isinstance(document_source, TextSplitterShim):
-            document_loader = document_source.document_loader
-            documents = document_source.text_splitter.split_documents(
-                document_loader.load()
-            )
-        elif isinstance(document_source, BaseLoader):
-            documents = document_source.load()
-
-        else:
-            raise ValueError(
-                f"unsupported document_source type: {type(document_source)}"
-            )
-
-        if documents:
-            vectorstore = vectorstore_class.from_documents(
-                documents=documents, **config
-            )
+        ledger = None
+        if datasource_id:
+            user_id = context.user_id if context else None
+            ledger = get_ingestion_ledger(datasource_id, user_id=user_id)
+        vectorstore = ingest_documents(
+            vectorstore_class, document_source, config, ledger=ledger
+        )
 
     # Initialize vectorstore without ingesting documents. The vectorstore will
     # only have access to documents that are already in the database.
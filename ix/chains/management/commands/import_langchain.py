@@ -30,6 +30,7 @@ from ix.chains.fixture_src.toolkit import TOOLKITS
 from ix.chains.fixture_src.tools import TOOLS
 from ix.chains.fixture_src.unstructured import UNSTRUCTURED_IO
 from ix.chains.fixture_src.vectorstores import VECTORSTORES
+from ix.chains.loaders.registry import node_type_registry
 from ix.chains.models import NodeType
 from ix.chains.tests.mock_runnable import MOCK_RUNNABLE_CONFIG
 from ix.secrets.models import SecretType
@@ -156,3 +157,6 @@ class Command(BaseCommand):
                     secret_type = SecretType(name=secret_group.key)
                 secret_type.fields_schema = secret_group.fields_schema
                 secret_type.save()
+
+        # drop validated NodeTypes cached by this process
+        node_type_registry.refresh()
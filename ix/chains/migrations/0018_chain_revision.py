@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chains", "0017_ix_chat_prompt"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chain",
+            name="revision",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chains", "0018_chain_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chain",
+            name="flow_plan",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="chain",
+            name="flow_plan_error",
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
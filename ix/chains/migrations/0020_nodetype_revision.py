@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chains", "0019_chain_flow_plan"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nodetype",
+            name="revision",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
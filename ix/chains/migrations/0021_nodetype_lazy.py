@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chains", "0020_nodetype_revision"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nodetype",
+            name="lazy",
+            field=models.BooleanField(default=None, null=True),
+        ),
+    ]
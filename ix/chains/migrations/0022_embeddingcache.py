@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import ix.pg_vector.fields
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("chains", "0021_nodetype_lazy"),
+    ]
+
+    operations = [
+        migrations.RunSQL("CREATE EXTENSION IF NOT EXISTS vector;"),
+        migrations.CreateModel(
+            name="EmbeddingCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("class_path", models.CharField(max_length=255)),
+                ("model", models.CharField(max_length=255)),
+                ("text_hash", models.CharField(max_length=64)),
+                (
+                    "embedding",
+                    ix.pg_vector.fields.VectorField(
+                        base_field=models.FloatField(), null=True, size=None
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "unique_together": {("class_path", "model", "text_hash")},
+            },
+        ),
+    ]
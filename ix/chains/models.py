@@ -1,8 +1,7 @@
 import logging
 import uuid
-from asgiref.sync import sync_to_async
 from functools import cached_property
-from typing import Any, Dict, Type
+from typing import Any, Dict, Optional, Type
 
 from django.db import models
 from langchain.schema.runnable import Runnable
@@ -10,6 +9,7 @@ from pydantic.v1 import BaseModel
 
 from ix.chains.fixture_src.flow import ROOT_CLASS_PATH
 from ix.ix_users.models import OwnedModel
+from ix.pg_vector.fields import VectorField
 from ix.pg_vector.tests.models import PGVectorMixin
 from ix.pg_vector.utils import get_embedding
 from ix.utils.pydantic import create_args_model_v1
@@ -90,12 +90,25 @@ class NodeType(OwnedModel):
     # JSONSchema for the config object
     config_schema = models.JSONField(default=dict)
 
+    # Defer loading nodes of this type until they are first run. When null the
+    # default for the type is used, see settings.LAZY_NODE_TYPES.
+    lazy = models.BooleanField(null=True, default=None)
+
+    # Incremented on save. Loaders cache validated NodeTypes by (id, revision).
+    revision = models.PositiveIntegerField(default=0)
+
     objects = NodeTypeManager()
 
     @cached_property
     def connectors_as_dict(self):
         return {c["key"]: c for c in self.connectors or []}
 
+    def save(self, *args, **kwargs):
+        self.revision = (self.revision or 0) + 1
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {"revision", *kwargs["update_fields"]}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.class_path}"
 
@@ -301,6 +314,16 @@ class Chain(OwnedModel):
     # The endpoints are responsible for ensuring that the agent does or does not exist.
     is_agent = models.BooleanField(default=True)
 
+    # Incremented whenever nodes or edges are changed. Compiled flows are cached
+    # by (id, revision) so a new revision forces the flow to be rebuilt.
+    revision = models.PositiveIntegerField(default=0)
+
+    # Serialized flow structure compiled when the graph is saved. Workers load the
+    # flow from the plan instead of traversing the graph. Graph errors found while
+    # compiling are recorded in flow_plan_error.
+    flow_plan = models.JSONField(null=True, blank=True)
+    flow_plan_error = models.TextField(null=True, blank=True)
+
     nodes: models.QuerySet[ChainNode]
 
     @property
@@ -319,14 +342,17 @@ class Chain(OwnedModel):
         return init_chain_flow(self, context=context)
 
     async def aload_chain(self, context: "IxContext") -> Runnable:  # noqa: F821
-        from ix.chains.loaders.core import init_chain_flow
+        from ix.chains.loaders.core import ainit_chain_flow
 
-        return await sync_to_async(init_chain_flow)(self, context=context)
+        return await ainit_chain_flow(self, context=context)
 
     def clear_chain(self):
         """removes the chain nodes associated with this chain"""
         # clear old chain
         ChainNode.objects.filter(chain_id=self.id).delete()
+        Chain.objects.filter(id=self.id).update(
+            revision=models.F("revision") + 1, flow_plan=None, flow_plan_error=None
+        )
 
     @cached_property
     def chat_root(self):
@@ -337,13 +363,21 @@ class Chain(OwnedModel):
         """Build pydantic model for chain input."""
         try:
             root = self.chat_root
+        except ChainNode.DoesNotExist:
+            root = None
+        return self.build_types(root)
+
+    @staticmethod
+    def build_types(root: Optional[ChainNode]) -> Type[BaseModel]:
+        """Build pydantic model for chain input from the chat root node."""
+        if root is not None:
             input_type = create_args_model_v1(
                 root.config.get("outputs", []), name="ChainInput"
             )
             config_type = create_args_model_v1(
                 root.config.get("config", []), name="ChainConfig"
             )
-        except ChainNode.DoesNotExist:
+        else:
             # fallback to old style roots:
             # TODO: remove this fallback after all chains have been migrated
             input_type = create_args_model_v1(
@@ -359,3 +393,20 @@ class Chain(OwnedModel):
             CONFIG = config_type
 
         return ChainConfig
+
+
+class EmbeddingCache(models.Model):
+    """Embeddings cached by the hash of the embedded text.
+
+    Used by CachedEmbeddings to avoid embedding the same text twice with the same
+    embedding component and model.
+    """
+
+    class_path = models.CharField(max_length=255)
+    model = models.CharField(max_length=255)
+    text_hash = models.CharField(max_length=64)
+    embedding = VectorField(size=None)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("class_path", "model", "text_hash")
@@ -0,0 +1,34 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.runnables import Runnable
+
+from ix.chains.loaders import core
+from ix.chains.loaders.core import ainit_chain_flow
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncInit:
+    async def test_concurrent_chats(self, lcel_sequence, aix_context, mocker, settings):
+        """Flows for concurrent chats are initialized in parallel"""
+        settings.EXECUTOR_DB_WORKERS = 2
+        barrier = threading.Barrier(2, timeout=5)
+        threads = set()
+        init_chain_flow_root = core.init_chain_flow_root
+
+        def init_in_parallel(*args, **kwargs):
+            # both chats must be initializing at the same time to pass the barrier
+            threads.add(threading.get_ident())
+            barrier.wait()
+            return init_chain_flow_root(*args, **kwargs)
+
+        mocker.patch.object(core, "init_chain_flow_root", side_effect=init_in_parallel)
+        chain = lcel_sequence["chain"]
+        flows = await asyncio.gather(
+            ainit_chain_flow(chain, context=aix_context),
+            ainit_chain_flow(chain, context=aix_context),
+        )
+
+        assert len(threads) == 2
+        assert all(isinstance(flow, Runnable) for flow in flows)
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from ix.chains.loaders.batching import EncodeBatcher
+
+
+class MockEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.append((list(inputs), kwargs))
+        if "error" in inputs:
+            raise ValueError("encode failed")
+        suffix = kwargs.get("suffix", "")
+        return [f"{value}{suffix}" for value in inputs]
+
+
+@pytest.fixture
+def encoder():
+    return MockEncoder()
+
+
+@pytest.fixture
+def batcher(encoder):
+    batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=100)
+    yield batcher
+    batcher.close()
+
+
+def encode_concurrently(batcher, calls):
+    results = [None] * len(calls)
+
+    def encode(i, inputs, kwargs):
+        try:
+            results[i] = batcher.encode(inputs, **kwargs)
+        except Exception as e:
+            results[i] = e
+
+    threads = [
+        threading.Thread(target=encode, args=(i, inputs, kwargs))
+        for i, (inputs, kwargs) in enumerate(calls)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestEncodeBatcher:
+    def test_encode(self, batcher, encoder):
+        assert batcher.encode(["a", "b"]) == ["a", "b"]
+        assert batcher.encode("query") == "query"
+
+    def test_batch_concurrent_calls(self, batcher, encoder):
+        results = encode_concurrently(
+            batcher, [(["a", "b"], {}), (["c"], {}), ("query", {})]
+        )
+        assert results == [["a", "b"], ["c"], "query"]
+        assert len(encoder.calls) == 1
+        assert sorted(encoder.calls[0][0]) == ["a", "b", "c", "query"]
+
+    def test_max_batch_size(self, batcher, encoder):
+        calls = [([f"{i}-{j}" for j in range(4)], {}) for i in range(4)]
+        results = encode_concurrently(batcher, calls)
+        assert results == [inputs for inputs, _ in calls]
+        assert len(encoder.calls) == 2
+
+    def test_kwargs_batched_separately(self, batcher, encoder):
+        results = encode_concurrently(
+            batcher, [(["a"], {"suffix": "!"}), (["b"], {}), (["c"], {"suffix": "!"})]
+        )
+        assert results == [["a!"], ["b"], ["c!"]]
+        assert len(encoder.calls) == 2
+
+    def test_error(self, batcher, encoder):
+        results = encode_concurrently(batcher, [(["error"], {}), (["a"], {})])
+        assert isinstance(results[0], ValueError)
+        assert isinstance(results[1], ValueError)
+
+        # batcher still runs after an error
+        assert batcher.encode(["b"]) == ["b"]
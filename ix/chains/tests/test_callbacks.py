@@ -1,8 +1,10 @@
+import asyncio
+
 import pytest
 from django.db.models.signals import post_save
 
 from ix.agents.models import Agent
-from ix.chains.callbacks import IxHandler
+from ix.chains.callbacks import IxHandler, TokenStream
 from ix.chains.models import Chain
 from ix.chains.tests.test_config_loader import unpack_chain_flow
 from ix.schema.subscriptions import ChatMessageTokenSubscription
@@ -34,7 +36,10 @@ CHAIN_WITH_LLM = {
 
 @pytest.mark.django_db
 class TestIxHandler:
-    async def test_stream(self, achat, aload_chain, mock_openai_streaming, mocker):
+    async def test_stream(
+        self, achat, aload_chain, mock_openai_streaming, mocker, settings
+    ):
+        settings.TOKEN_STREAM_INTERVAL_MS = 1000
         await TaskLogMessage.objects.all().adelete()
         spy_broadcast = mocker.spy(ChatMessageTokenSubscription, "broadcast")
         saves = []
@@ -76,33 +81,66 @@ class TestIxHandler:
         assert saves[1]["stream"] is False
         assert saves[1]["text"] == "mock llm response"
 
-        # verify django-channel publish calls
+        # tokens are sent in a single frame
         for call in spy_broadcast.call_args_list:
             assert call.kwargs["group"] == f"stream_task_id_{task.id}"
         calls = spy_broadcast.call_args_list
-        assert len(calls) == 5
+        assert len(calls) == 1
         assert calls[0].kwargs["payload"] == {
             "msg_id": str(msg.id),
             "index": 1,
-            "text": "mock",
-        }
-        assert calls[1].kwargs["payload"] == {
-            "msg_id": str(msg.id),
-            "index": 2,
-            "text": " ",
-        }
-        assert calls[2].kwargs["payload"] == {
-            "msg_id": str(msg.id),
-            "index": 3,
-            "text": "llm",
-        }
-        assert calls[3].kwargs["payload"] == {
-            "msg_id": str(msg.id),
-            "index": 4,
-            "text": " ",
-        }
-        assert calls[4].kwargs["payload"] == {
-            "msg_id": str(msg.id),
-            "index": 5,
-            "text": "response",
+            "end_index": 5,
+            "text": "mock llm response",
         }
+
+    async def test_stream_frames(
+        self, achat, aload_chain, mock_openai_streaming, mocker, settings
+    ):
+        settings.TOKEN_STREAM_MAX_TOKENS = 2
+        spy_broadcast = mocker.spy(ChatMessageTokenSubscription, "broadcast")
+        chat = achat["chat"]
+        task = await Task.objects.aget(id=chat.task_id)
+        chain = await Chain.objects.aget(id=task.chain_id)
+        agent = await Agent.objects.aget(id=task.agent_id)
+
+        handler = IxHandler(agent=agent, chain=chain, task=task)
+        flow = await aload_chain(CHAIN_WITH_LLM)
+        langchain_chain = unpack_chain_flow(flow)
+        langchain_chain.llm.streaming = True
+        await langchain_chain.acall(
+            inputs=dict(user_input="testing"), callbacks=[handler]
+        )
+
+        payloads = [call.kwargs["payload"] for call in spy_broadcast.call_args_list]
+        assert [(p["index"], p["end_index"], p["text"]) for p in payloads] == [
+            (1, 2, "mock "),
+            (3, 4, "llm "),
+            (5, 5, "response"),
+        ]
+
+
+class TestTokenStream:
+    async def test_interval(self, mocker):
+        on_new_token = mocker.patch.object(ChatMessageTokenSubscription, "on_new_token")
+        task = mocker.Mock()
+        stream = TokenStream(task=task, message_id="msg", max_tokens=10, interval_ms=10)
+        await stream.add(1, "a")
+        await stream.add(2, "b")
+        on_new_token.assert_not_called()
+
+        await asyncio.sleep(0.05)
+        on_new_token.assert_called_once_with(
+            task=task, message_id="msg", index=1, end_index=2, text="ab"
+        )
+
+        # flushed immediately, e.g. on end or error
+        await stream.add(3, "c")
+        await stream.flush()
+        assert stream.frames == 2
+        on_new_token.assert_called_with(
+            task=task, message_id="msg", index=3, end_index=3, text="c"
+        )
+
+        # nothing left to send
+        await stream.flush()
+        assert on_new_token.call_count == 2
@@ -1,4 +1,6 @@
+import asyncio
 import uuid
+from types import SimpleNamespace
 from copy import deepcopy
 from functools import reduce
 from operator import or_
@@ -6,6 +8,10 @@ from operator import or_
 import pytest
 from unittest.mock import MagicMock
 
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 from langchain.chains import ConversationalRetrievalChain
 from langchain_community.document_loaders.generic import GenericLoader
 from langchain_community.document_loaders.parsers import LanguageParser
@@ -23,7 +29,9 @@ from langchain_community.vectorstores import Redis
 from langchain_core.runnables import RunnablePassthrough, Runnable
 from langchain_core.utils.function_calling import convert_to_openai_function
 
+from ix.chains.components.embeddings import CachedEmbeddings, DatabaseEmbeddingCache
 from ix.chains.fixture_src.agents import OPENAI_FUNCTIONS_AGENT_CLASS_PATH
+from ix.chains.fixture_src.embeddings import OPENAI_EMBEDDINGS_CLASS_PATH
 from ix.chains.fixture_src.lcel import (
     RUNNABLE_MAP_CLASS_PATH,
     RUNNABLE_BRANCH_CLASS_PATH,
@@ -45,13 +53,17 @@ from langchain.schema import (
 from langchain.tools import BaseTool
 
 from ix.chains.fixture_src.tools import GOOGLE_SEARCH
+from ix.chains.loaders import core
 from ix.chains.loaders.core import (
     aload_chain_flow,
+    load_chain_flow,
     BranchPlaceholder,
     MapPlaceholder,
     ainit_chain_flow,
     SequencePlaceholder,
     ImplicitJoin,
+    graph_secrets_scope,
+    load_secrets,
 )
 from ix.chains.loaders.memory import get_memory_session
 from ix.chains.loaders.tools import extract_tool_kwargs, get_runnable_tool
@@ -338,6 +350,58 @@ class TestGetMemorySession:
         assert "unknown scope" in str(excinfo.value)
 
 
+class TestLoadSecrets:
+    @pytest.fixture
+    def graph(self, mocker):
+        mocker.patch.object(
+            core, "get_secret_ids", lambda config, node_type: set(config.values())
+        )
+        return SimpleNamespace(
+            nodes={
+                "a": SimpleNamespace(config={"secret": "good"}, node_type=None),
+                "b": SimpleNamespace(config={"secret": "bad"}, node_type=None),
+            }
+        )
+
+    @pytest.fixture
+    def read_secrets(self, mocker):
+        def read_secrets(secret_ids, user_id=None, errors=None, on_read=None):
+            if "bad" in secret_ids:
+                errors["bad"] = ConnectionError("unreadable")
+            return {"good": {"api_key": "value"}} if "good" in secret_ids else {}
+
+        return mocker.patch.object(core, "read_secrets", side_effect=read_secrets)
+
+    def test_read_error(self, graph, read_secrets):
+        """A secret that fails to read only fails the nodes that use it"""
+        with graph_secrets_scope():
+            config = {"secret": "good"}
+            load_secrets(config, node_type=None, graph=graph)
+            assert config == {"secret": "good", "api_key": "value"}
+
+            # secrets are read once for the graph
+            read_secrets.assert_called_once()
+
+            # errors aren't kept, the failed secret is read again
+            with pytest.raises(Exception, match="Failed to load secrets"):
+                load_secrets({"secret": "bad"}, node_type=None, graph=graph)
+            assert read_secrets.call_count == 2
+            assert read_secrets.call_args.args[0] == {"bad"}
+
+    def test_not_kept_after_scope(self, graph, read_secrets):
+        """Secrets aren't kept on the graph after the flow is initialized"""
+        with graph_secrets_scope():
+            load_secrets({"secret": "good"}, node_type=None, graph=graph)
+
+        # outside a scope nodes only read their own secrets
+        config = {"secret": "good"}
+        load_secrets(config, node_type=None, graph=graph)
+        assert config == {"secret": "good", "api_key": "value"}
+        assert read_secrets.call_count == 2
+        assert read_secrets.call_args.args[0] == {"good"}
+        assert "_ix_secrets" not in graph.__dict__
+
+
 class TestLoadChain:
     def test_load_chain(self):
         pass
@@ -576,6 +640,16 @@ class TestLoadRetrieval:
         component = await aload_chain(EMBEDDINGS)
         assert isinstance(component, OpenAIEmbeddings)
 
+    async def test_load_embeddings_with_cache(self, aload_chain):
+        config = deepcopy(EMBEDDINGS)
+        config["config"]["embedding_cache"] = "database"
+        component = await aload_chain(config)
+        assert isinstance(component, CachedEmbeddings)
+        assert isinstance(component.embeddings, OpenAIEmbeddings)
+        assert isinstance(component.cache, DatabaseEmbeddingCache)
+        assert component.class_path == OPENAI_EMBEDDINGS_CLASS_PATH
+        assert component.model == "text-embedding-ada-002"
+
     async def test_load_vectorstore(
         self, clean_redis, aload_chain, mock_openai_embeddings
     ):
@@ -1263,6 +1337,38 @@ class TestLoadFlow:
         # assert flow.branches[0][1][2] == fixture["node5"]
         # assert flow.branches[1][1][2] == fixture["node5"]
 
+    async def test_query_count(
+        self, lcel_sequence, lcel_join_after_branch, aix_context
+    ):
+        """Loading a flow issues a constant number of queries regardless of size"""
+
+        def count_queries(chain: Chain) -> int:
+            with CaptureQueriesContext(connection) as context:
+                load_chain_flow(chain)
+            return len(context.captured_queries)
+
+        small = await sync_to_async(count_queries)(lcel_sequence["chain"])
+        large = await sync_to_async(count_queries)(lcel_join_after_branch["chain"])
+
+        # nodes + edges + saving the flow plan
+        assert small == 3
+        assert large == small
+
+        # reloading uses the saved flow plan
+        small = await sync_to_async(count_queries)(lcel_sequence["chain"])
+        large = await sync_to_async(count_queries)(lcel_join_after_branch["chain"])
+        assert small == 2
+        assert large == small
+
+    async def test_aload_concurrent(self, lcel_sequence, lcel_branch):
+        """Flows are loaded with the async ORM and may load concurrently"""
+        (_, sequence), (_, branch) = await asyncio.gather(
+            aload_chain_flow(lcel_sequence["chain"]),
+            aload_chain_flow(lcel_branch["chain"]),
+        )
+        assert sequence == SequencePlaceholder(steps=lcel_sequence["nodes"])
+        assert branch.node == lcel_branch["branch"].node
+
     async def test_each(self, lcel_flow_each):
         fixture = lcel_flow_each
         chain = fixture["chain"]
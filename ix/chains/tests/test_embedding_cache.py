@@ -0,0 +1,132 @@
+from typing import List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from ix.chains.components.embeddings import (
+    CachedEmbeddings,
+    DatabaseEmbeddingCache,
+    EmbeddingCacheBackend,
+    get_embedding_model,
+    text_hash,
+)
+from ix.chains.models import EmbeddingCache
+
+CLASS_PATH = "ix.chains.tests.test_embedding_cache.MockEmbeddings"
+
+
+class MockEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text)), 0.0, 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.embedded.append(text)
+        return [float(len(text)), 1.0, 0.0]
+
+
+@pytest.fixture
+def embeddings():
+    return CachedEmbeddings(
+        MockEmbeddings(),
+        class_path=CLASS_PATH,
+        model="mock",
+        cache=DatabaseEmbeddingCache(),
+    )
+
+
+@pytest.mark.django_db
+class TestCachedEmbeddings:
+    def test_embed_documents(self, embeddings, django_assert_num_queries):
+        # one lookup and one write for the misses
+        with django_assert_num_queries(2):
+            vectors = embeddings.embed_documents(["a", "bb", "a"])
+        assert vectors == [[1.0, 0.0, 1.0], [2.0, 0.0, 1.0], [1.0, 0.0, 1.0]]
+        assert embeddings.embeddings.embedded == ["a", "bb"]
+        assert EmbeddingCache.objects.count() == 2
+
+        # only misses are embedded
+        with django_assert_num_queries(2):
+            vectors = embeddings.embed_documents(["bb", "ccc"])
+        assert vectors == [[2.0, 0.0, 1.0], [3.0, 0.0, 1.0]]
+        assert embeddings.embeddings.embedded == ["a", "bb", "ccc"]
+
+        # all cached
+        with django_assert_num_queries(1):
+            embeddings.embed_documents(["a", "bb", "ccc"])
+        assert embeddings.embeddings.embedded == ["a", "bb", "ccc"]
+
+    def test_embed_query(self, embeddings):
+        assert embeddings.embed_query("a") == [1.0, 1.0, 0.0]
+        assert embeddings.embed_query("a") == [1.0, 1.0, 0.0]
+        assert embeddings.embeddings.embedded == ["a"]
+
+        # queries are cached separately from documents
+        assert embeddings.embed_documents(["a"]) == [[1.0, 0.0, 1.0]]
+
+    def test_cache_key(self, embeddings):
+        embeddings.embed_documents(["a"])
+        other_model = CachedEmbeddings(
+            embeddings.embeddings,
+            class_path=CLASS_PATH,
+            model="other",
+            cache=DatabaseEmbeddingCache(),
+        )
+        other_model.embed_documents(["a"])
+        assert embeddings.embeddings.embedded == ["a", "a"]
+        assert EmbeddingCache.objects.filter(text_hash=text_hash("a")).count() == 2
+
+    async def test_aembed_documents(self, embeddings, mocker):
+        aembed_documents = mocker.spy(embeddings.embeddings, "aembed_documents")
+        assert await embeddings.aembed_documents(["a"]) == [[1.0, 0.0, 1.0]]
+        assert await embeddings.aembed_documents(["a", "bb", "a"]) == [
+            [1.0, 0.0, 1.0],
+            [2.0, 0.0, 1.0],
+            [1.0, 0.0, 1.0],
+        ]
+        assert embeddings.embeddings.embedded == ["a", "bb"]
+
+        # the wrapped component's async method is called with the misses only
+        assert aembed_documents.call_args_list == [
+            mocker.call(["a"]),
+            mocker.call(["bb"]),
+        ]
+
+    async def test_aembed_query(self, embeddings, mocker):
+        aembed_query = mocker.spy(embeddings.embeddings, "aembed_query")
+        assert await embeddings.aembed_query("a") == [1.0, 1.0, 0.0]
+        assert await embeddings.aembed_query("a") == [1.0, 1.0, 0.0]
+        assert embeddings.embeddings.embedded == ["a"]
+        aembed_query.assert_called_once_with("a")
+
+
+def test_incomplete_backend():
+    """Backends must implement both mget and mset"""
+
+    class ReadOnlyCache(EmbeddingCacheBackend):
+        def mget(self, class_path, model, hashes):
+            return {}
+
+    with pytest.raises(TypeError):
+        ReadOnlyCache()
+
+
+def test_get_embedding_model():
+    assert get_embedding_model({"model": "ada"}) == "ada"
+    assert get_embedding_model({"model_name": "bge"}) == "bge"
+    assert get_embedding_model({}) == ""
+
+
+def test_get_embedding_model_params():
+    """Options that change the vectors are part of the model"""
+    small = get_embedding_model({"model": "text-embedding-3", "dimensions": 256})
+    large = get_embedding_model({"model": "text-embedding-3", "dimensions": 1024})
+    assert small.startswith("text-embedding-3:")
+    assert small != large
+    assert small == get_embedding_model(
+        {"dimensions": 256, "model": "text-embedding-3", "chunk_size": 100}
+    )
+    assert get_embedding_model({"model": "ada", "dimensions": None}) == "ada"
@@ -0,0 +1,76 @@
+import threading
+
+import pytest
+from langchain.memory import ConversationBufferMemory
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.prompts import ChatPromptTemplate
+
+from ix.chains.loaders import executor
+from ix.chains.loaders.executor import in_loader_thread, run_loaders
+from ix.chains.tests.mock_configs import LLM_REPLY_WITH_HISTORY_AND_MEMORY
+from ix.chains.tests.test_config_loader import unpack_chain_flow
+
+
+@pytest.fixture
+def loader_workers(settings):
+    settings.FLOW_LOADER_WORKERS = 4
+
+
+class TestRunLoaders:
+    def test_concurrent(self, loader_workers):
+        """Loaders wait on each other so they only finish if run concurrently"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def loader(value):
+            barrier.wait()
+            return value
+
+        loaders = [(key, lambda key=key: loader(key)) for key in ["a", "b", "c"]]
+        assert run_loaders(loaders) == {"a": "a", "b": "b", "c": "c"}
+
+    def test_sequential(self, settings):
+        settings.FLOW_LOADER_WORKERS = 0
+        thread = threading.current_thread()
+        loaders = [
+            ("a", lambda: threading.current_thread()),
+            ("b", lambda: threading.current_thread()),
+        ]
+        assert run_loaders(loaders) == {"a": thread, "b": thread}
+
+    def test_nested(self, loader_workers):
+        """Nested loaders run sequentially in the loader thread"""
+
+        def parent():
+            assert in_loader_thread()
+            thread = threading.current_thread()
+            nested = run_loaders(
+                [("x", threading.current_thread), ("y", threading.current_thread)]
+            )
+            return nested == {"x": thread, "y": thread}
+
+        assert run_loaders([("a", parent), ("b", parent)]) == {"a": True, "b": True}
+
+    def test_error(self, loader_workers):
+        def fail():
+            raise ValueError("failed")
+
+        with pytest.raises(ValueError, match="failed"):
+            run_loaders([("a", lambda: 1), ("b", fail)])
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLoadPropertiesConcurrently:
+    def test_load_node(self, load_chain, loader_workers, mock_openai_key, mocker):
+        """Properties load on loader threads that close their DB connections"""
+        run_in_loader_thread = mocker.spy(executor, "_run_in_loader_thread")
+        close_old_connections = mocker.spy(executor, "close_old_connections")
+        flow = load_chain(LLM_REPLY_WITH_HISTORY_AND_MEMORY)
+
+        chain = unpack_chain_flow(flow)
+        assert isinstance(chain.llm, BaseLanguageModel)
+        assert isinstance(chain.memory, ConversationBufferMemory)
+        assert isinstance(chain.prompt, ChatPromptTemplate)
+        # llm, memory and prompt load on loader threads that each close their
+        # connection when done.
+        assert run_in_loader_thread.call_count >= 3
+        assert close_old_connections.call_count == run_in_loader_thread.call_count
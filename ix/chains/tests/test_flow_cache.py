@@ -0,0 +1,100 @@
+import pytest
+
+from ix.chains.loaders.cache import (
+    ais_flow_cacheable,
+    aload_cached_chain_flow,
+    ainvalidate_chain_flow,
+    flow_cache,
+    get_flow_key,
+    UNCACHEABLE,
+)
+from ix.chains.fixture_src.agents import OPENAI_FUNCTIONS_AGENT_CLASS_PATH
+from ix.chains.models import Chain, NodeType
+from ix.chains.tests.mock_configs import GOOGLE_SEARCH_CONFIG, MEMORY
+from ix.chains.tests.mock_runnable import MOCK_RUNNABLE_CLASS_PATH
+from ix.task_log.tests.fake import afake_chain_node
+
+AGENT_WITH_TOOLS = {
+    "class_path": OPENAI_FUNCTIONS_AGENT_CLASS_PATH,
+    "name": "tester",
+    "description": "test",
+    "config": {
+        "tools": [GOOGLE_SEARCH_CONFIG],
+        "llm": {"class_path": "langchain_community.chat_models.ChatOpenAI"},
+    },
+}
+
+
+@pytest.fixture
+def flow_cache_enabled(settings):
+    settings.FLOW_CACHE_ENABLED = True
+    flow_cache.clear()
+    yield
+    flow_cache.clear()
+
+
+@pytest.mark.django_db
+class TestFlowCache:
+    async def test_reuses_flow(self, lcel_sequence, aix_context, flow_cache_enabled):
+        chain = lcel_sequence["chain"]
+        flow = await aload_cached_chain_flow(chain, context=aix_context)
+        assert await aload_cached_chain_flow(chain, context=aix_context) is flow
+
+        output = await flow.ainvoke(
+            input={"input": "test"}, config={"ix_context": aix_context}
+        )
+        assert output == {"input": "test", "sequence_0": 0, "sequence_1": 1}
+
+    async def test_invalidate(self, lcel_sequence, aix_context, flow_cache_enabled):
+        chain = lcel_sequence["chain"]
+        flow = await aload_cached_chain_flow(chain, context=aix_context)
+
+        await ainvalidate_chain_flow(chain.id)
+        assert get_flow_key(chain, aix_context) not in flow_cache
+
+        chain = await Chain.objects.aget(id=chain.id)
+        assert chain.revision == 1
+        assert await aload_cached_chain_flow(chain, context=aix_context) is not flow
+
+    async def test_cached_per_user(
+        self, lcel_sequence, aix_context, flow_cache_enabled
+    ):
+        """Flows are loaded with the user's secrets so they aren't shared by users"""
+        chain = lcel_sequence["chain"]
+        other_context = aix_context.model_copy(update={"user_id": "-1"})
+        flow = await aload_cached_chain_flow(chain, context=aix_context)
+        assert await aload_cached_chain_flow(chain, context=other_context) is not flow
+        assert await aload_cached_chain_flow(chain, context=aix_context) is flow
+
+    async def test_lazy_not_cached(
+        self, lcel_sequence, aix_context, flow_cache_enabled
+    ):
+        """Lazy nodes load with the context the flow was compiled with"""
+        chain = lcel_sequence["chain"]
+        await NodeType.objects.filter(class_path=MOCK_RUNNABLE_CLASS_PATH).aupdate(
+            lazy=True
+        )
+        await aload_cached_chain_flow(chain, context=aix_context)
+        assert flow_cache.get(get_flow_key(chain, aix_context)) is UNCACHEABLE
+
+    async def test_tools_not_cached(self, anode_types):
+        """Tools run their flows with the context they were loaded with"""
+        node = await afake_chain_node(config=AGENT_WITH_TOOLS)
+        chain = await Chain.objects.aget(id=node.chain_id)
+        assert not await ais_flow_cacheable(chain)
+
+    async def test_disabled(self, lcel_sequence, aix_context, settings):
+        settings.FLOW_CACHE_ENABLED = False
+        chain = lcel_sequence["chain"]
+        flow = await aload_cached_chain_flow(chain, context=aix_context)
+        assert await aload_cached_chain_flow(chain, context=aix_context) is not flow
+
+    async def test_context_bound_not_cached(
+        self, anode_types, aix_context, flow_cache_enabled
+    ):
+        """Memory is scoped to the context it was loaded with"""
+        node = await afake_chain_node(config=MEMORY)
+        chain = await Chain.objects.aget(id=node.chain_id)
+
+        await aload_cached_chain_flow(chain, context=aix_context)
+        assert flow_cache.get(get_flow_key(chain, aix_context)) is UNCACHEABLE
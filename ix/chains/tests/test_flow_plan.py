@@ -0,0 +1,103 @@
+import pytest
+
+from ix.chains.loaders.cache import ainvalidate_chain_flow
+from ix.chains.loaders.core import (
+    ainit_chain_flow,
+    aload_chain_flow,
+    get_flow_roots,
+    load_flow_node,
+)
+from ix.chains.loaders.graph import ChainGraph
+from ix.chains.loaders.plan import (
+    FLOW_PLAN_VERSION,
+    compile_flow_plan,
+    deserialize_flow,
+    load_flow_plan,
+    serialize_flow,
+)
+from ix.chains.models import Chain, ChainEdge
+from ix.task_log.tests.fake import afake_chain
+
+
+@pytest.mark.django_db
+class TestFlowPlan:
+    @pytest.mark.parametrize(
+        "fixture_name",
+        [
+            "lcel_sequence",
+            "lcel_map_in_sequence",
+            "lcel_branch",
+            "lcel_branch_in_sequence",
+        ],
+    )
+    async def test_round_trip(self, fixture_name, request):
+        fixture = request.getfixturevalue(fixture_name)
+        graph = await ChainGraph.aload(fixture["chain"].id)
+        flow = load_flow_node(get_flow_roots(graph))
+
+        plan = serialize_flow(flow)
+        assert deserialize_flow(plan, graph) == flow
+
+    async def test_compile(self, lcel_sequence):
+        graph = await ChainGraph.aload(lcel_sequence["chain"].id)
+        plan, error = compile_flow_plan(graph)
+        assert error is None
+        assert plan["version"] == FLOW_PLAN_VERSION
+        assert plan["flow"]["type"] == "sequence"
+
+    async def test_compile_empty_chain(self):
+        chain = await afake_chain()
+        graph = await ChainGraph.aload(chain.id)
+        assert compile_flow_plan(graph) == (None, None)
+
+    async def test_missing_default_branch(self, lcel_branch):
+        """Graph errors are recorded on the chain when it is saved"""
+        chain = lcel_branch["chain"]
+        branch = lcel_branch["branch"]
+        await ChainEdge.objects.filter(
+            source_id=branch.node.id, source_key="default"
+        ).adelete()
+
+        await ainvalidate_chain_flow(chain.id)
+        chain = await Chain.objects.aget(id=chain.id)
+        assert chain.flow_plan is None
+        assert chain.flow_plan_error == "Branch node must have a default branch"
+
+    async def test_load_from_plan(self, lcel_join_after_branch, aix_context):
+        chain = lcel_join_after_branch["chain"]
+        await ainvalidate_chain_flow(chain.id)
+        chain = await Chain.objects.aget(id=chain.id)
+        assert chain.flow_plan["version"] == FLOW_PLAN_VERSION
+        assert chain.flow_plan["revision"] == chain.revision
+        assert chain.flow_plan_error is None
+
+        flow = await ainit_chain_flow(chain, context=aix_context)
+        assert await flow.ainvoke(input={"a": 1}) == {
+            "a": 1,
+            "node2": 0,
+            "node4": 0,
+            "node5": 0,
+        }
+
+    async def test_saves_plan(self, lcel_sequence):
+        """Chains created outside the editor save a plan on first load"""
+        chain = lcel_sequence["chain"]
+        assert chain.flow_plan is None
+
+        _, flow = await aload_chain_flow(chain)
+        chain = await Chain.objects.aget(id=chain.id)
+        assert chain.flow_plan["version"] == FLOW_PLAN_VERSION
+
+        _, flow_from_plan = await aload_chain_flow(chain)
+        assert flow_from_plan == flow
+
+    async def test_stale_plan(self, lcel_sequence):
+        """Plans compiled for another revision are ignored"""
+        chain = lcel_sequence["chain"]
+        await ainvalidate_chain_flow(chain.id)
+        chain = await Chain.objects.aget(id=chain.id)
+        graph = await ChainGraph.aload(chain.id)
+        assert load_flow_plan(chain, graph) is not None
+
+        chain.revision += 1
+        assert load_flow_plan(chain, graph) is None
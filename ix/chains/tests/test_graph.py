@@ -0,0 +1,71 @@
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ix.chains.loaders.graph import ChainGraph
+from ix.chains.models import ChainEdge, ChainNode
+
+
+@pytest.mark.django_db
+class TestChainGraph:
+    async def test_aload(self, lcel_sequence):
+        chain = lcel_sequence["chain"]
+        node1, node2 = lcel_sequence["nodes"]
+
+        graph = await ChainGraph.aload(chain.id)
+        assert set(graph.nodes) == {node1.id, node2.id}
+        assert graph.roots == [node1]
+        assert graph.chat_root is None
+
+        # adjacency
+        outgoing = graph.outgoing(node1, relation="LINK")
+        assert len(outgoing) == 1
+        assert outgoing[0].target is graph.get_node(node2)
+        assert graph.incoming(node2, relation="LINK") == outgoing
+        assert graph.incoming(node2, relation="PROP") == []
+        assert graph.outgoing(node1, source_key="out", target_key="in") == outgoing
+        assert graph.get_edge(source=node1, target=node2) == outgoing[0]
+        with pytest.raises(ChainEdge.DoesNotExist):
+            graph.get_edge(source=node2, target=node1)
+
+        # indexed nodes reference the graph
+        assert ChainGraph.for_node(graph.get_node(node1)) is graph
+
+    async def test_afor_node(self, lcel_sequence):
+        """Nodes loaded outside the graph are attached to it"""
+        node1, node2 = lcel_sequence["nodes"]
+        node = await ChainNode.objects.aget(id=node1.id)
+
+        graph = await ChainGraph.afor_node(node)
+        assert await ChainGraph.afor_node(node) is graph
+        assert ChainGraph.for_node(node) is graph
+        assert graph.outgoing(node)[0].target is graph.get_node(node2)
+
+    async def test_load_query_count(self, lcel_join_after_branch):
+        chain = lcel_join_after_branch["chain"]
+
+        def load():
+            with CaptureQueriesContext(connection) as context:
+                graph = ChainGraph.load(chain.id)
+                # traversing and reading node types does not query
+                for node in graph.nodes.values():
+                    assert node.node_type
+                    for edge in graph.outgoing(node):
+                        assert edge.target.node_type
+            return graph, len(context.captured_queries)
+
+        graph, count = await sync_to_async(load)()
+        assert count == 2
+        assert graph.get_node(lcel_join_after_branch["branch_node"])
+
+    def test_group_by(self):
+        edges = [
+            ChainEdge(source_key="b", target_key="in"),
+            ChainEdge(source_key=None, target_key="in"),
+            ChainEdge(source_key="a", target_key="in"),
+            ChainEdge(source_key="b", target_key="in"),
+        ]
+        grouped = ChainGraph.group_by(edges, "source_key")
+        assert [key for key, _ in grouped] == ["a", "b", None]
+        assert [len(group) for _, group in grouped] == [1, 2, 1]
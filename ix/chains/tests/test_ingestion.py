@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Iterator, List
+
+import pytest
+from langchain.text_splitter import CharacterTextSplitter
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_core.documents import Document
+
+from ix.chains.loaders.ingestion import ingest_documents, iter_batches
+from ix.chains.loaders.text_splitter import TextSplitterShim
+
+
+class MockLoader(BaseLoader):
+    """Loader that streams documents and counts how many were read"""
+
+    def __init__(self, count: int, error_at: int = None):
+        self.count = count
+        self.error_at = error_at
+        self.read = 0
+
+    def lazy_load(self) -> Iterator[Document]:
+        for i in range(self.count):
+            if i == self.error_at:
+                raise ValueError("loader error")
+            self.read += 1
+            yield Document(page_content=f"doc {i}", metadata={"i": i})
+
+    def load(self) -> List[Document]:
+        raise AssertionError("documents should be streamed")
+
+
+class MockVectorStore:
+    """Records the batches it was created with and added to"""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], **kwargs):
+        vectorstore = cls(**kwargs)
+        vectorstore.batches.append(documents)
+        return vectorstore
+
+    def on_add(self, documents: List[Document]):
+        pass
+
+    def add_documents(self, documents: List[Document]):
+        self.on_add(documents)
+        with self.lock:
+            self.batches.append(documents)
+
+    @property
+    def documents(self) -> List[Document]:
+        return [document for batch in self.batches for document in batch]
+
+
+def test_iter_batches():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_batches([], 2)) == []
+
+
+class TestIngestDocuments:
+    def test_ingest(self):
+        loader = MockLoader(10)
+        progress = []
+        vectorstore = ingest_documents(
+            MockVectorStore,
+            loader,
+            {},
+            batch_size=3,
+            concurrency=2,
+            on_progress=lambda p: progress.append(p.added),
+        )
+        assert len(vectorstore.batches[0]) == 3
+        assert sorted(len(batch) for batch in vectorstore.batches) == [1, 3, 3, 3]
+        assert sorted(doc.metadata["i"] for doc in vectorstore.documents) == list(
+            range(10)
+        )
+        assert progress[-1] == 10
+
+    def test_ingest_text_splitter(self):
+        loader = MockLoader(4)
+        text_splitter = CharacterTextSplitter(
+            separator=" ", chunk_size=1, chunk_overlap=0
+        )
+        shim = TextSplitterShim(document_loader=loader, text_splitter=text_splitter)
+        vectorstore = ingest_documents(MockVectorStore, shim, {}, batch_size=3)
+
+        # each document is split into 2 chunks
+        assert len(vectorstore.documents) == 8
+        assert vectorstore.batches[0][0].page_content == "doc"
+
+    def test_ingest_empty(self):
+        assert ingest_documents(MockVectorStore, MockLoader(0), {}) is None
+
+    def test_bounded_queue(self):
+        """reading documents blocks while the workers are behind"""
+        release = threading.Event()
+        loader = MockLoader(1000)
+
+        class BlockingVectorStore(MockVectorStore):
+            def on_add(self, documents):
+                release.wait()
+
+        thread = threading.Thread(
+            target=ingest_documents,
+            args=(BlockingVectorStore, loader, {}),
+            kwargs=dict(batch_size=10, concurrency=2, queue_size=2),
+        )
+        thread.start()
+        time.sleep(0.2)
+
+        # first batch + 2 batches in workers + 2 queued + 1 waiting to be queued
+        assert loader.read <= 10 * 6
+        release.set()
+        thread.join(timeout=5)
+        assert loader.read == 1000
+
+    def test_worker_error(self):
+        class FailingVectorStore(MockVectorStore):
+            def on_add(self, documents):
+                raise ValueError("add error")
+
+        loader = MockLoader(1000)
+
+        with pytest.raises(ValueError, match="add error"):
+            ingest_documents(
+                FailingVectorStore, loader, {}, batch_size=10, queue_size=1
+            )
+        # reading stops after the error
+        assert loader.read < 1000
+
+    def test_loader_error(self):
+        loader = MockLoader(100, error_at=50)
+        with pytest.raises(ValueError, match="loader error"):
+            ingest_documents(MockVectorStore, loader, {}, batch_size=10)
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import pytest
+
+from ix.chains.loaders.core import ainit_chain_flow
+from ix.chains.models import NodeType
+from ix.chains.tests.mock_runnable import MOCK_RUNNABLE_CLASS_PATH
+from ix.runnable.ix import LazyIxNode
+
+
+async def set_lazy(lazy: bool | None):
+    await NodeType.objects.filter(class_path=MOCK_RUNNABLE_CLASS_PATH).aupdate(
+        lazy=lazy
+    )
+
+
+def get_lazy_nodes(flow):
+    return [step for step in flow.steps if isinstance(step, LazyIxNode)]
+
+
+@pytest.mark.django_db
+class TestLazyIxNode:
+    async def test_lazy_node_type(self, lcel_sequence, aix_context):
+        await set_lazy(True)
+        flow = await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+
+        lazy_nodes = get_lazy_nodes(flow)
+        assert len(lazy_nodes) == 2
+        assert not any(node.is_loaded for node in lazy_nodes)
+
+        output = await flow.ainvoke(input={"input": "test"})
+        assert output == {"input": "test", "sequence_0": 0, "sequence_1": 1}
+        assert all(node.is_loaded for node in lazy_nodes)
+
+        # loaded children are kept
+        children = [node.child for node in lazy_nodes]
+        await flow.ainvoke(input={"input": "test"})
+        assert [node.child for node in lazy_nodes] == children
+
+    async def test_type_default(self, lcel_sequence, aix_context, settings):
+        node_type = await NodeType.objects.aget(class_path=MOCK_RUNNABLE_CLASS_PATH)
+        settings.LAZY_NODE_TYPES = [node_type.type]
+        flow = await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+        assert len(get_lazy_nodes(flow)) == 2
+
+        # NodeType overrides the default
+        await set_lazy(False)
+        flow = await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+        assert get_lazy_nodes(flow) == []
+
+    async def test_eager_by_default(self, lcel_sequence, aix_context):
+        flow = await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+        assert get_lazy_nodes(flow) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLazyIxNodeConcurrency:
+    async def test_load_concurrently(self, lcel_sequence, aix_context, settings):
+        """Nodes have their own lock so they can load at the same time"""
+        settings.EXECUTOR_DB_WORKERS = 2
+        await set_lazy(True)
+        flow = await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+        lazy_nodes = get_lazy_nodes(flow)
+        assert lazy_nodes[0]._load_lock is not lazy_nodes[1]._load_lock
+
+        # loaders wait on each other so they only finish if loaded concurrently
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_other(loader):
+            def load():
+                barrier.wait()
+                return loader()
+
+            return load
+
+        for node in lazy_nodes:
+            node.loader = wait_for_other(node.loader)
+
+        await asyncio.gather(*[node.aload() for node in lazy_nodes])
+        assert all(node.is_loaded for node in lazy_nodes)
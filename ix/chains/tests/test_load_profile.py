@@ -0,0 +1,78 @@
+import pytest
+from httpx import AsyncClient
+
+from ix.chains.loaders.core import ainit_chain_flow
+from ix.chains.loaders.profile import LoadProfiler
+from ix.chains.models import Chain
+from ix.runnable_log.models import FlowLoadProfile
+from ix.server.fast_api import app
+from ix.task_log.models import Task
+
+
+def iter_profiles(profile: dict):
+    yield profile
+    for child in profile["children"]:
+        yield from iter_profiles(child)
+
+
+@pytest.mark.django_db
+class TestLoadProfiler:
+    async def test_profile_flow(self, lcel_sequence, aix_context):
+        with LoadProfiler() as profiler:
+            await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+
+        assert profiler.loaded
+        profile = profiler.root.to_dict()
+        assert profile["name"] == "flow"
+        assert profile["wall_time"] > 0
+        assert profile["queries"] > 0
+
+        nodes = list(iter_profiles(profile))[1:]
+        assert len(nodes) == 2
+        for node in nodes:
+            assert node["node_id"]
+            assert node["class_path"]
+            assert node["wall_time"] >= node["init_time"]
+
+    async def test_disabled(self, lcel_sequence, aix_context, settings):
+        settings.FLOW_LOAD_PROFILE_ENABLED = False
+        with LoadProfiler() as profiler:
+            await ainit_chain_flow(lcel_sequence["chain"], context=aix_context)
+        assert not profiler.loaded
+
+    async def test_save_skipped_when_not_loaded(self, aix_context):
+        task = await Task.objects.aget(id=aix_context.task_id)
+        chain = await Chain.objects.aget(id=task.chain_id)
+        with LoadProfiler() as profiler:
+            pass
+
+        await profiler.asave(task=task, chain=chain)
+        assert not await FlowLoadProfile.objects.filter(task=task).aexists()
+
+
+@pytest.mark.django_db
+class TestLoadProfileEndpoint:
+    async def test_get_load_profile(self, lcel_sequence, aix_context):
+        task = await Task.objects.aget(id=aix_context.task_id)
+        chain = lcel_sequence["chain"]
+        with LoadProfiler() as profiler:
+            await ainit_chain_flow(chain, context=aix_context)
+        await profiler.asave(task=task, chain=chain)
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get(f"/runs/{chain.id}/{task.id}/load_profile")
+
+        assert response.status_code == 200, response.content
+        result = response.json()
+        assert result["task_id"] == str(task.id)
+        assert result["chain_id"] == str(chain.id)
+        assert result["queries"] == profiler.root.queries
+        assert len(result["profile"]["children"]) == 2
+
+    async def test_get_load_profile_not_found(self, aix_context):
+        task = await Task.objects.aget(id=aix_context.task_id)
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.get(f"/runs/{task.chain_id}/{task.id}/load_profile")
+
+        assert response.status_code == 404, response.content
@@ -0,0 +1,142 @@
+import gc
+import threading
+import time
+
+import pytest
+
+from ix.chains.loaders import local_models
+from ix.chains.loaders.local_models import (
+    LOCAL_MODEL_LOAD_FIELDS,
+    LocalModelRegistry,
+)
+
+CLASS_PATH = "ix.chains.tests.test_local_models.MockLocalModel"
+
+
+class MockClient:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, prompt: str) -> str:
+        self.active += 1
+        self.max_active = max(self.active, self.max_active)
+        time.sleep(0.01)
+        self.active -= 1
+        return prompt
+
+    def stream(self, prompt: str):
+        yield from prompt
+
+    def encode(self, inputs, **kwargs):
+        return [len(value) for value in inputs]
+
+
+class MockLocalModel:
+    loads = 0
+
+    def __init__(self, **config):
+        MockLocalModel.loads += 1
+        self.config = config
+        self.client = MockClient()
+
+    def copy(self, update):
+        copy = object.__new__(MockLocalModel)
+        copy.__dict__ = {**self.__dict__, **update}
+        return copy
+
+
+@pytest.fixture
+def registry(mocker, settings):
+    mocker.patch.dict(LOCAL_MODEL_LOAD_FIELDS, {CLASS_PATH: {"model_path", "n_ctx"}})
+    MockLocalModel.loads = 0
+    settings.LOCAL_MODEL_MEMORY_MB = 1024
+    return LocalModelRegistry()
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = tmp_path / "model.gguf"
+    path.write_bytes(b"0" * 1024)
+    return str(path)
+
+
+def load(registry, **config):
+    return registry.load(CLASS_PATH, MockLocalModel, config)
+
+
+class TestLocalModelRegistry:
+    def test_load_once(self, registry, model_path):
+        component = load(registry, model_path=model_path, temperature=0.1)
+        other = load(registry, model_path=model_path, temperature=0.9)
+
+        assert MockLocalModel.loads == 1
+        assert len(registry) == 1
+        assert registry.size == 1024
+        assert component.temperature == 0.1
+        assert other.temperature == 0.9
+        assert component.client("prompt") == "prompt"
+        assert other.client("prompt") == "prompt"
+
+    def test_load_fields(self, registry, model_path):
+        load(registry, model_path=model_path, n_ctx=512)
+        load(registry, model_path=model_path, n_ctx=1024)
+        assert MockLocalModel.loads == 2
+        assert len(registry) == 2
+
+    def test_serialized_access(self, registry, model_path):
+        components = [load(registry, model_path=model_path) for _ in range(4)]
+        threads = [
+            threading.Thread(target=component.client, args=("prompt",))
+            for component in components
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        client = components[0].client._model.component.client
+        assert client.max_active == 1
+
+    def test_stream(self, registry, model_path):
+        component = load(registry, model_path=model_path)
+        assert list(component.client.stream("abc")) == ["a", "b", "c"]
+
+    def test_refcount(self, registry, model_path):
+        component = load(registry, model_path=model_path)
+        other = load(registry, model_path=model_path)
+        model = component.client._model
+        assert model.refs == 2
+
+        del component
+        gc.collect()
+        assert model.refs == 1
+        del other
+        gc.collect()
+        assert model.refs == 0
+
+    def test_evict_unused(self, registry, model_path, settings):
+        settings.LOCAL_MODEL_MEMORY_MB = 0
+        component = load(registry, model_path=model_path, n_ctx=512)
+        del component
+        gc.collect()
+
+        # the unused model is evicted when the next model loads
+        in_use = load(registry, model_path=model_path, n_ctx=1024)
+        assert len(registry) == 1
+
+        # models that are in use are kept
+        load(registry, model_path=model_path, n_ctx=2048)
+        assert len(registry) == 2
+        assert in_use.client("prompt") == "prompt"
+
+    def test_batched_encode(self, registry, model_path, mocker):
+        mocker.patch.object(local_models, "BATCHED_CLASS_PATHS", {CLASS_PATH})
+        component = load(registry, model_path=model_path)
+        batcher = component.client._model.batcher
+        assert batcher is not None
+
+        assert component.client.encode(["a", "bb"]) == [1, 2]
+        assert component.client.encode("ccc") == 3
+        assert batcher.batches == 2
+        batcher.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from ix.chains.loaders.pool import get_instance_key, init_pooled, instance_pool
+from ix.chains.models import NodeType
+
+CLASS_PATH = "ix.chains.tests.test_pool.MockClient"
+
+
+class MockClient:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+@pytest.fixture
+def pool(settings):
+    settings.INSTANCE_POOL_TYPES = ["llm"]
+    instance_pool.clear()
+    yield instance_pool
+    instance_pool.clear()
+
+
+class TestGetInstanceKey:
+    def test_key(self):
+        key = get_instance_key(CLASS_PATH, {"model": "a", "temperature": 0})
+        assert key == get_instance_key(CLASS_PATH, {"temperature": 0, "model": "a"})
+        assert key != get_instance_key(CLASS_PATH, {"model": "b", "temperature": 0})
+        assert key != get_instance_key("other.Class", {"model": "a", "temperature": 0})
+
+    def test_secret_change(self):
+        """changing a secret value loads a new instance"""
+        key = get_instance_key(CLASS_PATH, {"api_key": "key_1"})
+        assert key != get_instance_key(CLASS_PATH, {"api_key": "key_2"})
+
+    def test_empty_per_run_fields(self):
+        key = get_instance_key(CLASS_PATH, {"model": "a"})
+        assert key == get_instance_key(CLASS_PATH, {"model": "a", "tags": None})
+
+    def test_not_pooled(self):
+        assert get_instance_key(CLASS_PATH, {"tags": ["run"]}) is None
+        assert get_instance_key(CLASS_PATH, {"client": MockClient()}) is None
+
+
+class TestInitPooled:
+    def test_shared(self, pool):
+        node_type = NodeType(type="llm")
+        instance = init_pooled(node_type, CLASS_PATH, MockClient, {"model": "a"})
+        assert instance.kwargs == {"model": "a"}
+        shared = init_pooled(node_type, CLASS_PATH, MockClient, {"model": "a"})
+        other = init_pooled(node_type, CLASS_PATH, MockClient, {"model": "b"})
+        assert shared is instance
+        assert other is not instance
+
+    def test_type_not_pooled(self, pool):
+        node_type = NodeType(type="chain")
+        instance = init_pooled(node_type, CLASS_PATH, MockClient, {"model": "a"})
+        other = init_pooled(node_type, CLASS_PATH, MockClient, {"model": "a"})
+        assert other is not instance
+        assert len(pool) == 0
@@ -0,0 +1,47 @@
+import pytest
+
+from ix.chains.loaders.registry import node_type_registry
+from ix.chains.models import NodeType
+from ix.chains.tests.mock_runnable import MOCK_RUNNABLE_CONFIG
+
+
+@pytest.mark.django_db
+class TestNodeTypeRegistry:
+    async def test_get(self, anode_types):
+        node_type = await NodeType.objects.aget(
+            class_path=MOCK_RUNNABLE_CONFIG["class_path"]
+        )
+        entry = node_type_registry.get(node_type)
+        assert entry.revision == node_type.revision
+        assert entry.pydantic.class_path == node_type.class_path
+        assert entry.connectors == node_type.connectors_as_dict
+
+        # other instances of the same NodeType share the entry
+        same_type = await NodeType.objects.aget(id=node_type.id)
+        assert node_type_registry.get(same_type) is entry
+
+    async def test_save_updates_revision(self, anode_types):
+        node_type = await NodeType.objects.aget(
+            class_path=MOCK_RUNNABLE_CONFIG["class_path"]
+        )
+        entry = node_type_registry.get(node_type)
+
+        node_type.description = "updated"
+        await node_type.asave(update_fields=["description"])
+        node_type = await NodeType.objects.aget(id=node_type.id)
+        assert node_type.revision == entry.revision + 1
+
+        updated = node_type_registry.get(node_type)
+        assert updated is not entry
+        assert updated.pydantic.description == "updated"
+
+    async def test_refresh(self, anode_types):
+        node_type = await NodeType.objects.aget(
+            class_path=MOCK_RUNNABLE_CONFIG["class_path"]
+        )
+        entry = node_type_registry.get(node_type)
+        version = node_type_registry.version
+
+        node_type_registry.refresh(node_type.id)
+        assert node_type_registry.version == version + 1
+        assert node_type_registry.get(node_type) is not entry
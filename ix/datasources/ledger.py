@@ -0,0 +1,246 @@
+"""
+Ingestion ledger for DataSources.
+
+The ledger records each source document ingested for a DataSource: the hash of
+its content and the ids of the vectors its chunks were stored as. When the
+DataSource is re-ingested:
+
+- unchanged documents are skipped before they are split or embedded.
+- changed documents are split again. Chunks that were already stored keep their
+  vector, only new chunks are embedded. Vectors of chunks that are gone are
+  deleted.
+- vectors of documents that are no longer in the source are deleted.
+
+Vector ids are derived from the DataSource, the source document and the chunk
+content, so a chunk is always stored under the same id. Vectors are deleted with
+DeleteVectors.
+
+Use get_ingestion_ledger to check the DataSource exists before anything is
+ingested for it.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from ix.chains.loaders.ingestion import Chunk
+from ix.datasources.models import DataSource, IngestedDocument
+from ix.runnable.vectorstore import DeleteVectors
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(document: Document) -> str:
+    metadata = json.dumps(document.metadata, sort_keys=True, default=str)
+    content = f"{document.page_content}\0{metadata}"
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_source_key(document: Document) -> str:
+    """Key identifying the source of a document (e.g. file path or url)"""
+    for key in ("id", "source"):
+        value = document.metadata.get(key, None)
+        if value:
+            return str(value)
+    return content_hash(document)
+
+
+def delete_vectors(vectorstore: VectorStore, ids: List[str]) -> None:
+    if ids:
+        DeleteVectors(vectorstore=vectorstore).invoke(ids)
+
+
+def get_ingestion_ledger(datasource_id: Any, user_id: Any) -> "IngestionLedger":
+    """Return the ledger for a DataSource owned by the user.
+
+    Raises ValueError if the id isn't a UUID or the user doesn't own a DataSource
+    with the id, so ingestion fails before any vectors are written.
+    """
+    try:
+        ledger = IngestionLedger(datasource_id)
+    except ValueError:
+        raise ValueError(f"Invalid DataSource id: {datasource_id}")
+
+    # DataSources are owned by a single user, the same rule the API applies.
+    query = DataSource.objects.filter(id=ledger.datasource_id, user_id=user_id)
+    if user_id is None or not query.exists():
+        raise ValueError(f"DataSource does not exist: {datasource_id}")
+    return ledger
+
+
+@dataclasses.dataclass
+class PendingDocument:
+    """A new or changed document that is being ingested"""
+
+    content_hash: str
+    vector_ids: List[str] = dataclasses.field(default_factory=list)
+    # chunks that haven't been added to the vectorstore yet
+    remaining: int = 0
+
+
+class IngestionLedger:
+    """Tracks the documents ingested for a DataSource during an ingestion.
+
+    `check` and `assign` are called as documents are read. Workers call `complete`
+    when chunks are added. Documents are recorded in the ledger by `flush` once
+    all their chunks were added, so an ingestion that fails is resumed where it
+    stopped. `finish` deletes documents that weren't seen.
+    """
+
+    def __init__(self, datasource_id: Any):
+        self.datasource_uuid = uuid.UUID(str(datasource_id))
+        self.datasource_id = str(self.datasource_uuid)
+        self._entries: Optional[Dict[str, Tuple[str, List[str]]]] = None
+        self._seen: Set[str] = set()
+        self._occurrences: Dict[str, int] = {}
+        self._pending: Dict[str, PendingDocument] = {}
+        self._completed: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> Dict[str, Tuple[str, List[str]]]:
+        """(content_hash, vector_ids) of ingested documents by source id"""
+        if self._entries is None:
+            query = IngestedDocument.objects.filter(datasource_id=self.datasource_id)
+            self._entries = {
+                source_id: (hash_, vector_ids)
+                for source_id, hash_, vector_ids in query.values_list(
+                    "source_id", "content_hash", "vector_ids"
+                )
+            }
+        return self._entries
+
+    def get_source_id(self, document: Document) -> str:
+        # loaders may return several documents per source (e.g. pages of a PDF).
+        # They are told apart by the order they are loaded in.
+        key = get_source_key(document)
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        return key if occurrence == 0 else f"{key}#{occurrence}"
+
+    def get_vector_id(self, source_id: str, chunk: Document, occurrence: int) -> str:
+        name = f"{source_id}\0{content_hash(chunk)}\0{occurrence}"
+        return str(uuid.uuid5(self.datasource_uuid, name))
+
+    def check(self, document: Document) -> Optional[str]:
+        """Returns the source id of a new or changed document, None if unchanged"""
+        source_id = self.get_source_id(document)
+        self._seen.add(source_id)
+        hash_ = content_hash(document)
+        entry = self.entries.get(source_id, None)
+        if entry is not None and entry[0] == hash_:
+            return None
+
+        with self._lock:
+            self._pending[source_id] = PendingDocument(content_hash=hash_)
+        return source_id
+
+    def assign(self, source_id: str, chunks: List[Document]) -> List[Chunk]:
+        """Assign vector ids to the chunks of a document.
+
+        Returns the chunks that need to be added. Chunks stored by a previous
+        ingestion are omitted.
+        """
+        entry = self.entries.get(source_id, None)
+        stored = set(entry[1]) if entry else set()
+
+        vector_ids = []
+        to_add = []
+        occurrences: Dict[str, int] = {}
+        for chunk in chunks:
+            hash_ = content_hash(chunk)
+            occurrence = occurrences.get(hash_, 0)
+            occurrences[hash_] = occurrence + 1
+            vector_id = self.get_vector_id(source_id, chunk, occurrence)
+            vector_ids.append(vector_id)
+            if vector_id not in stored:
+                to_add.append(Chunk(document=chunk, id=vector_id, source_id=source_id))
+
+        with self._lock:
+            pending = self._pending[source_id]
+            pending.vector_ids = vector_ids
+            pending.remaining = len(to_add)
+            if not to_add:
+                self._completed.append(source_id)
+        return to_add
+
+    def complete(self, chunks: Iterable[Chunk]) -> None:
+        """Mark chunks as added to the vectorstore"""
+        with self._lock:
+            for chunk in chunks:
+                pending = self._pending[chunk.source_id]
+                pending.remaining -= 1
+                if pending.remaining == 0:
+                    self._completed.append(chunk.source_id)
+
+    def flush(self, vectorstore: VectorStore) -> int:
+        """Record completed documents and delete their stale vectors.
+
+        Returns the number of documents recorded.
+        """
+        with self._lock:
+            completed = [
+                (source_id, self._pending.pop(source_id))
+                for source_id in self._completed
+            ]
+            self._completed = []
+        if not completed:
+            return 0
+
+        stale = []
+        for source_id, pending in completed:
+            entry = self.entries.get(source_id, None)
+            if entry is not None:
+                new_ids = set(pending.vector_ids)
+                stale.extend(id_ for id_ in entry[1] if id_ not in new_ids)
+            self.entries[source_id] = (pending.content_hash, pending.vector_ids)
+        delete_vectors(vectorstore, stale)
+
+        IngestedDocument.objects.bulk_create(
+            [
+                IngestedDocument(
+                    datasource_id=self.datasource_id,
+                    source_id=source_id,
+                    content_hash=pending.content_hash,
+                    vector_ids=pending.vector_ids,
+                )
+                for source_id, pending in completed
+            ],
+            update_conflicts=True,
+            unique_fields=["datasource", "source_id"],
+            update_fields=["content_hash", "vector_ids", "updated_at"],
+        )
+        return len(completed)
+
+    def finish(self, vectorstore: VectorStore) -> int:
+        """Record remaining documents and delete documents removed from the source.
+
+        Returns the number of documents removed.
+        """
+        self.flush(vectorstore)
+        removed = [
+            source_id for source_id in self.entries if source_id not in self._seen
+        ]
+        if not removed:
+            return 0
+
+        vector_ids = [
+            vector_id
+            for source_id in removed
+            for vector_id in self.entries.pop(source_id)[1]
+        ]
+        delete_vectors(vectorstore, vector_ids)
+        IngestedDocument.objects.filter(
+            datasource_id=self.datasource_id, source_id__in=removed
+        ).delete()
+        logger.info(
+            f"Removed documents datasource={self.datasource_id} "
+            f"documents={len(removed)} vectors={len(vector_ids)}"
+        )
+        return len(removed)
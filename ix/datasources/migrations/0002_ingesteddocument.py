@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("datasources", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngestedDocument",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("source_id", models.CharField(max_length=1024)),
+                ("content_hash", models.CharField(max_length=64)),
+                ("vector_ids", models.JSONField(default=list)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "datasource",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ingested_documents",
+                        to="datasources.datasource",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("datasource", "source_id")},
+            },
+        ),
+    ]
@@ -29,3 +29,25 @@ class DataSource(models.Model):
 
     # Retrieval chain - chain used to import this datasource
     retrieval_chain = models.ForeignKey(Chain, on_delete=models.SET_NULL, null=True)
+
+
+class IngestedDocument(models.Model):
+    """
+    Ledger of source documents ingested for a DataSource.
+
+    Records the content hash of each source document and the ids of the vectors
+    its chunks were stored as. Re-ingesting a DataSource compares documents to the
+    ledger to skip unchanged documents and delete vectors of removed documents.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    datasource = models.ForeignKey(
+        DataSource, on_delete=models.CASCADE, related_name="ingested_documents"
+    )
+    source_id = models.CharField(max_length=1024)
+    content_hash = models.CharField(max_length=64)
+    vector_ids = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("datasource", "source_id")
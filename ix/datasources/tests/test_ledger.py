@@ -0,0 +1,171 @@
+import uuid
+from typing import Any, Iterable, Iterator, List, Optional
+
+import pytest
+from langchain.text_splitter import CharacterTextSplitter
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from ix.chains.loaders.ingestion import ingest_documents
+from ix.chains.loaders.text_splitter import TextSplitterShim
+from ix.datasources.ledger import IngestionLedger, get_ingestion_ledger
+from ix.datasources.models import IngestedDocument
+from ix.datasources.tests.fake import fake_datasource
+from ix.ix_users.tests.fake import fake_user
+
+
+class MockLoader(BaseLoader):
+    def __init__(self, documents: List[Document]):
+        self.documents = documents
+
+    def lazy_load(self) -> Iterator[Document]:
+        yield from self.documents
+
+
+class MockVectorStore(VectorStore):
+    """In memory vectorstore that records the texts it added"""
+
+    def __init__(self, embedding: Any, store: dict, added: list):
+        self.store = store
+        self.added = added
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        for id_, text in zip(ids, texts):
+            self.store[id_] = text
+        self.added.extend(texts)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> bool:
+        for id_ in ids:
+            del self.store[id_]
+        return True
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any):
+        raise NotImplementedError
+
+    @classmethod
+    def from_texts(cls, texts, embedding=None, metadatas=None, **kwargs):
+        vectorstore = cls(
+            embedding=embedding, store=kwargs.pop("store"), added=kwargs.pop("added")
+        )
+        vectorstore.add_texts(texts, metadatas=metadatas, **kwargs)
+        return vectorstore
+
+
+def doc(source: str, content: str) -> Document:
+    return Document(page_content=content, metadata={"source": source})
+
+
+@pytest.mark.django_db
+class TestIngestionLedger:
+    @pytest.fixture
+    def datasource(self, user):
+        return fake_datasource(user=user)
+
+    def ingest(self, datasource, documents: List[Document], store: dict) -> list:
+        added = []
+        text_splitter = CharacterTextSplitter(
+            separator="\n", chunk_size=1, chunk_overlap=0
+        )
+        shim = TextSplitterShim(
+            document_loader=MockLoader(documents), text_splitter=text_splitter
+        )
+        ingest_documents(
+            MockVectorStore,
+            shim,
+            {"embedding": None, "store": store, "added": added},
+            batch_size=2,
+            ledger=IngestionLedger(datasource.id),
+        )
+        return added
+
+    def test_reingest(self, datasource):
+        store = {}
+        documents = [doc("a", "a1\na2"), doc("b", "b1"), doc("c", "c1")]
+        added = self.ingest(datasource, documents, store)
+        assert sorted(added) == ["a1", "a2", "b1", "c1"]
+        assert sorted(store.values()) == ["a1", "a2", "b1", "c1"]
+        assert IngestedDocument.objects.filter(datasource=datasource).count() == 3
+
+        # unchanged documents aren't ingested again
+        added = self.ingest(datasource, documents, store)
+        assert added == []
+        assert sorted(store.values()) == ["a1", "a2", "b1", "c1"]
+
+        # changed: only new chunks are added and stale chunks are deleted
+        # removed: vectors and ledger entries are deleted
+        documents = [doc("a", "a1\na3"), doc("b", "b1"), doc("d", "d1")]
+        added = self.ingest(datasource, documents, store)
+        assert sorted(added) == ["a3", "d1"]
+        assert sorted(store.values()) == ["a1", "a3", "b1", "d1"]
+        source_ids = IngestedDocument.objects.filter(datasource=datasource).values_list(
+            "source_id", flat=True
+        )
+        assert sorted(source_ids) == ["a", "b", "d"]
+
+        # everything removed
+        added = self.ingest(datasource, [], store)
+        assert added == []
+        assert store == {}
+        assert not IngestedDocument.objects.filter(datasource=datasource).exists()
+
+    def test_repeated_source(self, datasource):
+        """documents with the same source (e.g. pages) are tracked separately"""
+        store = {}
+        documents = [doc("a", "page 1"), doc("a", "page 2")]
+        self.ingest(datasource, documents, store)
+        ledger = IngestionLedger(datasource.id)
+        assert sorted(ledger.entries) == ["a", "a#1"]
+
+        documents = [doc("a", "page 1"), doc("a", "page 2 edited")]
+        added = self.ingest(datasource, documents, store)
+        assert added == ["page 2 edited"]
+        assert sorted(store.values()) == ["page 1", "page 2 edited"]
+
+    def test_vector_ids_are_stable(self, datasource):
+        ledger = IngestionLedger(datasource.id)
+        source_id = ledger.check(doc("a", "a1"))
+        chunks = ledger.assign(source_id, [doc("a", "a1"), doc("a", "a1")])
+
+        # repeated chunks get distinct ids
+        assert len({chunk.id for chunk in chunks}) == 2
+
+        other = IngestionLedger(datasource.id)
+        source_id = other.check(doc("a", "a1"))
+        assert [chunk.id for chunk in other.assign(source_id, [doc("a", "a1")])] == [
+            chunks[0].id
+        ]
+
+
+@pytest.mark.django_db
+class TestGetIngestionLedger:
+    def test_get_ingestion_ledger(self, user):
+        datasource = fake_datasource(user=user)
+        ledger = get_ingestion_ledger(str(datasource.id), user_id=user.id)
+        assert ledger.datasource_id == str(datasource.id)
+
+    def test_invalid_id(self, user):
+        with pytest.raises(ValueError, match="Invalid DataSource id"):
+            get_ingestion_ledger("not-a-uuid", user_id=user.id)
+
+    def test_does_not_exist(self, user):
+        with pytest.raises(ValueError, match="DataSource does not exist"):
+            get_ingestion_ledger(uuid.uuid4(), user_id=user.id)
+
+    def test_other_user(self, user):
+        """Users can't ingest into DataSources owned by other users"""
+        datasource = fake_datasource(user=user)
+        other = fake_user(username="other")
+        with pytest.raises(ValueError, match="DataSource does not exist"):
+            get_ingestion_ledger(datasource.id, user_id=other.id)
+        with pytest.raises(ValueError, match="DataSource does not exist"):
+            get_ingestion_ledger(datasource.id, user_id=None)
@@ -14,8 +14,11 @@ class VectorField(ArrayField):
 
     def db_type(self, connection):
         """
-        Returns the database type for this field.
+        Returns the database type for this field. Vectors without a size may hold
+        any number of dimensions.
         """
+        if self.size is None:
+            return "vector"
         return "vector(%s)" % self.size
 
     def __init__(self, *args, size=OPEN_AI, **kwargs):
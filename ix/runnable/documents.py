@@ -1,3 +1,7 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Sequence,
     Optional,
@@ -7,7 +11,9 @@ from typing import (
     AsyncIterator,
     Iterator,
     Callable,
+    List,
 )
+from django.conf import settings
 from pydantic.v1 import BaseConfig
 
 from langchain_community.document_loaders.base import BaseLoader
@@ -16,28 +22,56 @@ from langchain_core.runnables import RunnableSerializable, RunnableConfig
 from langchain_core.runnables.utils import Input
 
 
+from ix.runnable.process_pool import (
+    amap_shards,
+    load_shard,
+    map_shards,
+    shard,
+    transform_shard,
+)
+from ix.utils.asyncio import aiter_in_executor
 from ix.utils.pydantic import model_from_signature
 from ix.utils.importlib import import_class
 
 
+# Document loaders run on dedicated threads so slow loaders don't block the
+# event loop or the default executor.
+document_loader_executor = ThreadPoolExecutor(
+    max_workers=settings.DOCUMENT_LOADER_WORKERS,
+    thread_name_prefix="ix-document-loader",
+)
+
+
 class RunTransformer(RunnableSerializable[Sequence[Document], Sequence[Document]]):
     """Runnable shim to treat a DocumentTransformer as a Runnable.
 
     BaseDocumentTransformer are not runnables so they need a shim to fit
     into a flow.
+
+    When `processes` is greater than 1 the input documents are sharded across
+    that many worker processes. Documents are returned in order.
     """
 
     transformer: BaseDocumentTransformer
+    processes: int = 0
 
     class Config(BaseConfig):
         arbitrary_types_allowed = True
 
+    def get_shards(self, input: Sequence[Document]) -> List[tuple]:
+        return [
+            (self.transformer, documents)
+            for documents in shard(list(input), self.processes)
+        ]
+
     def invoke(
         self,
         input: Sequence[Document],
         config: Optional[RunnableConfig] = None,
         **kwargs: Any,
     ) -> Sequence[Document]:
+        if self.processes > 1 and len(input) > 1:
+            return map_shards(transform_shard, self.get_shards(input))
         return self.transformer.transform_documents(input)
 
     async def ainvoke(
@@ -46,15 +80,19 @@ class RunTransformer(RunnableSerializable[Sequence[Document], Sequence[Document]
         config: Optional[RunnableConfig] = None,
         **kwargs: Any,
     ) -> Sequence[Document]:
+        if self.processes > 1 and len(input) > 1:
+            return await amap_shards(transform_shard, self.get_shards(input))
         resp = await self.transformer.atransform_documents(input)
         return resp
 
     @classmethod
     def from_config(cls, class_path: str, config: Dict[str, Any]) -> "RunTransformer":
         """Initialize a RunTransformer from a config dict."""
+        config = config.copy()
+        processes = config.pop("processes", None) or 0
         initializer = import_class(class_path)
         transformer = initializer(**config)
-        return cls(transformer=transformer)
+        return cls(transformer=transformer, processes=processes)
 
 
 class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
@@ -66,10 +104,19 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
 
     Fields may be configured in the config dict or from input. Input and configured fields
     are merged at runtime. Values from input have precedence.
+
+    Async calls load documents on `document_loader_executor`. `astream` reads up to
+    `prefetch` documents ahead of the consumer.
+
+    When `processes` is greater than 1, `invoke` loads in worker processes. A list
+    of files in `file_path` is sharded across that many processes. Documents are
+    returned in the order of the files.
     """
 
     initializer: Type[BaseLoader] | Callable[..., BaseLoader]
     config: Dict[str, Any]
+    prefetch: Optional[int] = None
+    processes: int = 0
 
     class Config(BaseConfig):
         arbitrary_types_allowed = True
@@ -85,9 +132,8 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
 
         return model_from_signature(name, self.initializer)
 
-    def get_loader(self, input: Input) -> BaseLoader:
-        """Get a BaseLoader instance initialized with field values
-        merged from input and config."""
+    def get_loader_kwargs(self, input: Input) -> Dict[str, Any]:
+        """Get the loader's kwargs merged from input and config."""
         # merge and validate input
         merged_config = self.config.copy()
         field_names = self.InputType.__fields__.keys()
@@ -95,9 +141,23 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
             if field in input:
                 merged_config[field] = input[field]
         validated = self.InputType(**merged_config)
+        return validated.dict()
 
-        # create instance
-        return self.initializer(**validated.dict())
+    def get_loader(self, input: Input) -> BaseLoader:
+        """Get a BaseLoader instance initialized with field values
+        merged from input and config."""
+        return self.initializer(**self.get_loader_kwargs(input))
+
+    def get_shards(self, input: Input) -> List[tuple]:
+        """Shard the files to load across processes"""
+        kwargs = self.get_loader_kwargs(input)
+        file_path = kwargs.get("file_path", None)
+        if not isinstance(file_path, (list, tuple)) or len(file_path) < 2:
+            return [(self.initializer, kwargs)]
+        return [
+            (self.initializer, {**kwargs, "file_path": list(paths)})
+            for paths in shard(file_path, self.processes)
+        ]
 
     def invoke(
         self,
@@ -105,6 +165,8 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
         config: Optional[RunnableConfig] = None,
         **kwargs: Any,
     ) -> Sequence[Document]:
+        if self.processes > 1:
+            return map_shards(load_shard, self.get_shards(input))
         loader = self.get_loader(input)
         return loader.load()
 
@@ -114,16 +176,16 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
         config: Optional[RunnableConfig] = None,
         **kwargs: Any,
     ) -> Sequence[Document]:
-        loader = self.get_loader(input)
-        return loader.load()
+        if self.processes > 1:
+            return await amap_shards(load_shard, self.get_shards(input))
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            document_loader_executor, context.run, self.invoke, input, config
+        )
 
-    def stream(
-        self,
-        input: Input,
-        config: Optional[RunnableConfig] = None,
-        **kwargs: Optional[Any],
-    ) -> Iterator[Document]:
-        """Stream documents from the loader.
+    def iter_documents(self, input: Input) -> Iterator[Document]:
+        """Iterate documents from the loader.
 
         Documents will be streamed from the loader if it supports `BaseLoader.lazy_load()`.
         Otherwise, documents will be loaded synchronously and then yielded to emulate a stream.
@@ -131,13 +193,20 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
         loader = self.get_loader(input)
 
         # attempt to use lazy load iterator
-        if loader.lazy_load != BaseLoader.lazy_load:
-            for doc in loader.lazy_load():
-                yield doc
+        if type(loader).lazy_load is not BaseLoader.lazy_load:
+            yield from loader.lazy_load()
         else:
             # fall back to loading all at once
-            for doc in loader.load():
-                yield doc
+            yield from loader.load()
+
+    def stream(
+        self,
+        input: Input,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Optional[Any],
+    ) -> Iterator[Document]:
+        """Stream documents from the loader."""
+        yield from self.iter_documents(input)
 
     async def astream(
         self,
@@ -145,21 +214,22 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
         config: Optional[RunnableConfig] = None,
         **kwargs: Optional[Any],
     ) -> AsyncIterator[Document]:
-        """Stream documents from the loader.
+        """Stream documents from the loader without blocking the event loop.
 
-        Documents will be streamed from the loader if it supports `BaseLoader.lazy_load()`.
-        Otherwise, documents will be loaded synchronously and then yielded to emulate a stream.
+        Documents are read on a loader thread up to `prefetch` documents ahead.
+        Reading stops when the stream is closed or cancelled.
         """
-        loader = self.get_loader(input)
-
-        # attempt to use lazy load iterator
-        if loader.lazy_load != BaseLoader.lazy_load:
-            for doc in loader.lazy_load():
-                yield doc
-        else:
-            # fall back to loading all at once
-            for doc in loader.load():
-                yield doc
+        prefetch = self.prefetch or settings.DOCUMENT_LOADER_PREFETCH
+        documents = aiter_in_executor(
+            functools.partial(self.iter_documents, input),
+            prefetch=prefetch,
+            executor=document_loader_executor,
+        )
+        try:
+            async for document in documents:
+                yield document
+        finally:
+            await documents.aclose()
 
     @classmethod
     def from_config(cls, class_path: str, config: Dict[str, Any]) -> "RunLoader":
@@ -167,5 +237,7 @@ class RunLoader(RunnableSerializable[Input, Sequence[Document]]):
 
         Integration point for component loader.
         """
+        config = config.copy()
+        processes = config.pop("processes", None) or 0
         initializer = import_class(class_path)
-        return cls(initializer=initializer, config=config)
+        return cls(initializer=initializer, config=config, processes=processes)
@@ -1,12 +1,25 @@
-from typing import Dict, Any, Optional, Iterator, AsyncIterator, List, Type, Tuple
+import threading
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    Iterator,
+    AsyncIterator,
+    List,
+    Type,
+    Tuple,
+    Callable,
+)
 from uuid import UUID
 
 from langchain.schema.runnable import RunnableSerializable, RunnableConfig, Runnable
 from langchain.schema.runnable.base import Other
 from langchain.schema.runnable.utils import Input, Output
 from pydantic import BaseModel
+from pydantic.v1 import PrivateAttr
 
 from ix.chains.loaders.context import IxContext, Listener
+from ix.utils.executors import run_in_executor
 
 
 class IxNode(RunnableSerializable[Input, Output]):
@@ -28,6 +41,7 @@ class IxNode(RunnableSerializable[Input, Output]):
     name: Optional[str] = None
     description: Optional[str] = None
     node_id: UUID
+    class_path: Optional[str] = None
     child: Runnable
     bind_points: List[str]
     config: Dict[str, Any]
@@ -86,10 +100,13 @@ class IxNode(RunnableSerializable[Input, Output]):
         if parent_listener:
             listener = parent_listener.get_child()
         else:
-            listener = self.context.get_listener()
+            # flows may be cached and shared by tasks. Prefer the context for
+            # this run over the context the flow was loaded with.
+            context: IxContext = config.get("ix_context", None) or self.context
+            listener = context.get_listener()
         config = config.copy()
         config["listener"] = listener
-        listener.on_start(node_id=self.node_id, input=input)
+        listener.on_start(node_id=self.node_id, input=input, class_path=self.class_path)
         return config, listener
 
     async def ainvoke(
@@ -138,3 +155,84 @@ class IxNode(RunnableSerializable[Input, Output]):
         await listener.aon_end(
             output=buffer,
         )
+
+
+class LazyIxNode(IxNode):
+    """
+    IxNode that defers loading its child until the node is first run.
+
+    Used for components that are expensive to create and may not be used by every
+    run, e.g. vectorstores that ingest documents or components in a branch. The
+    loaded child is kept for the lifetime of the node.
+    """
+
+    child: Optional[Runnable] = None
+    loader: Callable[[], Any]
+
+    # ensures the child is loaded once. Nodes have their own lock so loading one
+    # node doesn't block loading others.
+    _load_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __repr__(self):
+        if self.child is None:
+            return f"IX::Lazy({self.name or self.node_id})"
+        return f"IX::{repr(self.child)}"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.child is not None
+
+    def load(self) -> Runnable:
+        """Load the child if it hasn't been loaded yet"""
+        if self.child is None:
+            with self._load_lock:
+                if self.child is None:
+                    instance = self.loader()
+                    if not isinstance(instance, Runnable):
+                        raise TypeError(
+                            f"Lazy node node_id={self.node_id} loaded "
+                            f"{type(instance)}, expected a Runnable"
+                        )
+                    self.child = instance
+        return self.child
+
+    async def aload(self) -> Runnable:
+        if self.child is None:
+            await run_in_executor("db", self.load)
+        return self.child
+
+    def get_input_schema(
+        self, config: Optional[RunnableConfig] = None
+    ) -> Type[BaseModel]:
+        return self.load().get_input_schema(config)
+
+    def get_output_schema(
+        self, config: Optional[RunnableConfig] = None
+    ) -> Type[BaseModel]:
+        return self.load().get_output_schema(config)
+
+    def build_runnable(self, input: Input) -> Runnable:
+        self.load()
+        return super().build_runnable(input)
+
+    async def ainvoke(
+        self,
+        input: Dict[str, Any],
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> Output:
+        await self.aload()
+        return await super().ainvoke(input, config, **kwargs)
+
+    async def astream(
+        self,
+        input: Other,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Other]:
+        await self.aload()
+        async for chunk in super().astream(input, config, **kwargs):
+            yield chunk
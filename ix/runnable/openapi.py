@@ -8,7 +8,7 @@ from pydantic import BaseModel
 
 from ix.data.models import Schema
 from ix.utils.openapi import get_input_schema, HTTP_METHODS, get_action_schema
-from jsonschema_pydantic import jsonschema_to_pydantic
+from ix.utils.pydantic import jsonschema_to_model
 
 
 def build_httpx_kwargs(path: str, input: Input, **kwargs) -> dict[str, Any]:
@@ -83,7 +83,7 @@ class RunOpenAPIRequest(RunnableSerializable[Input, Output]):
         """return input schema for the path and method."""
         schema = self.get_schema()
         input_schema_dict = self._get_input_schema(schema)
-        input_schema = jsonschema_to_pydantic(input_schema_dict, version=2)
+        input_schema = jsonschema_to_model(input_schema_dict, version=2)
         return input_schema
 
     def get_output_schema(
@@ -0,0 +1,106 @@
+"""
+Process pool for CPU bound document loading and transforms.
+
+Parsing files (e.g. unstructured.io) and splitting documents hold the GIL, so
+running them on threads uses a single core. Nodes configured with `processes`
+greater than 1 shard their input across a pool of worker processes shared by the
+worker. Shards are contiguous and their results are concatenated in order.
+
+Workers are started with "spawn" since forking a process that runs threads is
+unsafe. Transformers and loader initializers must be picklable.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from django.conf import settings
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_core.documents import BaseDocumentTransformer, Document
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, starting it if needed"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            max_workers = settings.DOCUMENT_PROCESS_POOL_WORKERS or os.cpu_count()
+            _process_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"Started document process pool workers={max_workers}")
+        return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def shard(items: Sequence[T], count: int) -> List[Sequence[T]]:
+    """Split items into at most `count` contiguous shards of near equal size"""
+    count = max(1, min(count, len(items)))
+    size, extra = divmod(len(items), count)
+    shards = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+def transform_shard(
+    transformer: BaseDocumentTransformer, documents: Sequence[Document]
+) -> List[Document]:
+    return list(transformer.transform_documents(documents))
+
+
+def load_shard(
+    initializer: Callable[..., BaseLoader], kwargs: Dict[str, Any]
+) -> List[Document]:
+    return initializer(**kwargs).load()
+
+
+ShardFunction = Callable[..., List[Document]]
+
+
+def map_shards(func: ShardFunction, shards: List[Tuple]) -> List[Document]:
+    """Run func for each shard of arguments on the pool and join the results"""
+    pool = get_process_pool()
+    futures: List[Future] = [pool.submit(func, *args) for args in shards]
+    try:
+        results = [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return [document for result in results for document in result]
+
+
+async def amap_shards(func: ShardFunction, shards: List[Tuple]) -> List[Document]:
+    """Async version of map_shards. Doesn't block the event loop."""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    futures = [loop.run_in_executor(pool, func, *args) for args in shards]
+    try:
+        results = await asyncio.gather(*futures)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return [document for result in results for document in result]
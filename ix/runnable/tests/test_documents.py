@@ -1,9 +1,13 @@
-from typing import Callable
+import asyncio
+import threading
+import time
+from typing import Callable, Iterator
 
 import pytest
 from langchain.text_splitter import (
     CharacterTextSplitter,
 )
+from langchain_community.document_loaders.base import BaseLoader
 from langchain_community.document_loaders.generic import GenericLoader
 from langchain_core.documents import Document
 from pydantic import BaseModel
@@ -23,6 +27,33 @@ from ix.chains.tests.test_config_loader import unpack_chain_flow
 from ix.runnable.documents import RunTransformer, RunLoader
 
 
+class MockLoader(BaseLoader):
+    """Loader that blocks while reading each document"""
+
+    def __init__(self, count: int = 3, delay: float = 0, error: bool = False):
+        self.count = count
+        self.delay = delay
+        self.error = error
+        self.read = 0
+        self.closed = threading.Event()
+
+    def lazy_load(self) -> Iterator[Document]:
+        try:
+            for i in range(self.count):
+                time.sleep(self.delay)
+                if self.error:
+                    raise ValueError("loader error")
+                self.read += 1
+                yield Document(page_content=f"doc {i}")
+        finally:
+            self.closed.set()
+
+
+def mock_loader_runnable(**kwargs) -> RunLoader:
+    loader = MockLoader(**kwargs)
+    return RunLoader(initializer=lambda: loader, config={}, prefetch=2)
+
+
 @pytest.mark.django_db
 class TestRunTransformer:
     async def test_ainvoke(self, aix_context: IxContext):
@@ -170,3 +201,73 @@ class TestRunLoader:
         assert len(result) == 1
         assert isinstance(result[0], Document)
         assert result[0].page_content == "this is a test document"
+
+    async def test_ainvoke_does_not_block(self):
+        """Loading runs on a loader thread while the event loop keeps running"""
+        runnable = mock_loader_runnable(count=3, delay=0.05)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        result = await runnable.ainvoke(input={})
+        ticker.cancel()
+
+        assert [doc.page_content for doc in result] == ["doc 0", "doc 1", "doc 2"]
+        assert ticks > 5
+
+    async def test_astream(self):
+        runnable = mock_loader_runnable(count=3)
+        result = [doc async for doc in runnable.astream(input={})]
+        assert [doc.page_content for doc in result] == ["doc 0", "doc 1", "doc 2"]
+
+    async def test_astream_prefetch(self):
+        """Documents are read at most `prefetch` documents ahead"""
+        loader = MockLoader(count=100)
+        runnable = RunLoader(initializer=lambda: loader, config={}, prefetch=2)
+        stream = runnable.astream(input={})
+        await stream.__anext__()
+        await asyncio.sleep(0.1)
+
+        # consumed + queued + blocked waiting for room in the queue
+        assert loader.read <= 4
+        await stream.aclose()
+
+    async def test_astream_close(self):
+        """Closing the stream stops the loader"""
+        loader = MockLoader(count=100, delay=0.01)
+        runnable = RunLoader(initializer=lambda: loader, config={}, prefetch=2)
+        stream = runnable.astream(input={})
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert await asyncio.to_thread(loader.closed.wait, 1)
+        assert loader.read < 100
+
+    async def test_astream_cancel(self):
+        """Cancelling the consumer stops the loader"""
+        loader = MockLoader(count=100, delay=0.01)
+        runnable = RunLoader(initializer=lambda: loader, config={}, prefetch=2)
+
+        async def consume():
+            async for _ in runnable.astream(input={}):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert await asyncio.to_thread(loader.closed.wait, 1)
+        assert loader.read < 100
+
+    async def test_astream_error(self):
+        runnable = mock_loader_runnable(error=True)
+        with pytest.raises(ValueError, match="loader error"):
+            async for _ in runnable.astream(input={}):
+                pass
@@ -0,0 +1,98 @@
+import os
+from typing import List
+
+import pytest
+from langchain.text_splitter import CharacterTextSplitter
+from langchain_community.document_loaders.base import BaseLoader
+from langchain_core.documents import Document
+
+from ix.runnable.documents import RunLoader, RunTransformer
+from ix.runnable.process_pool import shard
+
+
+class FileListLoader(BaseLoader):
+    """Loads a document for each file path, recording the loading process"""
+
+    def __init__(self, file_path: List[str]):
+        self.file_path = file_path
+
+    def load(self) -> List[Document]:
+        return [
+            Document(page_content=path, metadata={"pid": os.getpid()})
+            for path in self.file_path
+        ]
+
+
+def test_shard():
+    assert shard([1, 2, 3, 4, 5], 2) == [[1, 2, 3], [4, 5]]
+    assert shard([1, 2, 3], 3) == [[1], [2], [3]]
+    assert shard([1, 2], 4) == [[1], [2]]
+    assert shard([1, 2, 3], 0) == [[1, 2, 3]]
+
+
+DOCUMENTS = [
+    Document(page_content=f"doc {i}\n\nsecond {i}", metadata={"i": i})
+    for i in range(10)
+]
+
+
+class TestRunTransformerProcesses:
+    def transformer(self, processes: int) -> RunTransformer:
+        splitter = CharacterTextSplitter(chunk_size=1, chunk_overlap=0)
+        return RunTransformer(transformer=splitter, processes=processes)
+
+    def test_invoke(self):
+        expected = self.transformer(0).invoke(DOCUMENTS)
+        result = self.transformer(2).invoke(DOCUMENTS)
+        assert len(result) == 20
+        assert result == expected
+
+    async def test_ainvoke(self):
+        expected = self.transformer(0).invoke(DOCUMENTS)
+        result = await self.transformer(3).ainvoke(DOCUMENTS)
+        assert result == expected
+
+    def test_from_config(self):
+        runnable = RunTransformer.from_config(
+            "langchain.text_splitter.CharacterTextSplitter",
+            {"chunk_size": 1, "chunk_overlap": 0, "processes": 2},
+        )
+        assert runnable.processes == 2
+        assert isinstance(runnable.transformer, CharacterTextSplitter)
+
+
+class TestRunLoaderProcesses:
+    FILES = [f"file_{i}.pdf" for i in range(5)]
+
+    def test_get_shards(self):
+        runnable = RunLoader(
+            initializer=FileListLoader, config={"file_path": self.FILES}, processes=2
+        )
+        assert runnable.get_shards({}) == [
+            (FileListLoader, {"file_path": self.FILES[:3]}),
+            (FileListLoader, {"file_path": self.FILES[3:]}),
+        ]
+
+    def test_get_shards_single_file(self):
+        runnable = RunLoader(
+            initializer=FileListLoader, config={"file_path": ["a.pdf"]}, processes=2
+        )
+        assert runnable.get_shards({}) == [(FileListLoader, {"file_path": ["a.pdf"]})]
+
+    @pytest.mark.parametrize("processes", [2, 5])
+    async def test_ainvoke(self, processes):
+        runnable = RunLoader(
+            initializer=FileListLoader,
+            config={"file_path": self.FILES},
+            processes=processes,
+        )
+        result = await runnable.ainvoke(input={})
+        assert [doc.page_content for doc in result] == self.FILES
+        assert os.getpid() not in {doc.metadata["pid"] for doc in result}
+
+    def test_invoke(self):
+        runnable = RunLoader(
+            initializer=FileListLoader, config={"file_path": self.FILES}, processes=2
+        )
+        result = runnable.invoke(input={})
+        assert [doc.page_content for doc in result] == self.FILES
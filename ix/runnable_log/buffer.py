@@ -0,0 +1,89 @@
+"""
+Buffered writes for the runnable execution log.
+
+Each node in a flow logs a RunnableExecution when it finishes. Writing them one
+at a time costs a query per node on the flow's critical path. Listeners for a run
+share a RunLogBuffer that collects the executions and writes them with a single
+bulk insert:
+
+- when RUNNABLE_LOG_FLUSH_SIZE executions are buffered.
+- RUNNABLE_LOG_FLUSH_INTERVAL_MS after the first buffered execution.
+- when the run ends, including runs that end with an error.
+
+Size and interval flushes are written by background tasks. The final flush waits
+for them. Executions that fail to write are kept and retried by the next flush.
+"""
+import asyncio
+import logging
+from typing import List, Optional, Set
+
+from django.conf import settings
+
+from ix.runnable_log.models import RunnableExecution
+
+logger = logging.getLogger(__name__)
+
+
+class RunLogBuffer:
+    """Collects RunnableExecution rows for a run and writes them in bulk"""
+
+    def __init__(
+        self, max_size: Optional[int] = None, interval_ms: Optional[float] = None
+    ):
+        self.max_size = max_size or settings.RUNNABLE_LOG_FLUSH_SIZE
+        if interval_ms is None:
+            interval_ms = settings.RUNNABLE_LOG_FLUSH_INTERVAL_MS
+        self.interval = interval_ms / 1000
+        self.writes = 0
+        self._rows: List[RunnableExecution] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, run: dict) -> None:
+        """Buffer an execution. Must be called from the event loop."""
+        self._rows.append(RunnableExecution(**run))
+        if len(self._rows) >= self.max_size:
+            self.flush_in_background()
+        elif self._timer is None and self.interval > 0:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.interval, self.flush_in_background)
+
+    def flush_in_background(self) -> None:
+        """Write buffered executions in a task without waiting for it"""
+        self._cancel_timer()
+        if not self._rows:
+            return
+        task = asyncio.get_running_loop().create_task(self._write(self._take()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def aflush(self) -> None:
+        """Write all buffered executions, waiting for writes in progress"""
+        self._cancel_timer()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self._rows:
+            await self._write(self._take())
+        if self._rows:
+            logger.error(f"Failed to write {len(self._rows)} runnable executions")
+
+    def _take(self) -> List[RunnableExecution]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _write(self, rows: List[RunnableExecution]) -> None:
+        try:
+            await RunnableExecution.objects.abulk_create(rows)
+            self.writes += 1
+        except Exception:
+            logger.exception("Error writing runnable executions")
+            # keep rows so the next flush retries them
+            self._rows = rows + self._rows
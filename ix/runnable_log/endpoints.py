@@ -1,16 +1,17 @@
 from django.contrib.auth.models import AbstractUser
 from django.db.models import Q
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from uuid import UUID
 from ix.api.auth import get_request_user
 
-__all__ = ["router", "get_task_execution_log"]
+__all__ = ["router", "get_task_execution_log", "get_task_load_profile"]
 
 from ix.chains.models import Chain
 
-from ix.runnable_log.models import RunnableExecution
+from ix.runnable_log.models import RunnableExecution, FlowLoadProfile
 from ix.runnable_log.types import (
     ExecutionGroup,
+    FlowLoadProfile as FlowLoadProfilePydantic,
     RunnableExecution as RunnableExecutionPydantic,
 )
 from ix.task_log.models import Task
@@ -46,3 +47,19 @@ async def get_task_execution_log(
     task_id: UUID, user: AbstractUser = Depends(get_request_user)
 ) -> ExecutionGroup:
     return await _get_execution_log(task_id, user)
+
+
+@router.get(
+    "/runs/{chain_id}/{task_id}/load_profile",
+    response_model=FlowLoadProfilePydantic,
+    tags=["runs"],
+)
+async def get_task_load_profile(
+    task_id: UUID, user: AbstractUser = Depends(get_request_user)
+) -> FlowLoadProfilePydantic:
+    query = FlowLoadProfile.filtered_owners(user=user).filter(task_id=task_id)
+    try:
+        profile = await query.alatest("created_at")
+    except FlowLoadProfile.DoesNotExist:
+        raise HTTPException(status_code=404, detail="Load profile not found")
+    return FlowLoadProfilePydantic.model_validate(profile)
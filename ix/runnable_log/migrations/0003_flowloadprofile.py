@@ -0,0 +1,72 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("chains", "0021_nodetype_lazy"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("task_log", "0012_task_root_tasklogmessage_root"),
+        ("runnable_log", "0002_runnableexecution_parent_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlowLoadProfile",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("wall_time", models.FloatField()),
+                ("queries", models.IntegerField(default=0)),
+                ("profile", models.JSONField(default=dict)),
+                (
+                    "chain",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="chains.chain",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="auth.group",
+                    ),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="task_log.task",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["task", "created_at"],
+            },
+        ),
+    ]
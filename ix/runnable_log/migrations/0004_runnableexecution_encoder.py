@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import ix.utils.json
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("runnable_log", "0003_flowloadprofile"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="runnableexecution",
+            name="inputs",
+            field=models.JSONField(
+                default=dict, encoder=ix.utils.json.EncodedJSONEncoder, null=True
+            ),
+        ),
+        migrations.AlterField(
+            model_name="runnableexecution",
+            name="outputs",
+            field=models.JSONField(
+                default=dict, encoder=ix.utils.json.EncodedJSONEncoder, null=True
+            ),
+        ),
+    ]
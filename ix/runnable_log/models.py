@@ -2,9 +2,10 @@ import uuid
 
 from django.db import models
 
-from ix.chains.models import ChainNode
+from ix.chains.models import ChainNode, Chain
 from ix.ix_users.models import OwnedModel
 from ix.task_log.models import Task
+from ix.utils.json import EncodedJSONEncoder
 
 
 class RunnableExecution(OwnedModel):
@@ -15,9 +16,24 @@ class RunnableExecution(OwnedModel):
     started_at = models.DateTimeField()
     finished_at = models.DateTimeField(null=True)
     completed = models.BooleanField(default=False)
-    inputs = models.JSONField(default=dict, null=True)
-    outputs = models.JSONField(default=dict, null=True)
+    inputs = models.JSONField(default=dict, null=True, encoder=EncodedJSONEncoder)
+    outputs = models.JSONField(default=dict, null=True, encoder=EncodedJSONEncoder)
     message = models.TextField(null=True)
 
     class Meta:
         ordering = ["task", "started_at"]
+
+
+class FlowLoadProfile(OwnedModel):
+    """Profile of loading the flow for a task. See ix.chains.loaders.profile"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, null=True)
+    chain = models.ForeignKey(Chain, on_delete=models.CASCADE, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    wall_time = models.FloatField()
+    queries = models.IntegerField(default=0)
+    profile = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ["task", "created_at"]
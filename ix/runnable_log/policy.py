@@ -0,0 +1,82 @@
+"""
+Policies that decide which runs are logged and how much of them is kept.
+
+The global policy is configured with:
+
+- RUNNABLE_LOG_ENABLED: log runs at all.
+- RUNNABLE_LOG_SAMPLE_RATE: fraction of runs that are logged. Sampling is decided
+  when a flow starts so sampled runs are logged with all of their nodes.
+- RUNNABLE_LOG_ERRORS: log nodes that raise an error even if the run wasn't
+  sampled.
+- RUNNABLE_LOG_MAX_FIELD_BYTES: inputs and outputs are truncated to about this
+  many bytes of JSON. 0 disables truncation.
+
+RUNNABLE_LOG_POLICIES overrides options for node types, by class_path, and for
+chains, by id. Chain options take precedence over node type options:
+
+    {
+        "node_types": {"langchain.schema.retriever.BaseRetriever": {...}},
+        "chains": {"<chain_id>": {"sample_rate": 0.1, "max_field_bytes": 4096}},
+    }
+"""
+import random
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from django.conf import settings
+
+from ix.utils.json import EncodedJSON, to_json_serializable, truncate_json
+
+# Values are walked up to this many times max_field_bytes before they are
+# truncated. The walk stops early on huge values, and truncate_json has enough of
+# the value left to share the budget between its parts.
+WALK_BUDGET_FACTOR = 4
+
+
+@dataclass
+class RunLogPolicy:
+    enabled: bool = True
+    sample_rate: float = 1.0
+    log_errors: bool = True
+    max_field_bytes: int = 0
+
+    def sample(self) -> bool:
+        """Decide if a run is logged"""
+        return self.enabled and random.random() < self.sample_rate
+
+    def should_log(self, sampled: bool, error: bool = False) -> bool:
+        """Decide if a node is logged. Errors are logged if the run wasn't sampled"""
+        return self.enabled and (sampled or (error and self.log_errors))
+
+    def serialize(self, value: Any) -> EncodedJSON:
+        """Serialize an input or output, truncated to max_field_bytes"""
+        if not self.max_field_bytes:
+            return EncodedJSON(to_json_serializable(value, truncate=False))
+
+        data = to_json_serializable(
+            value,
+            truncate=False,
+            max_bytes=self.max_field_bytes * WALK_BUDGET_FACTOR,
+        )
+        encoded = EncodedJSON(data)
+        if len(encoded) > self.max_field_bytes:
+            encoded = EncodedJSON(truncate_json(data, self.max_field_bytes))
+        return encoded
+
+
+def get_run_log_policy(
+    chain_id: Optional[str] = None, class_path: Optional[str] = None
+) -> RunLogPolicy:
+    """Return the policy for a node in a chain"""
+    options = dict(
+        enabled=settings.RUNNABLE_LOG_ENABLED,
+        sample_rate=settings.RUNNABLE_LOG_SAMPLE_RATE,
+        log_errors=settings.RUNNABLE_LOG_ERRORS,
+        max_field_bytes=settings.RUNNABLE_LOG_MAX_FIELD_BYTES,
+    )
+    policies = settings.RUNNABLE_LOG_POLICIES
+    if class_path:
+        options.update(policies.get("node_types", {}).get(class_path, {}))
+    if chain_id:
+        options.update(policies.get("chains", {}).get(str(chain_id), {}))
+    return RunLogPolicy(**options)
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from ix.chains.loaders.context import IxContext
+from ix.runnable_log.buffer import RunLogBuffer
+from ix.runnable_log.models import RunnableExecution
+from ix.task_log.tests.fake import afake_chain_node
+
+
+def fake_run(context: IxContext) -> dict:
+    return {
+        "id": str(uuid4()),
+        "user_id": context.user_id,
+        "task_id": context.task_id,
+        "started_at": datetime.now(tz=timezone.utc),
+        "finished_at": datetime.now(tz=timezone.utc),
+        "completed": True,
+    }
+
+
+async def count_runs(context: IxContext) -> int:
+    return await RunnableExecution.objects.filter(task_id=context.task_id).acount()
+
+
+@pytest.mark.django_db
+class TestRunLogBuffer:
+    async def test_flush(self, aix_context):
+        buffer = RunLogBuffer(max_size=100, interval_ms=0)
+        for _ in range(5):
+            buffer.add(fake_run(aix_context))
+
+        assert len(buffer) == 5
+        assert await count_runs(aix_context) == 0
+        await buffer.aflush()
+        assert len(buffer) == 0
+        assert buffer.writes == 1
+        assert await count_runs(aix_context) == 5
+
+    async def test_flush_size(self, aix_context):
+        buffer = RunLogBuffer(max_size=10, interval_ms=0)
+        for _ in range(25):
+            buffer.add(fake_run(aix_context))
+
+        # full batches are written in the background
+        assert len(buffer) == 5
+        await buffer.aflush()
+        assert buffer.writes == 3
+        assert await count_runs(aix_context) == 25
+
+    async def test_flush_interval(self, aix_context):
+        buffer = RunLogBuffer(max_size=100, interval_ms=10)
+        buffer.add(fake_run(aix_context))
+        buffer.add(fake_run(aix_context))
+        await asyncio.sleep(0.1)
+
+        assert len(buffer) == 0
+        await buffer.aflush()
+        assert buffer.writes == 1
+        assert await count_runs(aix_context) == 2
+
+    async def test_write_error(self, aix_context, mocker):
+        buffer = RunLogBuffer(max_size=2, interval_ms=0)
+        original = RunnableExecution.objects.abulk_create
+        calls = []
+
+        async def abulk_create(rows):
+            calls.append(len(rows))
+            if len(calls) == 1:
+                raise Exception("write failed")
+            return await original(rows)
+
+        mocker.patch.object(
+            RunnableExecution.objects, "abulk_create", side_effect=abulk_create
+        )
+        for _ in range(3):
+            buffer.add(fake_run(aix_context))
+        await buffer.aflush()
+
+        # failed rows are kept and written by the next flush
+        assert calls == [2, 3]
+        assert len(buffer) == 0
+        assert await count_runs(aix_context) == 3
+
+
+@pytest.mark.django_db
+class TestListenerLogBuffer:
+    async def run_tree(self, context: IxContext, node_id: str, children: int):
+        root = context.get_listener()
+        root.on_start(node_id=node_id, input={})
+        for _ in range(children):
+            child = root.get_child()
+            assert child.log_buffer is root.log_buffer
+            child.on_start(node_id=node_id, input={"input": "test"})
+            await child.aon_end({"output": "test"})
+        return root
+
+    async def test_run_writes_in_bulk(self, aix_context, settings):
+        settings.RUNNABLE_LOG_FLUSH_SIZE = 100
+        node = await afake_chain_node()
+        root = await self.run_tree(aix_context, node.id, children=40)
+
+        # children are buffered until the root run ends
+        assert await count_runs(aix_context) == 0
+        await root.aon_end({"output": "done"})
+        assert root.log_buffer.writes == 1
+        assert await count_runs(aix_context) == 41
+
+    async def test_run_error(self, aix_context):
+        node = await afake_chain_node()
+        root = await self.run_tree(aix_context, node.id, children=3)
+
+        await root.on_error(Exception("failed"))
+        assert await count_runs(aix_context) == 4
+        execution = await RunnableExecution.objects.aget(id=root.run["id"])
+        assert execution.message == "failed"
+        assert not execution.completed
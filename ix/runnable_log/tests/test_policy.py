@@ -0,0 +1,104 @@
+import pytest
+
+from ix.runnable_log.models import RunnableExecution
+from ix.runnable_log.policy import RunLogPolicy, get_run_log_policy
+from ix.task_log.tests.fake import afake_chain_node
+from ix.utils.json import json_size
+
+RETRIEVER = "langchain.schema.retriever.BaseRetriever"
+
+
+class TestRunLogPolicy:
+    def test_get_policy(self, settings):
+        settings.RUNNABLE_LOG_SAMPLE_RATE = 0.5
+        settings.RUNNABLE_LOG_POLICIES = {
+            "node_types": {RETRIEVER: {"max_field_bytes": 1024, "sample_rate": 0.1}},
+            "chains": {"chain_1": {"sample_rate": 0.2}},
+        }
+
+        assert get_run_log_policy().sample_rate == 0.5
+        policy = get_run_log_policy("chain_2", RETRIEVER)
+        assert policy.sample_rate == 0.1
+        assert policy.max_field_bytes == 1024
+
+        # chain options take precedence
+        policy = get_run_log_policy("chain_1", RETRIEVER)
+        assert policy.sample_rate == 0.2
+        assert policy.max_field_bytes == 1024
+
+    def test_should_log(self):
+        policy = RunLogPolicy()
+        assert policy.should_log(sampled=True)
+        assert not policy.should_log(sampled=False)
+        assert policy.should_log(sampled=False, error=True)
+
+        policy = RunLogPolicy(log_errors=False)
+        assert not policy.should_log(sampled=False, error=True)
+
+        policy = RunLogPolicy(enabled=False)
+        assert not policy.sample()
+        assert not policy.should_log(sampled=True, error=True)
+
+    def test_sample(self):
+        assert RunLogPolicy(sample_rate=1).sample()
+        assert not RunLogPolicy(sample_rate=0).sample()
+
+    def test_serialize(self):
+        output = {"documents": ["x" * 1000] * 100}
+        assert RunLogPolicy().serialize(output).data == output
+
+        encoded = RunLogPolicy(max_field_bytes=1000).serialize(output)
+        assert len(encoded) < 1200
+        assert json_size(encoded.data) == len(encoded)
+
+
+@pytest.mark.django_db
+class TestListenerPolicy:
+    async def run_tree(self, context, node_id, error: bool = False):
+        root = context.get_listener()
+        root.on_start(node_id=node_id, input={"input": "x" * 10000})
+        child = root.get_child()
+        child.on_start(node_id=node_id, input={})
+        if error:
+            await child.on_error(Exception("failed"))
+            await root.on_error(Exception("failed"))
+        else:
+            await child.aon_end({})
+            await root.aon_end({})
+        return root
+
+    async def count_runs(self, context) -> int:
+        return await RunnableExecution.objects.filter(task_id=context.task_id).acount()
+
+    async def test_sampled(self, aix_context, settings):
+        settings.RUNNABLE_LOG_MAX_FIELD_BYTES = 1000
+        node = await afake_chain_node()
+        root = await self.run_tree(aix_context, node.id)
+
+        assert await self.count_runs(aix_context) == 2
+        execution = await RunnableExecution.objects.aget(id=root.run["id"])
+        assert json_size(execution.inputs) < 1200
+
+    async def test_not_sampled(self, aix_context, settings):
+        settings.RUNNABLE_LOG_SAMPLE_RATE = 0
+        node = await afake_chain_node()
+        await self.run_tree(aix_context, node.id)
+        assert await self.count_runs(aix_context) == 0
+
+    async def test_not_sampled_error(self, aix_context, settings):
+        settings.RUNNABLE_LOG_SAMPLE_RATE = 0
+        node = await afake_chain_node()
+        root = await self.run_tree(aix_context, node.id, error=True)
+
+        assert await self.count_runs(aix_context) == 2
+        execution = await RunnableExecution.objects.aget(id=root.run["id"])
+        assert execution.message == "failed"
+        assert execution.inputs["input"].startswith("x")
+
+    async def test_chain_policy(self, aix_context, settings):
+        settings.RUNNABLE_LOG_POLICIES = {
+            "chains": {aix_context.chain_id: {"enabled": False}}
+        }
+        node = await afake_chain_node()
+        await self.run_tree(aix_context, node.id, error=True)
+        assert await self.count_runs(aix_context) == 0
@@ -24,3 +24,28 @@ class RunnableExecution(BaseModel):
 class ExecutionGroup(BaseModel):
     task_id: UUID
     executions: List[RunnableExecution]
+
+
+class NodeLoadProfile(BaseModel):
+    node_id: Optional[UUID] = None
+    class_path: Optional[str] = None
+    name: Optional[str] = None
+    wall_time: float = 0
+    queries: int = 0
+    secret_reads: int = 0
+    import_time: float = 0
+    init_time: float = 0
+    children: List["NodeLoadProfile"] = []
+
+
+class FlowLoadProfile(BaseModel):
+    id: UUID
+    task_id: Optional[UUID] = None
+    chain_id: Optional[UUID] = None
+    created_at: datetime
+    wall_time: float
+    queries: int
+    profile: NodeLoadProfile
+
+    class Config:
+        from_attributes = True
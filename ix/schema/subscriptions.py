@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 from uuid import UUID
 
 import graphene
@@ -94,10 +95,14 @@ class ChatMessageTokenSubscription(channels_graphql_ws.Subscription):
 
     This subscription streams messages tokens as they are generated by the
     agent. The stream only includes the message_id and text.
+
+    Tokens are sent in frames of one or more tokens. `index` and `end_index` are the
+    indexes of the first and last token in the frame.
     """
 
     msg_id = graphene.UUID()
     index = graphene.Int()
+    end_index = graphene.Int()
     text = graphene.String()
 
     class Arguments:
@@ -120,11 +125,19 @@ class ChatMessageTokenSubscription(channels_graphql_ws.Subscription):
         return ChatMessageTokenSubscription(
             msg_id=payload.get("msg_id"),
             index=payload.get("index"),
+            end_index=payload.get("end_index"),
             text=payload.get("text"),
         )
 
     @classmethod
-    async def on_new_token(cls, task: Task, message_id: UUID, index: int, text: str):
+    async def on_new_token(
+        cls,
+        task: Task,
+        message_id: UUID,
+        index: int,
+        text: str,
+        end_index: Optional[int] = None,
+    ):
         """
         Generic handler for new message tokens.
         """
@@ -134,6 +147,7 @@ class ChatMessageTokenSubscription(channels_graphql_ws.Subscription):
             payload={
                 "msg_id": str(message_id),
                 "index": index,
+                "end_index": index if end_index is None else end_index,
                 "text": text,
             },
         )
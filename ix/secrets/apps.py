@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class SecretsAppConfig(AppConfig):
+    name = "ix.secrets"
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from ix.ix_users.models import User
+        from ix.secrets.vault import on_user_created
+
+        # create vault policies and tokens when users are created instead of
+        # each time a token is needed.
+        if settings.SECRETS_BACKEND == "vault":
+            post_save.connect(on_user_created, sender=User)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from ix.ix_users.models import User
+from ix.secrets.vault import create_user_policy
+
+
+class Command(BaseCommand):
+    help = (
+        "Create vault policies for existing users. Policies are created when a user "
+        "is created, run this once for users created before that."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("-u", "--user", type=str, help="ID of a single user")
+
+    def handle(self, *args, **kwargs):
+        users = User.objects.order_by("id")
+        if kwargs["user"]:
+            users = users.filter(id=kwargs["user"])
+
+        created = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            try:
+                create_user_policy(user_id)
+            except Exception as e:
+                self.stderr.write(f"Failed to create policy for user_id={user_id}: {e}")
+                continue
+            created += 1
+        self.stdout.write(f"Created vault policies for {created} users")
@@ -1,6 +1,9 @@
 import uuid
+from typing import Dict, List
+
+from django.conf import settings
 from django.db import models
-from ix.ix_users.models import OwnedModel
+from ix.ix_users.models import OwnedModel, User
 
 
 class SecretType(OwnedModel):
@@ -48,23 +51,34 @@ class Secret(OwnedModel):
 
     @property
     def client(self):
-        # TODO: make this configurable for production
-        # return UserVaultClient(user=self.user)
+        if settings.SECRETS_BACKEND == "vault":
+            from ix.secrets.vault import UserVaultClient
+
+            return UserVaultClient(user=self.user)
         return SecretValueClient()
 
     async def get_client(self):
-        # TODO: make this configurable for production
-        # user = await User.objects.aget(id=self.user_id)
+        if settings.SECRETS_BACKEND == "vault":
+            from ix.secrets.vault import UserVaultClient
+
+            user = await User.objects.aget(id=self.user_id)
+            return UserVaultClient(user=user)
         return SecretValueClient()
 
     def read(self):
         return self.client.read(self.path)
 
     def write(self, value):
-        return self.client.write(self.path, value)
+        try:
+            return self.client.write(self.path, value)
+        finally:
+            self.invalidate()
 
     def delete_secure(self):
-        return self.client.delete(self.path)
+        try:
+            return self.client.delete(self.path)
+        finally:
+            self.invalidate()
 
     async def aread(self):
         client = await self.get_client()
@@ -72,11 +86,23 @@ class Secret(OwnedModel):
 
     async def awrite(self, value):
         client = await self.get_client()
-        return await client.awrite(self.path, value)
+        try:
+            return await client.awrite(self.path, value)
+        finally:
+            self.invalidate()
 
     async def adelete_secure(self):
         client = await self.get_client()
-        return await client.adelete(self.path)
+        try:
+            return await client.adelete(self.path)
+        finally:
+            self.invalidate()
+
+    def invalidate(self):
+        """Evict cached values of this secret"""
+        from ix.secrets.resolver import invalidate_secret
+
+        invalidate_secret(self.id)
 
 
 class MissingSecret(Exception):
@@ -87,6 +113,12 @@ class SecretValueClient:
     def read(self, path: str):
         return SecretValue.objects.get(path=path).data
 
+    def read_many(self, paths: List[str]) -> Dict[str, dict]:
+        """Read values for many paths. Paths without a value are omitted."""
+        return dict(
+            SecretValue.objects.filter(path__in=paths).values_list("path", "data")
+        )
+
     async def aread(self, path: str):
         try:
             secret_value = await SecretValue.objects.aget(path=path)
@@ -0,0 +1,122 @@
+"""
+Resolve secret values in bulk.
+
+Secrets used by a flow are resolved together: one query for the Secret rows and
+one bulk read per secret backend. Decrypted values are cached in memory for
+SECRET_CACHE_TTL seconds, scoped to the user that resolved them. Secrets are
+evicted when written or deleted in this process. Other processes may keep serving
+the old value until their entries expire.
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from ix.secrets.models import Secret
+from ix.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+SecretCacheKey = Tuple[Optional[str], str]
+
+secret_cache: LRUCache[SecretCacheKey, Dict[str, Any]] = LRUCache(
+    max_size=settings.SECRET_CACHE_SIZE, ttl=settings.SECRET_CACHE_TTL
+)
+
+
+def get_cache_key(user_id: Any, secret_id: Any) -> SecretCacheKey:
+    return (str(user_id) if user_id else None), str(secret_id)
+
+
+def bulk_read(
+    secrets: Iterable[Secret], errors: Optional[Dict[str, Exception]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Read secret values with one bulk read per backend and owner.
+
+    Returns values by secret id. Secrets without a stored value are omitted.
+
+    When an errors dict is given, failures are recorded in it by secret id instead
+    of raised. A group whose bulk read fails is read again one secret at a time to
+    find which secrets failed.
+    """
+    groups = defaultdict(list)
+    for secret in secrets:
+        try:
+            client = secret.client
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[str(secret.id)] = e
+            continue
+        groups[(type(client), secret.user_id)].append((client, secret))
+
+    values = {}
+    for group in groups.values():
+        client = group[0][0]
+        paths = {secret.path: secret for _, secret in group}
+        try:
+            read = client.read_many(list(paths))
+        except Exception:
+            if errors is None:
+                raise
+            read = {}
+            for path, secret in paths.items():
+                try:
+                    read.update(client.read_many([path]))
+                except Exception as e:
+                    errors[str(secret.id)] = e
+
+        for path, value in read.items():
+            values[str(paths[path].id)] = value
+    return values
+
+
+def read_secrets(
+    secret_ids: Iterable[Any],
+    user_id: Any = None,
+    errors: Optional[Dict[str, Exception]] = None,
+    on_read: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Return secret values by id, reading only secrets that aren't cached.
+
+    Secrets that don't exist or have no value are omitted from the result. Secrets
+    that fail to read are recorded in errors, if given. See bulk_read.
+
+    on_read is called with the number of secrets read from their backend. It isn't
+    called when every secret was cached.
+    """
+    secret_ids = {str(secret_id) for secret_id in secret_ids}
+    use_cache = settings.SECRET_CACHE_TTL > 0
+
+    values = {}
+    if use_cache:
+        for secret_id in secret_ids:
+            value = secret_cache.get(get_cache_key(user_id, secret_id))
+            if value is not None:
+                values[secret_id] = value
+
+    to_read = secret_ids - set(values)
+    if not to_read:
+        return values
+
+    # TODO: need user here to limit access to secrets
+    secrets = list(Secret.objects.filter(id__in=to_read).select_related("user"))
+    if on_read is not None:
+        on_read(len(secrets))
+    read = bulk_read(secrets, errors=errors)
+    logger.debug(f"Read secrets count={len(read)} cached={len(values)}")
+
+    if use_cache:
+        for secret_id, value in read.items():
+            secret_cache.set(get_cache_key(user_id, secret_id), value)
+
+    values.update(read)
+    return values
+
+
+def invalidate_secret(secret_id: Any) -> int:
+    """Evict a secret from the cache for all users"""
+    secret_id = str(secret_id)
+    return secret_cache.evict(lambda key: key[1] == secret_id)
@@ -0,0 +1,103 @@
+import pytest
+
+from ix.secrets.models import SecretValueClient
+from ix.secrets.resolver import read_secrets, secret_cache, get_cache_key
+from ix.secrets.tests.fake import fake_secret
+
+DATA = {"api_key": "value"}
+DATA2 = {"api_key": "value2"}
+
+
+@pytest.fixture
+def secrets():
+    secret_cache.clear()
+    secrets = [fake_secret(name=f"secret {i}") for i in range(3)]
+    for secret in secrets:
+        secret.write(DATA)
+    yield secrets
+    secret_cache.clear()
+
+
+@pytest.mark.django_db
+class TestReadSecrets:
+    def test_bulk_read(self, secrets, django_assert_num_queries):
+        secret_ids = [secret.id for secret in secrets]
+
+        # one query for the secrets and one for their values
+        with django_assert_num_queries(2):
+            values = read_secrets(secret_ids, user_id="user")
+        assert values == {str(secret.id): DATA for secret in secrets}
+
+        # cached values are not read again
+        with django_assert_num_queries(0):
+            assert read_secrets(secret_ids, user_id="user") == values
+
+    def test_on_read(self, secrets, mocker):
+        """Only secrets read from their backend are reported"""
+        on_read = mocker.Mock()
+        read_secrets([secrets[0].id], user_id="user", on_read=on_read)
+        on_read.assert_called_once_with(1)
+
+        on_read.reset_mock()
+        secret_ids = [secret.id for secret in secrets]
+        read_secrets(secret_ids, user_id="user", on_read=on_read)
+        on_read.assert_called_once_with(2)
+
+        on_read.reset_mock()
+        read_secrets(secret_ids, user_id="user", on_read=on_read)
+        on_read.assert_not_called()
+
+    def test_cache_scoped_by_user(self, secrets, django_assert_num_queries):
+        secret = secrets[0]
+        read_secrets([secret.id], user_id="user")
+        assert get_cache_key("user", secret.id) in secret_cache
+        assert get_cache_key("other", secret.id) not in secret_cache
+
+        with django_assert_num_queries(2):
+            read_secrets([secret.id], user_id="other")
+
+    def test_missing_secret(self, secrets):
+        secret = fake_secret(name="no value")
+        assert read_secrets([secret.id, secrets[0].id]) == {str(secrets[0].id): DATA}
+
+    def test_cache_disabled(self, secrets, settings):
+        settings.SECRET_CACHE_TTL = 0
+        read_secrets([secrets[0].id], user_id="user")
+        assert len(secret_cache) == 0
+
+    def test_write_invalidates(self, secrets):
+        secret = secrets[0]
+        assert read_secrets([secret.id], user_id="user")[str(secret.id)] == DATA
+
+        secret.write(DATA2)
+        assert get_cache_key("user", secret.id) not in secret_cache
+        assert read_secrets([secret.id], user_id="user")[str(secret.id)] == DATA2
+
+    def test_delete_invalidates(self, secrets):
+        secret = secrets[0]
+        read_secrets([secret.id], user_id="user")
+
+        secret.delete_secure()
+        assert get_cache_key("user", secret.id) not in secret_cache
+        assert read_secrets([secret.id], user_id="user") == {}
+
+    def test_read_errors(self, secrets, mocker):
+        """A secret that fails to read is recorded without failing the others"""
+        failed = secrets[0]
+        read_many = SecretValueClient.read_many
+
+        def fail_one(client, paths):
+            if failed.path in paths:
+                raise ConnectionError("unreadable")
+            return read_many(client, paths)
+
+        mocker.patch.object(SecretValueClient, "read_many", fail_one)
+        errors = {}
+        values = read_secrets([secret.id for secret in secrets], errors=errors)
+        assert values == {str(secret.id): DATA for secret in secrets[1:]}
+        assert list(errors) == [str(failed.id)]
+        assert isinstance(errors[str(failed.id)], ConnectionError)
+
+        # errors are raised if not collected
+        with pytest.raises(ConnectionError):
+            read_secrets([failed.id])
@@ -1,9 +1,11 @@
 import textwrap
+import time
 import hvac
 
 import pytest
 from hvac.exceptions import InvalidPath
 from django.conf import settings
+from django.core.management import call_command
 
 from ix.secrets import vault
 from ix.secrets.vault import (
@@ -16,6 +18,7 @@ from ix.secrets.vault import (
     handle_new_user,
     UserVaultClient,
     delete_secrets_recursive,
+    VaultClientPool,
 )
 
 TOKEN = "test_token"
@@ -240,3 +243,176 @@ class TestVaultIntegration:
         client_with_token.write(path, DATA)
         read_data_with_token = client_with_token.read(path)
         assert DATA == read_data_with_token
+
+
+class TestVaultClientPool:
+    @pytest.fixture
+    def pool(self, settings):
+        settings.VAULT_TOKEN_RENEW_INTERVAL = 0
+        pool = VaultClientPool()
+        yield pool
+        pool.close()
+
+    def test_get(self, pool):
+        client = pool.get(TOKEN)
+        assert client.token == TOKEN
+        assert pool.get(TOKEN) is client
+        assert pool.get("other_token") is not client
+        assert len(pool) == 2
+
+    def test_max_size(self, settings, mocker):
+        """Least recently used clients are closed to make room"""
+        settings.VAULT_TOKEN_RENEW_INTERVAL = 0
+        settings.VAULT_CLIENT_POOL_SIZE = 1
+        pool = VaultClientPool()
+        client = pool.get(TOKEN)
+        close = mocker.spy(client.adapter, "close")
+
+        pool.get("other_token")
+        assert len(pool) == 1
+        close.assert_called_once()
+        pool.close()
+
+    def test_discard(self, pool):
+        client = pool.get(TOKEN)
+        pool.discard(TOKEN)
+        assert len(pool) == 0
+        assert pool.get(TOKEN) is not client
+
+    def test_user_token(self, pool, mocker):
+        get_user_token = mocker.patch.object(
+            vault, "get_user_token", return_value=TOKEN
+        )
+        client = mocker.MagicMock()
+        client.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 3600, "renewable": True}
+        }
+        mocker.patch.object(pool, "get", return_value=client)
+
+        assert pool.user_token("user") == TOKEN
+        assert pool.user_token("user") == TOKEN
+        get_user_token.assert_called_once_with("user")
+
+    @pytest.mark.parametrize(
+        "error", [hvac.exceptions.Forbidden(), hvac.exceptions.InvalidRequest()]
+    )
+    def test_user_token_invalid(self, pool, mocker, error):
+        """A new token is created when the stored token expired or was revoked"""
+        mocker.patch.object(vault, "get_user_token", return_value="stored_token")
+        create_user_token = mocker.patch.object(
+            vault, "create_user_token", return_value=TOKEN
+        )
+        client = mocker.MagicMock()
+        client.auth.token.lookup_self.side_effect = error
+        mocker.patch.object(pool, "get", return_value=client)
+
+        assert pool.user_token("user") == TOKEN
+        create_user_token.assert_called_once_with("user")
+
+    def test_user_token_expired(self, pool, mocker):
+        """Expired tokens are fetched again"""
+        get_user_token = mocker.patch.object(
+            vault, "get_user_token", return_value=TOKEN
+        )
+        client = mocker.MagicMock()
+        client.auth.token.lookup_self.return_value = {
+            "data": {"ttl": 3600, "renewable": True}
+        }
+        mocker.patch.object(pool, "get", return_value=client)
+        pool.set_user_token("user", "expired_token", ttl=3600)
+        pool._tokens["user"].expires_at = time.monotonic() - 1
+
+        assert pool.user_token("user") == TOKEN
+        get_user_token.assert_called_once_with("user")
+
+    def test_renew_expiring(self, pool, mocker):
+        client = mocker.MagicMock()
+        client.auth.token.renew_self.return_value = {
+            "auth": {"lease_duration": 3600, "renewable": True}
+        }
+        mocker.patch.object(pool, "get", return_value=client)
+        pool.set_user_token("expiring", "token_1", ttl=60, renewable=True)
+        pool.set_user_token("current", "token_2", ttl=3600, renewable=True)
+        pool.set_user_token("root", "token_3")
+
+        assert pool.renew_expiring(margin=300) == 1
+        client.auth.token.renew_self.assert_called_once()
+        assert not pool._tokens["expiring"].expires_within(300)
+
+    def test_renew_failed(self, pool, mocker):
+        client = mocker.MagicMock()
+        client.auth.token.renew_self.side_effect = hvac.exceptions.Forbidden()
+        mocker.patch.object(pool, "get", return_value=client)
+        pool.set_user_token("expiring", "token_1", ttl=60, renewable=True)
+        pool.set_user_token("not_renewable", "token_2", ttl=60)
+
+        assert pool.renew_expiring(margin=300) == 0
+        assert pool._tokens == {}
+
+
+@pytest.mark.django_db
+class TestCreateVaultPolicies:
+    def test_command(self, user, mocker):
+        create_user_policy = mocker.patch(
+            "ix.secrets.management.commands.create_vault_policies.create_user_policy"
+        )
+        call_command("create_vault_policies")
+        create_user_policy.assert_any_call(user.id)
+
+    def test_single_user(self, user, mocker):
+        create_user_policy = mocker.patch(
+            "ix.secrets.management.commands.create_vault_policies.create_user_policy"
+        )
+        call_command("create_vault_policies", user=str(user.id))
+        create_user_policy.assert_called_once_with(user.id)
+
+
+class TestUserVaultSetup:
+    def test_on_user_created_error(self, mocker):
+        """Vault errors are logged so they don't prevent creating the user"""
+        handle_new_user = mocker.patch.object(
+            vault, "handle_new_user", side_effect=hvac.exceptions.VaultDown()
+        )
+        user = mocker.MagicMock(id="user")
+
+        vault.on_user_created(sender=None, instance=user, created=True)
+        handle_new_user.assert_called_once_with("user")
+
+    def test_on_user_updated(self, mocker):
+        handle_new_user = mocker.patch.object(vault, "handle_new_user")
+        user = mocker.MagicMock(id="user")
+
+        vault.on_user_created(sender=None, instance=user, created=False)
+        handle_new_user.assert_not_called()
+
+    def test_missing_policy(self, mocker):
+        """The user's policy is created when vault forbids access"""
+        create_user_policy = mocker.patch.object(vault, "create_user_policy")
+        client = mocker.MagicMock()
+        read_secret_version = client.secrets.kv.v2.read_secret_version
+        read_secret_version.side_effect = [
+            hvac.exceptions.Forbidden(),
+            {"data": {"data": DATA}},
+        ]
+        mocker.patch.object(vault.vault_pool, "get", return_value=client)
+        user_client = UserVaultClient(mocker.MagicMock(id="user"), token=TOKEN)
+
+        assert user_client.read("test_path") == DATA
+        create_user_policy.assert_called_once_with("user")
+        assert read_secret_version.call_count == 2
+
+    def test_forbidden_with_policy(self, mocker):
+        """Access is not retried once the policy was created"""
+        create_user_policy = mocker.patch.object(vault, "create_user_policy")
+        client = mocker.MagicMock()
+        client.secrets.kv.v2.read_secret_version.side_effect = (
+            hvac.exceptions.Forbidden()
+        )
+        mocker.patch.object(vault.vault_pool, "get", return_value=client)
+        user_client = UserVaultClient(mocker.MagicMock(id="user"), token=TOKEN)
+
+        with pytest.raises(hvac.exceptions.Forbidden):
+            user_client.read("test_path")
+        with pytest.raises(hvac.exceptions.Forbidden):
+            user_client.read("test_path")
+        create_user_policy.assert_called_once_with("user")
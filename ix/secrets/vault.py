@@ -1,11 +1,196 @@
+import dataclasses
+import logging
+import threading
+import time
 from functools import cached_property
+from typing import Callable, Dict, List, Optional, TypeVar
 
 import hvac
+import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from hvac import Client
-from hvac.exceptions import InvalidPath
+from hvac.exceptions import Forbidden, InvalidPath, InvalidRequest, VaultError
 
 from ix.ix_users.models import User
+from ix.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass
+class VaultToken:
+    token: str
+    # monotonic time the token expires at. None if the token doesn't expire.
+    expires_at: Optional[float] = None
+    renewable: bool = False
+
+    def expires_within(self, seconds: float) -> bool:
+        if self.expires_at is None:
+            return False
+        return self.expires_at - time.monotonic() < seconds
+
+
+class VaultClientPool:
+    """Reusable Vault clients and user tokens.
+
+    Clients are created once per token. Each client keeps a persistent HTTP session
+    so requests reuse the TLS connection instead of reconnecting for every call. Up
+    to VAULT_CLIENT_POOL_SIZE clients are kept, the least recently used client is
+    closed to make room for new ones.
+
+    User tokens are cached after they are first fetched. When renewal is started a
+    background thread renews tokens before they expire. Tokens that fail to renew
+    are dropped and fetched again when next needed. Stored tokens that expired or
+    were revoked are replaced with a new token.
+    """
+
+    def __init__(self):
+        self._clients: LRUCache[str, Client] = LRUCache(
+            max_size=settings.VAULT_CLIENT_POOL_SIZE,
+            on_evict=lambda token, client: client.adapter.close(),
+        )
+        self._tokens: Dict[str, VaultToken] = {}
+        self._lock = threading.RLock()
+        self._renewal_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(self, token: str) -> Client:
+        """Return the client for a token"""
+        with self._lock:
+            client = self._clients.get(token, None)
+            if client is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_maxsize=settings.VAULT_POOL_MAXSIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                client = Client(
+                    url=settings.VAULT_SERVER,
+                    token=token,
+                    cert=(settings.VAULT_CLIENT_CRT, settings.VAULT_CLIENT_KEY),
+                    verify=settings.VAULT_TLS_VERIFY,
+                    session=session,
+                )
+                self._clients.set(token, client)
+            return client
+
+    def discard(self, token: str) -> None:
+        """Close and remove the client for a token"""
+        with self._lock:
+            client = self._clients.pop(token, None)
+        if client is not None:
+            client.adapter.close()
+
+    def close(self) -> None:
+        self.stop_renewal()
+        with self._lock:
+            self._tokens.clear()
+        self._clients.evict(lambda token: True)
+
+    def set_user_token(self, user_id, token: str, ttl: int = None, renewable=False):
+        """Track a user's token. ttl is in seconds, 0 or None never expires."""
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._tokens[str(user_id)] = VaultToken(
+                token=token, expires_at=expires_at, renewable=renewable
+            )
+        if expires_at is not None and settings.VAULT_TOKEN_RENEW_INTERVAL > 0:
+            self.start_renewal()
+
+    def user_token(self, user_id) -> str:
+        """Return a user's token, fetching it from the token store if needed.
+
+        A new token is created if the stored token expired or was revoked.
+        """
+        with self._lock:
+            vault_token = self._tokens.get(str(user_id), None)
+        if vault_token is not None:
+            if not vault_token.expires_within(0):
+                return vault_token.token
+            self.discard(vault_token.token)
+
+        token = get_user_token(user_id)
+        try:
+            lookup = self.get(token).auth.token.lookup_self()["data"]
+        except (Forbidden, InvalidRequest) as e:
+            logger.info(f"Replacing invalid vault token user_id={user_id}: {e}")
+            self.discard(token)
+            return create_user_token(user_id)
+        self.set_user_token(
+            user_id, token, ttl=lookup.get("ttl"), renewable=lookup.get("renewable")
+        )
+        return token
+
+    async def auser_token(self, user_id) -> str:
+        return await sync_to_async(self.user_token, thread_sensitive=False)(user_id)
+
+    def renew_expiring(self, margin: float = None) -> int:
+        """Renew tokens that expire within `margin` seconds. Returns count renewed."""
+        margin = settings.VAULT_TOKEN_RENEW_MARGIN if margin is None else margin
+        with self._lock:
+            expiring = [
+                (user_id, vault_token)
+                for user_id, vault_token in self._tokens.items()
+                if vault_token.expires_within(margin)
+            ]
+
+        renewed = 0
+        for user_id, vault_token in expiring:
+            try:
+                if not vault_token.renewable:
+                    raise VaultError("token is not renewable")
+                response = self.get(vault_token.token).auth.token.renew_self()
+            except Exception as e:
+                logger.warning(f"Failed to renew vault token user_id={user_id}: {e}")
+                with self._lock:
+                    self._tokens.pop(user_id, None)
+                self.discard(vault_token.token)
+                continue
+
+            auth = response["auth"]
+            self.set_user_token(
+                user_id,
+                vault_token.token,
+                ttl=auth["lease_duration"],
+                renewable=auth["renewable"],
+            )
+            renewed += 1
+        return renewed
+
+    def start_renewal(self) -> None:
+        """Renew tokens in a background thread"""
+        with self._lock:
+            if self._renewal_thread is not None:
+                return
+            self._stop.clear()
+            self._renewal_thread = threading.Thread(
+                target=self._renew_loop, name="ix-vault-renewal", daemon=True
+            )
+            self._renewal_thread.start()
+
+    def stop_renewal(self) -> None:
+        with self._lock:
+            thread, self._renewal_thread = self._renewal_thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(settings.VAULT_TOKEN_RENEW_INTERVAL):
+            try:
+                self.renew_expiring()
+            except Exception as e:
+                logger.error(f"Vault token renewal failed: {e}")
+
+
+vault_pool = VaultClientPool()
 
 
 def get_root_client():
@@ -20,12 +205,7 @@ def get_token_store_client():
 
 def get_client(token):
     """Get vault client for a user, using their token"""
-    return Client(
-        url=settings.VAULT_SERVER,
-        token=token,
-        cert=(settings.VAULT_CLIENT_CRT, settings.VAULT_CLIENT_KEY),
-        verify=settings.VAULT_TLS_VERIFY,
-    )
+    return vault_pool.get(token)
 
 
 def create_user_policy(user_id):
@@ -53,12 +233,9 @@ def create_user_policy(user_id):
 
 
 def create_user_token(user_id, ttl="1h"):
+    """Create a token for a user. The user's policy is created with the user."""
     vault_client = get_token_store_client()
 
-    # HAX: for now create policy when creating the token. This might
-    #      be better in user creation to limit how often it runs.
-    create_user_policy(user_id)
-
     # Generate a new token with TTL
     # HAX: using root token for now to simplify
     # policies = [f"user_{user_id}_policy"]
@@ -67,8 +244,12 @@ def create_user_token(user_id, ttl="1h"):
         policies=policies, ttl=ttl, renewable=True
     )
 
-    user_token = new_token["auth"]["client_token"]
+    auth = new_token["auth"]
+    user_token = auth["client_token"]
     set_user_token(user_id, user_token)
+    vault_pool.set_user_token(
+        user_id, user_token, ttl=auth["lease_duration"], renewable=auth["renewable"]
+    )
     return user_token
 
 
@@ -99,6 +280,19 @@ def handle_new_user(user_id):
     return create_user_token(user_id)
 
 
+def on_user_created(sender, instance, created, **kwargs):
+    """post_save handler that sets up vault access for new users.
+
+    Errors are logged instead of raised so users are created while vault is
+    unavailable. UserVaultClient creates the policy when it's first needed.
+    """
+    if created:
+        try:
+            handle_new_user(instance.id)
+        except Exception:
+            logger.exception(f"Failed to set up vault access user_id={instance.id}")
+
+
 def delete_secrets_recursive(path=""):
     """Recursive function to delete secrets using hvac client"""
     client = get_root_client()
@@ -132,6 +326,7 @@ class UserVaultClient:
     def __init__(self, user: User, token: str = None):
         self.user = user
         self._provided_token = token
+        self._policy_created = False
 
     @property
     def base_path(self):
@@ -147,34 +342,81 @@ class UserVaultClient:
         if self._provided_token:
             return self._provided_token
 
-        # Otherwise, fetch the token using get_user_token.
-        fetched_token = get_user_token(self.user.id)
-        assert fetched_token is not None
-        return fetched_token
+        # Otherwise, use the user's pooled token.
+        return vault_pool.user_token(self.user.id)
 
-    @cached_property
+    @property
     def client(self):
-        return get_client(self.token)
+        return vault_pool.get(self.token)
+
+    def _call(self, func: Callable[[Client], T]) -> T:
+        """Call vault, creating the user's policy if access is forbidden.
+
+        Policies are created with the user. Users created while vault was
+        unavailable get their policy when it's first needed.
+        """
+        try:
+            return func(self.client)
+        except Forbidden:
+            if self._policy_created:
+                raise
+            logger.info(f"Creating missing vault policy user_id={self.user.id}")
+            create_user_policy(self.user.id)
+            self._policy_created = True
+            return func(self.client)
 
     def write(self, path, data):
-        return self.client.secrets.kv.v2.create_or_update_secret(
-            path=f"{self.base_path}/{path}", secret=data
+        return self._call(
+            lambda client: client.secrets.kv.v2.create_or_update_secret(
+                path=f"{self.base_path}/{path}", secret=data
+            )
         )
 
     def read(self, path):
-        response = self.client.secrets.kv.v2.read_secret_version(
-            path=f"{self.base_path}/{path}"
+        response = self._call(
+            lambda client: client.secrets.kv.v2.read_secret_version(
+                path=f"{self.base_path}/{path}"
+            )
         )
         return response["data"]["data"]
 
+    def read_many(self, paths: List[str]) -> Dict[str, dict]:
+        """Read many secrets with this client. Paths without a value are omitted.
+
+        KV v2 doesn't support bulk reads. Reads share the client's session.
+        """
+        values = {}
+        for path in paths:
+            try:
+                values[path] = self.read(path)
+            except InvalidPath:
+                continue
+        return values
+
     def delete(self, path):
         # Fetch the metadata of the secret which contains all the versions
         path = f"{self.base_path}/{path}"
-        metadata = self.client.secrets.kv.v2.read_secret_metadata(path)
+        metadata = self._call(
+            lambda client: client.secrets.kv.v2.read_secret_metadata(path)
+        )
 
         # Extract version IDs
         version_ids = list(metadata["data"]["versions"].keys())
 
-        self.client.secrets.kv.v2.destroy_secret_versions(
-            path=path, versions=version_ids
+        self._call(
+            lambda client: client.secrets.kv.v2.destroy_secret_versions(
+                path=path, versions=version_ids
+            )
         )
+
+    async def aread(self, path):
+        return await sync_to_async(self.read, thread_sensitive=False)(path)
+
+    async def aread_many(self, paths: List[str]) -> Dict[str, dict]:
+        return await sync_to_async(self.read_many, thread_sensitive=False)(paths)
+
+    async def awrite(self, path, data):
+        return await sync_to_async(self.write, thread_sensitive=False)(path, data)
+
+    async def adelete(self, path):
+        return await sync_to_async(self.delete, thread_sensitive=False)(path)
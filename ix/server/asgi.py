@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
 import os
 
 import channels_graphql_ws
+from asgiref.sync import sync_to_async
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
 from django.urls import path
@@ -24,6 +25,7 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ix.server.settings")
 django.setup()
 from ix.server.fast_api import app as fast_api_app  # noqa: E402
+from ix.server.warmup import warm_worker  # noqa: E402
 
 
 class GraphqlWsConsumer(channels_graphql_ws.GraphqlWsConsumer):
@@ -55,17 +57,25 @@ graphql_application = URLRouter(
     ]
 )
 
+
+async def warmup():
+    """Preload components before the server handles requests"""
+    await sync_to_async(warm_worker, thread_sensitive=False)()
+
+
 django_application = get_asgi_application()
 http_application = Starlette(
     routes=[
         Mount("/api", fast_api_app),  # FastAPI handles requests at /fastapi
         Mount("", django_application),  # Django handles HTTP requests
-    ]
+    ],
+    on_startup=[warmup],
 )
 
 application = ProtocolTypeRouter(
     {
         "http": http_application,  # Django handles HTTP requests
         "websocket": graphql_application,  # Starlette handles WebSocket requests
+        "lifespan": http_application,  # Starlette runs startup hooks
     }
 )
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ix.server.settings")
@@ -24,6 +25,14 @@ app.conf.update(
 )
 
 
+@worker_process_init.connect
+def warm_worker_process(**kwargs):
+    """Preload components before the worker process receives tasks"""
+    from ix.server.warmup import warm_worker
+
+    warm_worker()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"Celery debug task: {self.request!r}")
@@ -10,6 +10,7 @@ from ix.api.artifacts.endpoints import router as artifacts_router
 from ix.api.components.endpoints import router as components_router
 from ix.api.chains.endpoints import router as chains_router
 from ix.api.editor.endpoints import router as editor_router
+from ix.api.executors.endpoints import router as executors_router
 from ix.api.chats.endpoints import router as chats_router
 from ix.api.datasources.endpoints import router as datasources_router
 from ix.skills.endpoints import router as skills_router
@@ -36,6 +37,7 @@ app.include_router(secrets_router)
 app.include_router(skills_router)
 app.include_router(workspace_router)
 app.include_router(runnable_log_router)
+app.include_router(executors_router)
 
 
 def custom_openapi():
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/4.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
+import json
 import logging
 import os
 from pathlib import Path
@@ -265,3 +266,117 @@ VAULT_BASE_PATH = os.environ.get("VAULT_BASE_PATH", "ix")
 WORKSPACE_DIR = os.environ.get("WORKSPACE_DIR", "/var/app/workdir/")
 
 RUNNABLE_LOG_ENABLED = os.environ.get("RUNNABLE_LOG_ENABLED", "1") in TRUTHY_VALUES
+
+# Runs are sampled when a flow starts. Errors are logged for runs that weren't
+# sampled. Node inputs and outputs are truncated to about RUNNABLE_LOG_MAX_FIELD_BYTES
+# of JSON. RUNNABLE_LOG_POLICIES is JSON that overrides these options for node
+# types and chains. See ix.runnable_log.policy
+RUNNABLE_LOG_SAMPLE_RATE = float(os.environ.get("RUNNABLE_LOG_SAMPLE_RATE", 1.0))
+RUNNABLE_LOG_ERRORS = os.environ.get("RUNNABLE_LOG_ERRORS", "1") in TRUTHY_VALUES
+RUNNABLE_LOG_MAX_FIELD_BYTES = int(
+    os.environ.get("RUNNABLE_LOG_MAX_FIELD_BYTES", 64 * 1024)
+)
+RUNNABLE_LOG_POLICIES = json.loads(os.environ.get("RUNNABLE_LOG_POLICIES", "{}"))
+
+# Compiled flows are cached per worker process and reused across chat messages
+# until the chain's graph revision changes or the entry expires.
+FLOW_CACHE_ENABLED = os.environ.get("FLOW_CACHE_ENABLED", "1") in TRUTHY_VALUES
+FLOW_CACHE_SIZE = int(os.environ.get("FLOW_CACHE_SIZE", 64))
+FLOW_CACHE_TTL = int(os.environ.get("FLOW_CACHE_TTL", 600))
+
+# Preload components, NodeTypes and tokenizers when worker processes start.
+WORKER_WARMUP_ENABLED = os.environ.get("WORKER_WARMUP_ENABLED", "1") in TRUTHY_VALUES
+WARMUP_TIKTOKEN_ENCODINGS = os.environ.get(
+    "WARMUP_TIKTOKEN_ENCODINGS", "cl100k_base"
+).split(",")
+
+# Threads used to initialize independent node properties concurrently when a flow
+# is loaded. Values less than 2 load properties sequentially.
+FLOW_LOADER_WORKERS = int(os.environ.get("FLOW_LOADER_WORKERS", 4))
+
+# Node types loaded when first run instead of when the flow is loaded. Individual
+# NodeTypes may override this with NodeType.lazy.
+LAZY_NODE_TYPES = os.environ.get(
+    "LAZY_NODE_TYPES", "vectorstore,document_loader"
+).split(",")
+
+# Record a per node profile (time, queries, secrets) when a task loads its flow.
+# Profiles are served by /runs/{chain_id}/{task_id}/load_profile
+FLOW_LOAD_PROFILE_ENABLED = (
+    os.environ.get("FLOW_LOAD_PROFILE_ENABLED", "1") in TRUTHY_VALUES
+)
+
+# Decrypted secrets are cached per user for this many seconds. 0 disables caching.
+SECRET_CACHE_TTL = int(os.environ.get("SECRET_CACHE_TTL", 60))
+SECRET_CACHE_SIZE = int(os.environ.get("SECRET_CACHE_SIZE", 1024))
+
+# Backend secret values are stored in: "database" (unencrypted, dev only) or "vault"
+SECRETS_BACKEND = os.environ.get("SECRETS_BACKEND", "database")
+
+# Vault clients keep a persistent connection pool per token. Up to
+# VAULT_CLIENT_POOL_SIZE clients are kept. User tokens are renewed in the
+# background when they expire within VAULT_TOKEN_RENEW_MARGIN seconds. Set
+# VAULT_TOKEN_RENEW_INTERVAL to 0 to disable renewal.
+VAULT_POOL_MAXSIZE = int(os.environ.get("VAULT_POOL_MAXSIZE", 10))
+VAULT_CLIENT_POOL_SIZE = int(os.environ.get("VAULT_CLIENT_POOL_SIZE", 256))
+VAULT_TOKEN_RENEW_INTERVAL = int(os.environ.get("VAULT_TOKEN_RENEW_INTERVAL", 60))
+VAULT_TOKEN_RENEW_MARGIN = int(os.environ.get("VAULT_TOKEN_RENEW_MARGIN", 300))
+
+# Node types whose instances are shared by flows in a worker that load them with
+# the same config. Reuses provider HTTP connections across chats.
+INSTANCE_POOL_TYPES = os.environ.get("INSTANCE_POOL_TYPES", "llm,embeddings").split(",")
+INSTANCE_POOL_SIZE = int(os.environ.get("INSTANCE_POOL_SIZE", 64))
+INSTANCE_POOL_TTL = int(os.environ.get("INSTANCE_POOL_TTL", 3600))
+
+# Memory budget for local models (LlamaCpp, HuggingFace embeddings) loaded by a
+# worker. Unused models are evicted least recently used first over the budget.
+LOCAL_MODEL_MEMORY_MB = int(os.environ.get("LOCAL_MODEL_MEMORY_MB", 8192))
+
+# Concurrent calls to local embedding models are batched up to this many inputs,
+# waiting at most EMBEDDING_BATCH_MAX_WAIT_MS for a batch to fill. A max size less
+# than 2 disables batching.
+EMBEDDING_BATCH_MAX_SIZE = int(os.environ.get("EMBEDDING_BATCH_MAX_SIZE", 64))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_MAX_WAIT_MS", 5))
+
+# Embeddings nodes may cache vectors in the database or redis by the hash of the
+# embedded text. The redis cache uses this django cache alias.
+EMBEDDING_CACHE_ALIAS = os.environ.get("EMBEDDING_CACHE_ALIAS", "default")
+EMBEDDING_CACHE_TTL = int(os.environ.get("EMBEDDING_CACHE_TTL", 60 * 60 * 24 * 30))
+
+# Documents ingested into vectorstores are added in batches of this many chunks by
+# INGESTION_CONCURRENCY threads. At most INGESTION_QUEUE_SIZE batches wait to be
+# added while documents are read.
+INGESTION_BATCH_SIZE = int(os.environ.get("INGESTION_BATCH_SIZE", 64))
+INGESTION_CONCURRENCY = int(os.environ.get("INGESTION_CONCURRENCY", 2))
+INGESTION_QUEUE_SIZE = int(os.environ.get("INGESTION_QUEUE_SIZE", 4))
+
+# Document loaders run on a dedicated pool of threads when called async. Streamed
+# documents are read up to DOCUMENT_LOADER_PREFETCH documents ahead of the flow.
+DOCUMENT_LOADER_WORKERS = int(os.environ.get("DOCUMENT_LOADER_WORKERS", 4))
+DOCUMENT_LOADER_PREFETCH = int(os.environ.get("DOCUMENT_LOADER_PREFETCH", 16))
+
+# Worker processes shared by document loaders and transforms configured to run in
+# processes. 0 uses one process per CPU.
+DOCUMENT_PROCESS_POOL_WORKERS = int(os.environ.get("DOCUMENT_PROCESS_POOL_WORKERS", 0))
+
+# Thread pools used by sync tools, retrievers, vectorstores and skills when called
+# async. A warning is logged, at most once per interval, when calls queue behind a
+# saturated pool.
+EXECUTOR_IO_WORKERS = int(os.environ.get("EXECUTOR_IO_WORKERS", 32))
+EXECUTOR_CPU_WORKERS = int(os.environ.get("EXECUTOR_CPU_WORKERS", 4))
+EXECUTOR_DB_WORKERS = int(os.environ.get("EXECUTOR_DB_WORKERS", 8))
+EXECUTOR_SATURATION_LOG_INTERVAL = int(
+    os.environ.get("EXECUTOR_SATURATION_LOG_INTERVAL", 60)
+)
+
+# Runnable executions for a run are written in bulk when this many are buffered,
+# RUNNABLE_LOG_FLUSH_INTERVAL_MS after the first is buffered, and when the run ends.
+RUNNABLE_LOG_FLUSH_SIZE = int(os.environ.get("RUNNABLE_LOG_FLUSH_SIZE", 50))
+RUNNABLE_LOG_FLUSH_INTERVAL_MS = int(
+    os.environ.get("RUNNABLE_LOG_FLUSH_INTERVAL_MS", 1000)
+)
+
+# Streamed LLM tokens are sent to clients in frames of up to this many tokens, at
+# most TOKEN_STREAM_INTERVAL_MS after the first token in the frame.
+TOKEN_STREAM_MAX_TOKENS = int(os.environ.get("TOKEN_STREAM_MAX_TOKENS", 32))
+TOKEN_STREAM_INTERVAL_MS = int(os.environ.get("TOKEN_STREAM_INTERVAL_MS", 50))
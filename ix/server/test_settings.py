@@ -20,3 +20,22 @@ INSTALLED_APPS += [  # noqa:F405
 
 
 VAULT_BASE_PATH = "test"
+
+# flows are rebuilt for each test so mocked components are not shared across tests
+FLOW_CACHE_ENABLED = False
+
+# test data is only visible to the test's connection. Load properties on the test
+# thread unless a test enables workers.
+FLOW_LOADER_WORKERS = 0
+
+# load components eagerly so tests can inspect them.
+LAZY_NODE_TYPES = []
+
+# create new instances for each test so mocked components are not shared.
+INSTANCE_POOL_TYPES = []
+
+# keep the document process pool small
+DOCUMENT_PROCESS_POOL_WORKERS = 2
+
+# ORM shims run on the test thread unless a test enables workers.
+EXECUTOR_DB_WORKERS = 0
@@ -0,0 +1,59 @@
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError
+
+from ix.chains.loaders.registry import node_type_registry
+from ix.chains.models import NodeType
+from ix.server.warmup import warm_worker
+
+
+@pytest.fixture
+def warmup_settings(settings):
+    settings.WORKER_WARMUP_ENABLED = True
+    # encodings are downloaded on first use, skip them in tests.
+    settings.WARMUP_TIKTOKEN_ENCODINGS = []
+
+
+@pytest.fixture
+def close_all(mocker):
+    # closing connections would end the test transaction.
+    return mocker.patch("ix.server.warmup.connections.close_all")
+
+
+@pytest.mark.usefixtures("close_all")
+@pytest.mark.django_db
+class TestWarmWorker:
+    async def test_warm_worker(self, anode_types, warmup_settings):
+        node_type_registry.refresh()
+        report = await sync_to_async(warm_worker)()
+
+        assert report.node_types == await NodeType.objects.acount()
+        assert report.import_times
+        assert node_type_registry.stats.size == report.node_types
+
+    async def test_disabled(self, anode_types, warmup_settings, settings):
+        settings.WORKER_WARMUP_ENABLED = False
+        report = await sync_to_async(warm_worker)()
+        assert report.node_types == 0
+
+    async def test_database_error(self, warmup_settings, mocker):
+        mocker.patch(
+            "ix.chains.models.NodeType.objects.all",
+            side_effect=DatabaseError("column nodetype.lazy does not exist"),
+        )
+        report = await sync_to_async(warm_worker)()
+        assert report.node_types == 0
+        assert "lazy" in report.node_types_error
+
+    async def test_close_connections(self, anode_types, warmup_settings, close_all):
+        await sync_to_async(warm_worker)()
+        close_all.assert_called_once()
+
+    async def test_close_connections_error(self, warmup_settings, mocker, close_all):
+        """Connections are closed when loading NodeTypes fails"""
+        mocker.patch(
+            "ix.chains.models.NodeType.objects.all",
+            side_effect=DatabaseError("connection refused"),
+        )
+        await sync_to_async(warm_worker)()
+        close_all.assert_called_once()
@@ -0,0 +1,112 @@
+"""
+Warm up worker processes before they handle their first task.
+
+Importing component modules (langchain_community, chromadb, unstructured, ...),
+validating NodeTypes, and loading tokenizers are all slow the first time they
+happen in a process. `warm_worker` does that work at startup so the first message
+after a deploy runs as fast as later ones.
+"""
+import dataclasses
+import logging
+import time
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class WarmupReport:
+    """Results of warming up a worker process"""
+
+    # seconds spent importing each module. Modules that were already imported
+    # by an earlier class_path report the time of their first import only.
+    import_times: Dict[str, float] = dataclasses.field(default_factory=dict)
+    import_errors: Dict[str, str] = dataclasses.field(default_factory=dict)
+    node_types: int = 0
+    node_types_error: Optional[str] = None
+    encodings: List[str] = dataclasses.field(default_factory=list)
+    duration: float = 0
+
+    def slowest_imports(self, limit: int = 10) -> List[tuple]:
+        return sorted(self.import_times.items(), key=lambda item: -item[1])[:limit]
+
+
+def import_node_types(report: WarmupReport) -> None:
+    """Import the class_path of every NodeType and warm the NodeType registry"""
+    from ix.chains.loaders.registry import node_type_registry
+    from ix.chains.models import NodeType
+    from ix.utils.importlib import import_class
+
+    for node_type in NodeType.objects.all():
+        node_type_registry.get(node_type)
+        report.node_types += 1
+
+        class_paths = [node_type.class_path]
+        for field_group in (node_type.field_groups or {}).values():
+            if field_group.get("class_path"):
+                class_paths.append(field_group["class_path"])
+
+        for class_path in class_paths:
+            module_path = class_path.rsplit(".", 1)[0]
+            if module_path in report.import_times:
+                continue
+
+            start = time.perf_counter()
+            try:
+                import_class(class_path)
+            except Exception as e:
+                # optional dependencies may not be installed in every image.
+                report.import_errors[class_path] = str(e)
+                continue
+            report.import_times[module_path] = time.perf_counter() - start
+
+
+def load_encodings(report: WarmupReport) -> None:
+    """Load tiktoken encodings. tiktoken caches encodings once loaded."""
+    import tiktoken
+
+    for name in settings.WARMUP_TIKTOKEN_ENCODINGS:
+        try:
+            tiktoken.get_encoding(name)
+        except Exception as e:
+            logger.warning(f"Failed to load tiktoken encoding={name}: {e}")
+            continue
+        report.encodings.append(name)
+
+
+def warm_worker() -> WarmupReport:
+    """Preload components, NodeTypes and tokenizers for this process"""
+    report = WarmupReport()
+    if not settings.WORKER_WARMUP_ENABLED:
+        return report
+
+    start = time.perf_counter()
+    try:
+        import_node_types(report)
+    except Exception as e:
+        # warmup is best-effort. e.g. the database may be down or not migrated yet
+        # when the process starts. Errors must not stop the process from starting.
+        logger.exception("Warmup failed to load NodeTypes")
+        report.node_types_error = str(e)
+    finally:
+        # warmup runs in a thread of its own under asgi and before the celery
+        # worker takes tasks. Close the connection rather than leaving it open
+        # until the thread or process exits.
+        connections.close_all()
+    load_encodings(report)
+    report.duration = time.perf_counter() - start
+
+    logger.info(
+        f"Worker warmup completed in {report.duration:.2f}s "
+        f"node_types={report.node_types} modules={len(report.import_times)} "
+        f"encodings={report.encodings}"
+    )
+    for module_path, seconds in report.slowest_imports():
+        logger.info(f"Warmup import module={module_path} time={seconds:.3f}s")
+    for class_path, error in report.import_errors.items():
+        logger.warning(f"Warmup failed to import class_path={class_path}: {error}")
+
+    return report
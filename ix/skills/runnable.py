@@ -1,6 +1,5 @@
 from typing import Optional
 
-from asgiref.sync import sync_to_async
 from langchain.schema.runnable import (
     RunnableSerializable,
     RunnableConfig,
@@ -11,6 +10,7 @@ from pydantic import UUID4
 from ix.skills.models import Skill
 from ix.skills.types import Skill as SkillPydantic
 from ix.skills.utils import run_code_with_repl
+from ix.utils.executors import run_in_executor
 
 
 class LoadSkill(RunnableSerializable[Input, SkillPydantic]):
@@ -53,8 +53,9 @@ class RunSkill(RunnableSerializable[Input, Output]):
     async def ainvoke(
         self, input: Input, config: Optional[RunnableConfig] = None, **kwargs
     ) -> Output:
-        repl = sync_to_async(run_code_with_repl)
-        return await repl(self.skill.code, self.skill.func_name, input)
+        return await run_in_executor(
+            "cpu", run_code_with_repl, self.skill.code, self.skill.func_name, input
+        )
 
     @classmethod
     def from_db(cls, skill_id: UUID4) -> "RunSkill":
@@ -8,7 +8,7 @@ from typing import List, Any, Type, Optional
 
 from ix.skills.utils import parse_skill
 from ix.utils.graphene.pagination import QueryPage
-from jsonschema_pydantic import jsonschema_to_pydantic
+from ix.utils.pydantic import jsonschema_to_model
 
 
 class SkillBase(BaseModel):
@@ -22,7 +22,7 @@ class SkillBase(BaseModel):
     @property
     def input_type(self) -> Type[BaseModel]:
         """Pydantic model for input schema"""
-        return jsonschema_to_pydantic(self.input_schema)
+        return jsonschema_to_model(self.input_schema)
 
 
 class EditSkill(SkillBase):
@@ -72,7 +72,7 @@ class Skill(SkillBase):
 
     @property
     def input_type(self) -> Type[BaseModel]:
-        return jsonschema_to_pydantic(self.input_schema)
+        return jsonschema_to_model(self.input_schema)
 
 
 class SkillPage(QueryPage[Skill]):
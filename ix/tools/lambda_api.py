@@ -1,8 +1,8 @@
-from asgiref.sync import sync_to_async
 from langchain.tools import BaseTool, Tool
 from langchain.utilities import LambdaWrapper
 
 from ix.chains.loaders.tools import extract_tool_kwargs
+from ix.utils.executors import sync_to_executor
 from typing import Any
 
 
@@ -13,6 +13,6 @@ def get_lambda_api(**kwargs: Any) -> BaseTool:
         name=kwargs["awslambda_tool_name"],
         description=kwargs["awslambda_tool_description"],
         func=wrapper.run,
-        coroutine=sync_to_async(wrapper.run),
+        coroutine=sync_to_executor(wrapper.run, "io"),
         **tool_kwargs
     )
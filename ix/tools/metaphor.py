@@ -1,11 +1,11 @@
 import os
 from typing import Any, Optional, Literal
 
-from asgiref.sync import sync_to_async
 from langchain.tools import Tool
 from metaphor_python import Metaphor
 
 from ix.chains.loaders.tools import extract_tool_kwargs
+from ix.utils.executors import sync_to_executor
 
 
 METAPHOR_METHODS = Literal["search", "get_contents", "find_similar"]
@@ -30,7 +30,7 @@ def get_metaphor_tool(
         name=f"metaphor_{method}",
         description=description,
         func=func,
-        coroutine=sync_to_async(func),
+        coroutine=sync_to_executor(func, "io"),
         **tool_kwargs,
     )
 
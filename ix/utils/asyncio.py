@@ -1,6 +1,11 @@
-from typing import Callable, Any
+from concurrent.futures import Executor
+from typing import Callable, Any, AsyncIterator, Iterator, Optional, TypeVar
 import asyncio
+import contextvars
 import functools
+import threading
+
+T = TypeVar("T")
 
 
 def sync(f: Callable[..., asyncio.Future]) -> Callable[..., Any]:
@@ -36,3 +41,67 @@ def run_coroutine_in_new_loop(coroutine):
         return new_loop.run_until_complete(coroutine)
     finally:
         new_loop.close()
+
+
+async def aiter_in_executor(
+    iterator_factory: Callable[[], Iterator[T]],
+    prefetch: int = 1,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[T]:
+    """
+    Iterates a sync iterator on an executor thread without blocking the event loop.
+
+    The thread reads ahead up to `prefetch` items into an asyncio.Queue. When the
+    consumer stops early or is cancelled the thread stops reading and closes the
+    iterator before reading the next item. Errors raised by the iterator are
+    raised to the consumer.
+
+    Args:
+        iterator_factory (Callable[[], Iterator[T]]): Creates the iterator. Called on
+            the executor thread.
+        prefetch (int): Max number of items read ahead of the consumer.
+        executor (Executor): Executor to run the iterator on. Defaults to the event
+            loop's default executor.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, prefetch))
+    stopped = threading.Event()
+    done = object()
+
+    def put(item: Any, error: BaseException = None) -> None:
+        # blocks the thread until the queue has room
+        if not stopped.is_set():
+            asyncio.run_coroutine_threadsafe(queue.put((item, error)), loop).result()
+
+    def produce() -> None:
+        iterator = None
+        try:
+            iterator = iterator_factory()
+            for item in iterator:
+                if stopped.is_set():
+                    break
+                put(item)
+        except BaseException as e:
+            put(done, e)
+        else:
+            put(done)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                close()
+
+    context = contextvars.copy_context()
+    loop.run_in_executor(executor, context.run, produce)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # stop the thread. Drain the queue so a blocked put can complete.
+        stopped.set()
+        while not queue.empty():
+            queue.get_nowait()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters for a cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    max_size: int = 0
+
+
+class LRUCache(Generic[K, V]):
+    """Thread safe, size bounded LRU cache.
+
+    Entries are evicted least recently used first once `max_size` is reached. When
+    `ttl` is set, entries older than `ttl` seconds are treated as misses and dropped
+    when they are next accessed.
+
+    `on_evict` is called with the key and value of entries removed to make room or
+    by `evict`, e.g. to close resources held by the value. It is called after the
+    lock is released.
+
+    Process-wide caches should be created at module level so they are shared by
+    every task running in the worker.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[K, V], None]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, MISSING, count=False) is not MISSING
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - created_at > self.ttl
+
+    def get(self, key: K, default: V = None, count: bool = True) -> V:
+        """Return cached value for key or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key, None)
+            if entry is not None and self._is_expired(entry[0]):
+                del self._data[key]
+                entry = None
+
+            if entry is None:
+                if count:
+                    self._misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            if count:
+                self._hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Add value to the cache, evicting the least recently used entries"""
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                evicted.append(self._data.popitem(last=False))
+                self._evictions += 1
+        self._on_evict(evicted)
+
+    def get_or_set(self, key: K, factory: Callable[[], V]) -> V:
+        """Return cached value for key, calling factory to create it on a miss.
+
+        The factory is called outside the lock. Concurrent misses for the same key
+        may each call the factory, the last value set wins.
+        """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def pop(self, key: K, default: V = None) -> V:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def evict(self, predicate: Callable[[K], bool]) -> int:
+        """Remove all entries whose key matches predicate. Returns count removed."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            evicted = [(key, self._data.pop(key)) for key in keys]
+        self._on_evict(evicted)
+        return len(evicted)
+
+    def _on_evict(self, evicted: List[Tuple[K, Tuple[float, V]]]) -> None:
+        if self.on_evict is not None:
+            for key, (_, value) in evicted:
+                self.on_evict(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._data),
+                max_size=self.max_size,
+            )
@@ -0,0 +1,184 @@
+"""
+Named executors for running sync code from async code.
+
+`sync_to_async` defaults to thread_sensitive=True, which runs every call in the
+worker on a single shared thread. Sync shims declare the pool they run on instead:
+
+- io: network bound calls (search APIs, retrievers, vectorstore writes).
+- cpu: CPU bound python (e.g. skills). Kept small so it can't starve io work.
+- db: Django ORM calls. Connections are closed after each call.
+
+Pools are sized with EXECUTOR_IO_WORKERS, EXECUTOR_CPU_WORKERS and
+EXECUTOR_DB_WORKERS. A pool sized 0 runs calls with thread sensitive
+sync_to_async instead, e.g. in tests where test data is only visible to the
+test's connection. Each pool counts queued and running calls. `executor_stats`
+reports them and is served by the /executors/stats endpoint. A warning is logged
+when calls queue behind a saturated pool.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InstrumentedExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that counts queued and running calls"""
+
+    def __init__(self, name: str, max_workers: int):
+        super().__init__(max_workers=max_workers, thread_name_prefix=f"ix-{name}")
+        self.name = name
+        self.max_workers = max_workers
+        self._stats_lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.peak_queued = 0
+        self.wait_time = 0.0
+        self._last_warning = 0.0
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+        submitted = time.monotonic()
+        started = False
+
+        def run() -> T:
+            nonlocal started
+            with self._stats_lock:
+                started = True
+                self.queued -= 1
+                self.running += 1
+                self.wait_time += time.monotonic() - submitted
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        def on_done(future: Future) -> None:
+            # calls cancelled before they started
+            with self._stats_lock:
+                if not started:
+                    self.queued -= 1
+
+        with self._stats_lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            saturated = self.running + self.queued > self.max_workers
+        if saturated:
+            self._warn_saturated()
+
+        future = super().submit(run)
+        future.add_done_callback(on_done)
+        return future
+
+    def _warn_saturated(self) -> None:
+        now = time.monotonic()
+        if now - self._last_warning < settings.EXECUTOR_SATURATION_LOG_INTERVAL:
+            return
+        self._last_warning = now
+        logger.warning(f"Executor saturated {self.format_stats()}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            started = self.completed + self.running
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "peak_queued": self.peak_queued,
+                "utilization": self.running / self.max_workers,
+                "mean_wait_ms": self.wait_time * 1000 / started if started else 0.0,
+            }
+
+    def format_stats(self) -> str:
+        return " ".join(f"{key}={value}" for key, value in self.stats().items())
+
+
+# pool name -> setting with the number of workers
+EXECUTOR_WORKER_SETTINGS = {
+    "io": "EXECUTOR_IO_WORKERS",
+    "cpu": "EXECUTOR_CPU_WORKERS",
+    "db": "EXECUTOR_DB_WORKERS",
+}
+
+_executors: Dict[str, InstrumentedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor_workers(name: str) -> int:
+    try:
+        return getattr(settings, EXECUTOR_WORKER_SETTINGS[name])
+    except KeyError:
+        raise ValueError(f"Unknown executor: {name}")
+
+
+def get_executor(name: str) -> InstrumentedExecutor:
+    """Return the named executor, starting it if needed"""
+    max_workers = get_executor_workers(name)
+    with _executors_lock:
+        executor = _executors.get(name, None)
+        if executor is None or executor.max_workers != max_workers:
+            # restarted when resized, e.g. by tests that override settings
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = InstrumentedExecutor(name, max_workers=max_workers)
+            _executors[name] = executor
+        return executor
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Saturation metrics for executors that were started"""
+    with _executors_lock:
+        executors = list(_executors.values())
+    return {executor.name: executor.stats() for executor in executors}
+
+
+def _run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(
+    name: str, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a sync function on the named executor.
+
+    The function runs with a copy of the caller's context, like sync_to_async.
+    """
+    if not get_executor_workers(name):
+        return await sync_to_async(func)(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    if name == "db":
+        func = functools.partial(_run_db, func)
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(name), call)
+
+
+def sync_to_executor(
+    func: Callable[..., T], executor: str = "io"
+) -> Callable[..., Awaitable[T]]:
+    """Replacement for sync_to_async that runs func on a named executor"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_in_executor(executor, func, *args, **kwargs)
+
+    return wrapper
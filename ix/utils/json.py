@@ -1,42 +1,324 @@
-from dataclasses import asdict, is_dataclass
+import dataclasses
+import json
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from langchain_core.documents import Document
 from pydantic import BaseModel
 from pydantic.v1 import BaseModel as BaseModelV1
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode JSON serializable data. Uses orjson when it's installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers larger than 64 bits
+            pass
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+class EncodedJSON:
+    """JSON serializable data and its encoding.
+
+    The data is encoded once, when first needed, and the encoding is reused by
+    everything that needs it, e.g. measuring the size of the data and saving it in
+    a JSONField that uses EncodedJSONEncoder.
+    """
+
+    __slots__ = ("data", "_encoded")
+
+    def __init__(self, data: Any, encoded: Optional[bytes] = None):
+        self.data = data
+        self._encoded = encoded
+
+    @property
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            self._encoded = dumps(self.data)
+        return self._encoded
+
+    def __len__(self) -> int:
+        return len(self.encoded)
+
+    def __repr__(self) -> str:
+        return f"EncodedJSON({len(self)} bytes)"
+
+
+class EncodedJSONEncoder(DjangoJSONEncoder):
+    """JSONField encoder that reuses the encoding of EncodedJSON values"""
+
+    def encode(self, o: Any) -> str:
+        if isinstance(o, EncodedJSON):
+            return o.encoded.decode()
+        return super().encode(o)
+
+
+# strings are truncated to this many chars when serializing with truncate=True
+MAX_STRING_LENGTH = 256
+
+# objects nested deeper than this are not serialized
+MAX_DEPTH = 64
+
+# converter kinds
+LEAF = 0
+DICT = 1
+LIST = 2
+
+# Converters return the kind of value and the value or its items.
+Converter = Callable[[Any], Tuple[int, Any]]
+_converters: Dict[type, Converter] = {}
+
+
+def _leaf(value: Any) -> Tuple[int, Any]:
+    return LEAF, value
+
+
+def _str(value: Any) -> Tuple[int, Any]:
+    return LEAF, str(value)
+
+
+def _bytes(value: Any) -> Tuple[int, Any]:
+    return LEAF, f"[{len(value)} bytes]"
+
+
+def _dict(value: Any) -> Tuple[int, Any]:
+    return DICT, value.items()
+
+
+def _list(value: Any) -> Tuple[int, Any]:
+    return LIST, value
+
+
+def _sequence(value: Any) -> Tuple[int, Any]:
+    return LIST, list(value)
+
+
+def _document(value: Document) -> Tuple[int, Any]:
+    return DICT, (
+        ("page_content", value.page_content),
+        ("metadata", value.metadata),
+        ("type", value.type),
+    )
+
+
+def _fields(names: Tuple[str, ...]) -> Converter:
+    """Converter for models and dataclasses that reads their fields without
+    copying them. Nested values are converted by the walk."""
+
+    def convert(value: Any) -> Tuple[int, Any]:
+        return DICT, [(name, getattr(value, name)) for name in names]
+
+    return convert
+
+
+def _numpy(value: Any) -> Tuple[int, Any]:
+    # arrays become nested lists, scalars become python numbers
+    if value.ndim == 0:
+        return LEAF, value.item()
+    return LIST, value.tolist()
+
+
+def _get_converter(cls: type) -> Converter:
+    """Return the converter for a type. Converters are chosen once per type."""
+    converter = _converters.get(cls, None)
+    if converter is not None:
+        return converter
+
+    numpy = sys.modules.get("numpy", None)
+    if issubclass(cls, (str, int, float, bool, type(None))):
+        converter = _leaf
+    elif issubclass(cls, dict):
+        converter = _dict
+    elif issubclass(cls, list):
+        converter = _list
+    elif issubclass(cls, (tuple, set, frozenset)):
+        converter = _sequence
+    elif issubclass(cls, (bytes, bytearray, memoryview)):
+        converter = _bytes
+    elif issubclass(cls, Document):
+        converter = _document
+    elif issubclass(cls, BaseModelV1):
+        # includes BaseMessage
+        converter = _fields(tuple(cls.__fields__))
+    elif issubclass(cls, BaseModel):
+        converter = _fields(tuple(cls.model_fields))
+    elif dataclasses.is_dataclass(cls):
+        converter = _fields(tuple(f.name for f in dataclasses.fields(cls)))
+    elif numpy is not None and issubclass(cls, (numpy.ndarray, numpy.generic)):
+        converter = _numpy
+    else:
+        converter = _str
+    _converters[cls] = converter
+    return converter
+
+
+def _truncate_string(value: str, length: int) -> str:
+    if len(value) <= length:
+        return value
+    return f"{value[:length]} ... ({len(value) - length} chars)"
+
 
 def to_json_serializable(
-    obj: dict | BaseModel | BaseModelV1, truncate: bool = True
-) -> dict:
+    obj: Any, truncate: bool = True, max_bytes: Optional[int] = None
+) -> Any:
     """Serialize object to json to log.
 
     Prefer vanilla pydantic serialization for now because LC serialization
     won't convert all objects. It is preferable to use LC serialization
     eventually to filter secrets.
+
+    The object is walked iteratively. Models, dataclasses and documents are read
+    field by field instead of being copied, and the converter for each type is
+    chosen once. Circular references and objects nested deeper than MAX_DEPTH are
+    replaced with a note. Objects referenced more than once are converted once.
+
+    When max_bytes is given the walk stops after about that many bytes of JSON.
+    Strings are cut, the rest of lists are replaced with a note of the number of
+    items left and the rest of dict values are replaced with "...".
     """
-    if isinstance(obj, BaseModelV1):
-        obj = obj.dict()
-    elif isinstance(obj, BaseModel):
-        obj = obj.model_dump()
-    elif is_dataclass(obj):
-        obj = asdict(obj)
-    elif isinstance(obj, (dict, list, str, int, float, bool, type(None))):
-        pass
-    elif isinstance(obj, bytes):
-        obj = f"[{len(obj)} bytes]"
-    else:
-        obj = str(obj)
+    remaining = max_bytes if max_bytes is not None else -1
+    max_length = MAX_STRING_LENGTH if truncate else None
+
+    # objects being walked and objects that were converted
+    walking: Set[int] = set()
+    converted: Dict[int, Tuple[Any, Any]] = {}
+
+    # stack of (source id, result, items, is list). Dict items are (key, value)
+    root: List[Any] = []
+    stack: List[Tuple[int, Any, Iterator, bool]] = [(0, root, iter([obj]), True)]
+    while stack:
+        source_id, result, items, is_list = stack[-1]
+        for item in items:
+            if is_list:
+                key, value = len(result), item
+                result.append(None)
+            else:
+                key, value = item
+                if max_bytes is not None:
+                    remaining -= len(str(key)) + 4
+
+            if max_bytes is not None and remaining < 0:
+                if is_list:
+                    left = sum(1 for _ in items) + 1
+                    result[key] = f"... ({left} more items)"
+                    break
+                result[key] = "..."
+                continue
 
-    # truncate strings that are too long
-    if truncate and isinstance(obj, str) and len(obj) > 256:
-        obj = f"{obj[:256]} ... ({len(obj) - 256} chars)"
+            kind, converted_value = _get_converter(type(value))(value)
+            if kind == LEAF:
+                if isinstance(converted_value, str):
+                    if max_length is not None:
+                        converted_value = _truncate_string(converted_value, max_length)
+                    if max_bytes is not None:
+                        converted_value = _truncate_string(
+                            converted_value, max(remaining, 0)
+                        )
+                        remaining -= len(converted_value) + 2
+                elif max_bytes is not None:
+                    remaining -= 8
+                result[key] = converted_value
+                continue
 
-    # now recursively check to make sure there are no nested objects
-    # that aren't json serializable
-    if isinstance(obj, dict):
-        new_obj = {
-            key: to_json_serializable(value, truncate) for key, value in obj.items()
+            # containers are added to the stack and filled in as they are walked
+            value_id = id(value)
+            if value_id in walking:
+                result[key] = "[circular reference]"
+            elif value_id in converted:
+                result[key] = converted[value_id][1]
+            elif len(stack) > MAX_DEPTH:
+                result[key] = "[max depth]"
+            else:
+                child = [] if kind == LIST else {}
+                result[key] = child
+                walking.add(value_id)
+                # keep a reference to the source so its id isn't reused
+                converted[value_id] = (value, child)
+                stack.append((value_id, child, iter(converted_value), kind == LIST))
+                break
+        else:
+            walking.discard(source_id)
+            stack.pop()
+
+    return root[0]
+
+
+# lists are shortened when their items would get less than this many bytes each
+MIN_ITEM_BYTES = 64
+
+# bytes reserved for notes of truncated chars or items
+NOTE_BYTES = 32
+
+
+def json_size(obj: Any) -> int:
+    """Size of obj encoded as JSON, in bytes"""
+    return len(dumps(obj))
+
+
+def truncate_json(obj: Any, max_bytes: int) -> Any:
+    """Truncate JSON serializable data to approximately max_bytes when encoded.
+
+    Truncation preserves structure. Dicts keep all of their keys and lists note the
+    number of items that were dropped. Long strings are shortened and note the
+    number of characters that were dropped. Budget is shared between items so that
+    small values are kept intact and large values are truncated.
+    """
+    if json_size(obj) <= max_bytes:
+        return obj
+    return _truncate(obj, max_bytes)
+
+
+def _truncate(obj: Any, budget: int) -> Any:
+    if isinstance(obj, str):
+        keep = max(budget - NOTE_BYTES, 0)
+        if len(obj) <= max(keep, NOTE_BYTES):
+            return obj
+        return f"{obj[:keep]} ... ({len(obj) - keep} chars)"
+    elif isinstance(obj, dict):
+        # budget left for values after keys and separators
+        budget -= json_size(dict.fromkeys(obj, 0)) - len(obj)
+        shares = _shares([json_size(value) for value in obj.values()], budget)
+        return {
+            key: _fit(value, share) for (key, value), share in zip(obj.items(), shares)
         }
-        obj = new_obj
     elif isinstance(obj, list):
-        obj = [to_json_serializable(value, truncate) for value in obj]
-
+        if len(obj) > 1:
+            # smallest useful size of an item. Dicts can't be smaller than their keys.
+            floor = max(
+                json_size(_truncate(obj[0], 0)),
+                min(json_size(obj[0]), MIN_ITEM_BYTES),
+            )
+            if budget // len(obj) < floor + 2:
+                count = max((budget - NOTE_BYTES) // (floor + 2), 1)
+                items = _truncate(obj[:count], budget - NOTE_BYTES)
+                return items + [f"... ({len(obj) - count} more items)"]
+        budget -= json_size([0] * len(obj)) - len(obj)
+        shares = _shares([json_size(value) for value in obj], budget)
+        return [_fit(value, share) for value, share in zip(obj, shares)]
     return obj
+
+
+def _fit(obj: Any, budget: int) -> Any:
+    if json_size(obj) <= budget:
+        return obj
+    return _truncate(obj, budget)
+
+
+def _shares(sizes: List[int], budget: int) -> List[int]:
+    """Split budget between items. Items smaller than an even share are kept whole
+    and the remainder is split between the larger items."""
+    shares = [0] * len(sizes)
+    remaining = max(budget, 0)
+    order = sorted(range(len(sizes)), key=sizes.__getitem__)
+    for n, i in enumerate(order):
+        shares[i] = min(sizes[i], remaining // (len(sizes) - n))
+        remaining -= shares[i]
+    return shares
@@ -1,15 +1,35 @@
+import hashlib
 import inspect
-from typing import Any, Type, Callable, get_type_hints, List
+import json
+from typing import Any, Type, Callable, get_type_hints, List, Hashable
 
 import pydantic
+from jsonschema_pydantic import jsonschema_to_pydantic
 from pydantic import BaseModel, create_model
 from pydantic.v1 import create_model as create_model_v1
 
+from ix.utils.cache import LRUCache
 
 PYDANTIC_VERSION = pydantic.__version__.split(".")
 PYDANTIC_MAJOR_VERSION = int(PYDANTIC_VERSION[0])
 
 
+# Dynamically created models are cached process-wide. Creating a model is slow
+# relative to the hot paths that need them (loading nodes, validating input).
+# Cached models are shared and must not be modified by callers.
+MODEL_CACHE_SIZE = 512
+model_cache: LRUCache[Hashable, Type[BaseModel]] = LRUCache(max_size=MODEL_CACHE_SIZE)
+
+
+def schema_hash(schema: Any) -> str:
+    """Hash of a JSON serializable schema.
+
+    Keys are not sorted. The order of properties is the order of the model's fields.
+    """
+    encoded = json.dumps(schema, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
 def get_model_fields(model: BaseModel):
     """v1/v2 compat for fields"""
     if PYDANTIC_MAJOR_VERSION == 2:
@@ -30,16 +50,41 @@ def create_args_model(variables, name="DynamicModel") -> Type[BaseModel]:
     """
     Dynamically create a Pydantic model class with fields for each variable
     """
-    field_definitions = {field: (Any, ...) for field in variables}
-    return create_model(name, **field_definitions)
+    # fields are created in the order given. Callers with unordered variables (e.g.
+    # a set) should sort them so they hit the same cache entry.
+    variables = tuple(variables)
+
+    def factory():
+        field_definitions = {field: (Any, ...) for field in variables}
+        return create_model(name, **field_definitions)
+
+    return model_cache.get_or_set(("args", name, variables), factory)
 
 
 def create_args_model_v1(variables, name="DynamicModel") -> Type[BaseModel]:
     """
     Dynamically create a Pydantic model class with fields for each variable
     """
-    field_definitions = {field: (Any, ...) for field in variables}
-    return create_model_v1(name, **field_definitions)
+    # fields are created in the order given. Callers with unordered variables (e.g.
+    # a set) should sort them so they hit the same cache entry.
+    variables = tuple(variables)
+
+    def factory():
+        field_definitions = {field: (Any, ...) for field in variables}
+        return create_model_v1(name, **field_definitions)
+
+    return model_cache.get_or_set(("args_v1", name, variables), factory)
+
+
+def jsonschema_to_model(schema: dict, version: int = None) -> Type[BaseModel]:
+    """Create a Pydantic model from a JSONSchema.
+
+    Cached version of jsonschema_to_pydantic. Models are keyed by a hash of the
+    schema.
+    """
+    kwargs = {} if version is None else {"version": version}
+    key = ("jsonschema", version, schema_hash(schema))
+    return model_cache.get_or_set(key, lambda: jsonschema_to_pydantic(schema, **kwargs))
 
 
 def fields_from_signature(func: Callable) -> dict[str, tuple[type, Any]]:
@@ -64,7 +109,22 @@ def fields_from_signature(func: Callable) -> dict[str, tuple[type, Any]]:
 
 
 def model_from_signature(name: str, func: Callable | List[Callable]) -> Type[BaseModel]:
-    """Generate a Pydantic model based on the __init__ method of a given class."""
+    """Generate a Pydantic model based on the __init__ method of a given class.
+
+    Models are cached by name and the callables they were generated from.
+    """
+    funcs = tuple(func) if isinstance(func, list) else (func,)
+    try:
+        key = ("signature", name, funcs)
+        hash(key)
+    except TypeError:
+        return _model_from_signature(name, func)
+    return model_cache.get_or_set(key, lambda: _model_from_signature(name, func))
+
+
+def _model_from_signature(
+    name: str, func: Callable | List[Callable]
+) -> Type[BaseModel]:
     if isinstance(func, list):
         fields = {}
         for f in func:
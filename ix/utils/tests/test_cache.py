@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from ix.utils.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_get_set(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("b", 2) == 2
+
+        stats = cache.stats
+        assert stats.hits == 1
+        assert stats.misses == 2
+        assert stats.size == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # touch "a" so "b" is the least recently used
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+
+    def test_on_evict(self):
+        evicted = []
+        cache = LRUCache(max_size=2, on_evict=lambda key, value: evicted.append(key))
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert evicted == ["a"]
+
+        assert cache.evict(lambda key: key == "c") == 1
+        assert evicted == ["a", "c"]
+
+        # popped entries are returned to the caller instead
+        cache.pop("b")
+        assert evicted == ["a", "c"]
+        assert cache.stats.evictions == 1
+
+    def test_ttl(self):
+        cache = LRUCache(max_size=2, ttl=10)
+        with patch("ix.utils.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("ix.utils.cache.time.monotonic", return_value=105):
+            assert cache.get("a") == 1
+        with patch("ix.utils.cache.time.monotonic", return_value=111):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_get_or_set(self):
+        cache = LRUCache(max_size=2)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return "value"
+
+        assert cache.get_or_set("a", factory) == "value"
+        assert cache.get_or_set("a", factory) == "value"
+        assert len(calls) == 1
+
+    def test_evict(self):
+        cache = LRUCache(max_size=4)
+        cache.set(("chain_1", 0), 1)
+        cache.set(("chain_1", 1), 2)
+        cache.set(("chain_2", 0), 3)
+
+        assert cache.evict(lambda key: key[0] == "chain_1") == 2
+        assert len(cache) == 1
+        assert ("chain_2", 0) in cache
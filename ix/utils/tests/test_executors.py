@@ -0,0 +1,100 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from ix.utils.executors import (
+    InstrumentedExecutor,
+    executor_stats,
+    get_executor,
+    run_in_executor,
+    sync_to_executor,
+)
+
+test_var = contextvars.ContextVar("test_var", default=None)
+
+
+class TestInstrumentedExecutor:
+    def test_stats(self):
+        executor = InstrumentedExecutor("test", max_workers=1)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait()
+
+        running = executor.submit(block)
+        started.wait()
+        queued = executor.submit(lambda: 1)
+        cancelled = executor.submit(lambda: 2)
+        assert cancelled.cancel()
+
+        stats = executor.stats()
+        assert stats["running"] == 1
+        assert stats["queued"] == 1
+        assert stats["peak_queued"] == 2
+        assert stats["utilization"] == 1.0
+
+        release.set()
+        running.result()
+        assert queued.result() == 1
+        executor.shutdown()
+
+        stats = executor.stats()
+        assert stats["running"] == 0
+        assert stats["queued"] == 0
+        assert stats["completed"] == 2
+
+    def test_saturation_warning(self, mocker):
+        executor = InstrumentedExecutor("test", max_workers=1)
+        warn = mocker.patch("ix.utils.executors.logger.warning")
+        release = threading.Event()
+        executor.submit(release.wait)
+        executor.submit(lambda: None)
+        executor.submit(lambda: None)
+        release.set()
+        executor.shutdown()
+
+        # logged at most once per interval
+        assert warn.call_count == 1
+
+
+def test_get_executor():
+    assert get_executor("io") is get_executor("io")
+    assert get_executor("io") is not get_executor("cpu")
+    assert "io" in executor_stats()
+    with pytest.raises(ValueError):
+        get_executor("unknown")
+
+
+class TestRunInExecutor:
+    async def test_run_in_executor(self):
+        main_thread = threading.get_ident()
+        test_var.set("value")
+
+        def func(a, b=None):
+            return a, b, test_var.get(), threading.get_ident()
+
+        a, b, value, thread = await run_in_executor("io", func, 1, b=2)
+        assert (a, b, value) == (1, 2, "value")
+        assert thread != main_thread
+
+    async def test_concurrent_calls(self):
+        """Calls on the io pool don't wait for each other"""
+        barrier = threading.Barrier(3, timeout=5)
+        await asyncio.gather(*[run_in_executor("io", barrier.wait) for _ in range(3)])
+
+    async def test_sync_to_executor(self):
+        def add(a, b):
+            return a + b
+
+        assert await sync_to_executor(add, executor="cpu")(1, 2) == 3
+
+    async def test_no_workers(self, settings):
+        """Pools sized 0 run calls with thread sensitive sync_to_async"""
+        settings.EXECUTOR_DB_WORKERS = 0
+        thread = await run_in_executor("db", threading.get_ident)
+        assert thread == await sync_to_async(threading.get_ident)()
@@ -0,0 +1,145 @@
+import dataclasses
+import json
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel
+
+from ix.utils.json import (
+    EncodedJSON,
+    EncodedJSONEncoder,
+    json_size,
+    to_json_serializable,
+    truncate_json,
+)
+
+DOCUMENTS = [
+    {"page_content": "x" * 2000, "metadata": {"source": f"file_{i}.txt"}}
+    for i in range(300)
+]
+
+
+class TestTruncateJson:
+    def test_within_budget(self):
+        data = {"input": "question", "documents": DOCUMENTS[:2]}
+        assert truncate_json(data, 10000) is data
+
+    def test_string(self):
+        result = truncate_json("x" * 1000, 100)
+        assert result.startswith("x" * 60)
+        assert result.endswith("(932 chars)")
+
+    def test_list(self):
+        result = truncate_json(list(range(1000)), 200)
+        assert result[:3] == [0, 1, 2]
+        assert result[-1] == f"... ({1000 - len(result) + 1} more items)"
+        assert json_size(result) <= 250
+
+    def test_structure(self):
+        data = {"input": "question", "documents": DOCUMENTS, "count": 300}
+        result = truncate_json(data, 10000)
+
+        # keys and small values are kept
+        assert result.keys() == data.keys()
+        assert result["input"] == "question"
+        assert result["count"] == 300
+
+        documents = result["documents"]
+        assert documents[-1] == f"... ({300 - len(documents) + 1} more items)"
+        assert documents[0]["metadata"] == {"source": "file_0.txt"}
+        assert documents[0]["page_content"].endswith("chars)")
+        assert 9000 < json_size(result) < 11000
+
+    def test_shares_budget(self):
+        """Small values are kept whole and large values share the rest"""
+        data = {"a": "short", "b": "x" * 1000, "c": "y" * 1000}
+        result = truncate_json(data, 500)
+        assert result["a"] == "short"
+        assert abs(len(result["b"]) - len(result["c"])) <= 1
+        assert json_size(result) <= 500
+
+
+class MockModel(BaseModel):
+    name: str
+    tags: List[str] = []
+
+
+@dataclasses.dataclass
+class MockDataclass:
+    value: bytes
+    items: tuple
+
+
+class TestToJsonSerializable:
+    def test_types(self):
+        data = {
+            "document": Document(page_content="test", metadata={"source": "a.txt"}),
+            "message": AIMessage(content="hello"),
+            "model": MockModel(name="test"),
+            "dataclass": MockDataclass(value=b"1234", items=(1, 2)),
+            "other": object,
+        }
+        result = to_json_serializable(data)
+        assert result["document"] == {
+            "page_content": "test",
+            "metadata": {"source": "a.txt"},
+            "type": "Document",
+        }
+        assert result["message"] == AIMessage(content="hello").dict()
+        assert result["model"] == {"name": "test", "tags": []}
+        assert result["dataclass"] == {"value": "[4 bytes]", "items": [1, 2]}
+        assert result["other"] == "<class 'object'>"
+        json.dumps(result)
+
+    def test_numpy(self):
+        numpy = pytest.importorskip("numpy")
+        data = {"array": numpy.ones((2, 2)), "scalar": numpy.int64(3)}
+        result = to_json_serializable(data)
+        assert result == {"array": [[1.0, 1.0], [1.0, 1.0]], "scalar": 3}
+
+    def test_truncate(self):
+        assert to_json_serializable("x" * 300).endswith("x ... (44 chars)")
+        assert to_json_serializable("x" * 300, truncate=False) == "x" * 300
+
+    def test_circular_reference(self):
+        data = {"name": "test"}
+        data["self"] = data
+        assert to_json_serializable(data) == {
+            "name": "test",
+            "self": "[circular reference]",
+        }
+
+    def test_shared_reference(self):
+        shared = {"a": 1}
+        result = to_json_serializable({"x": shared, "y": [shared]})
+        assert result == {"x": {"a": 1}, "y": [{"a": 1}]}
+
+    def test_max_depth(self):
+        data = []
+        for _ in range(1000):
+            data = [data]
+        result = json.dumps(to_json_serializable(data))
+        assert "[max depth]" in result
+
+    def test_max_bytes(self):
+        data = {"documents": [{"page_content": "x" * 1000} for _ in range(100)]}
+        result = to_json_serializable(data, truncate=False, max_bytes=2500)
+
+        documents = result["documents"]
+        assert documents[0] == {"page_content": "x" * 1000}
+        assert documents[-1] == f"... ({101 - len(documents)} more items)"
+        assert json_size(result) < 3000
+
+
+class TestEncodedJSON:
+    def test_encoded(self):
+        encoded = EncodedJSON({"a": [1, "b"]})
+        assert json.loads(encoded.encoded) == {"a": [1, "b"]}
+        assert len(encoded) == len(encoded.encoded)
+
+    def test_encoder(self):
+        encoded = EncodedJSON({"a": 1}, encoded=b'{"a": 2}')
+        assert json.dumps(encoded, cls=EncodedJSONEncoder) == '{"a": 2}'
+        assert json.dumps({"a": 1}, cls=EncodedJSONEncoder) == '{"a": 1}'
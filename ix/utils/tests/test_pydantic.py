@@ -0,0 +1,78 @@
+import pytest
+
+from ix.utils.pydantic import (
+    create_args_model,
+    create_args_model_v1,
+    get_model_fields,
+    jsonschema_to_model,
+    model_cache,
+    model_from_signature,
+    schema_hash,
+)
+
+
+def mock_func(a: int, b: str = "b"):
+    pass
+
+
+@pytest.fixture
+def clear_model_cache():
+    model_cache.clear()
+    yield
+    model_cache.clear()
+
+
+@pytest.mark.usefixtures("clear_model_cache")
+class TestModelCache:
+    def test_create_args_model(self):
+        model = create_args_model(["a", "b"], name="Args")
+        assert create_args_model(["a", "b"], name="Args") is model
+        assert create_args_model(["a"], name="Args") is not model
+        assert create_args_model_v1(["a", "b"], name="Args") is not model
+
+    def test_create_args_model_order(self):
+        """Fields keep the order of the variables"""
+        model = create_args_model(["b", "a", "c"], name="Args")
+        assert create_args_model(("b", "a", "c"), name="Args") is model
+        assert list(model.model_fields) == ["b", "a", "c"]
+
+        other = create_args_model(["c", "b", "a"], name="Args")
+        assert other is not model
+        assert list(other.model_fields) == ["c", "b", "a"]
+
+    def test_model_from_signature(self):
+        model = model_from_signature("Args", mock_func)
+        assert model_from_signature("Args", mock_func) is model
+        assert model_from_signature("Args", [mock_func]) is model
+        assert set(model.model_fields) == {"a", "b"}
+
+    def test_jsonschema_to_model(self):
+        schema = {
+            "type": "object",
+            "properties": {"a": {"type": "string"}, "b": {"type": "integer"}},
+        }
+        model = jsonschema_to_model(schema)
+        assert jsonschema_to_model(dict(schema)) is model
+
+    def test_jsonschema_to_model_property_order(self):
+        """Schemas with properties in a different order don't share a model"""
+        schema = {
+            "type": "object",
+            "properties": {"a": {"type": "string"}, "b": {"type": "integer"}},
+        }
+        reordered = {
+            "type": "object",
+            "properties": {"b": {"type": "integer"}, "a": {"type": "string"}},
+        }
+        assert schema_hash(schema) != schema_hash(reordered)
+        model = jsonschema_to_model(schema)
+        other = jsonschema_to_model(reordered)
+        assert other is not model
+        assert list(get_model_fields(other)) == ["b", "a"]
+
+    def test_stats(self):
+        create_args_model(["a"])
+        create_args_model(["a"])
+        stats = model_cache.stats
+        assert stats.size == 1
+        assert stats.hits >= 1